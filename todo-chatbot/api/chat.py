@@ -6,18 +6,29 @@ Following the constitution:
 - No in-process or hidden state is allowed
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from database.connection import get_db
 from mcp.tasks import get_tasks_by_user
-from typing import List
+from backend.mcp.pagination import DEFAULT_SORT, TASK_PAGE_MAX, TASK_PAGE_SIZE, InvalidPageRequest, parse_fields
+from typing import List, Optional
 
 
 router = APIRouter()
 
+# conversation_history field -> task column
+HISTORY_FIELDS = {"task_id": "id", "title": "title", "status": "status", "created_at": "created_at"}
+
 
 @router.get("/{user_id}/chat")
-async def chat(user_id: str, db: Session = Depends(get_db)):
+async def chat(
+    user_id: str,
+    limit: int = Query(TASK_PAGE_SIZE, ge=1, le=TASK_PAGE_MAX),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    sort: str = Query(DEFAULT_SORT, description="created_at, -created_at, title or -title"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of task_id, title, status, created_at"),
+    db: Session = Depends(get_db)
+):
     """
     Chat endpoint following Phase 4 constitution:
     - Stateless server
@@ -26,20 +37,25 @@ async def chat(user_id: str, db: Session = Depends(get_db)):
     """
     # Fetch conversation history from database
     # According to constitution: "Conversation history is fetched from the database"
-    tasks = get_tasks_by_user(db, user_id)
+    # One keyset page at a time; pass next_cursor back for the following page
+    try:
+        names = parse_fields(fields, HISTORY_FIELDS, HISTORY_FIELDS)
+        page = get_tasks_by_user(
+            db, user_id, limit=limit, cursor=cursor, sort=sort,
+            fields=[HISTORY_FIELDS[name] for name in names]
+        )
+    except InvalidPageRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Return conversation context rebuilt from database
     # According to constitution: "Conversation context is rebuilt per request"
     return {
         "user_id": user_id,
         "conversation_history": [
-            {
-                "task_id": task.id,
-                "title": task.title,
-                "status": task.status,
-                "created_at": task.created_at
-            } for task in tasks
+            {name: getattr(task, HISTORY_FIELDS[name]) for name in names}
+            for task in page.items
         ],
+        "next_cursor": page.next_cursor,
         "stateless": True,
         "constitution_compliant": True
     }
\ No newline at end of file
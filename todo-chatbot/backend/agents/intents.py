@@ -0,0 +1,130 @@
+"""
+Intent engine for the Phase 4 Todo AI Chatbot
+Compiles every keyword and phrase rule into one word-bounded regex so a
+message is classified, and its title, task IDs and status extracted, in one pass
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+
+class ParsedMessage(NamedTuple):
+    """Result of parsing one message"""
+    intent: Optional[str]
+    hits: FrozenSet[str]
+    title: str
+    task_ids: Tuple[int, ...]
+    status: Optional[str]
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """
+    Build a prefix-factored alternation ("show|shop" -> "sho(?:w|p)")
+    so the regex rejects a position after one character instead of
+    trying every phrase in turn; longer phrases are preferred
+    """
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class IntentEngine:
+    """
+    Keyword intent classifier backed by a single compiled alternation
+    Intents are listed in priority order; the first intent with a keyword in
+    the message wins. The title is the text after the first title-intent
+    keyword and any filler phrases that follow it ("add a task to ...")
+    """
+
+    def __init__(
+        self,
+        intents: Sequence[Tuple[str, Iterable[str]]],
+        statuses: Optional[Dict[str, Iterable[str]]] = None,
+        fillers: Iterable[str] = (),
+        title_intent: Optional[str] = None,
+    ):
+        self.priority = [name for name, _ in intents]
+        self.title_intent = title_intent
+
+        # phrase -> (intents, status)
+        tags: Dict[str, list] = {}
+        for name, phrases in intents:
+            for phrase in phrases:
+                tags.setdefault(phrase.lower(), [set(), None])[0].add(name)
+        for status, phrases in (statuses or {}).items():
+            for phrase in phrases:
+                tags.setdefault(phrase.lower(), [set(), None])[1] = status
+        self._tags = {phrase: (frozenset(names), status) for phrase, (names, status) in tags.items()}
+        # Matched against the lowercased message; a lookbehind is cheaper than \b here
+        self._pattern = re.compile(rf"(?<!\w)(?:(\d+)|({_trie_pattern(self._tags)}))\b")
+
+        # First title keyword plus the run of filler words up to the title itself
+        keywords = [phrase for phrase, (names, _) in self._tags.items() if title_intent in names]
+        lead = {phrase.lower() for phrase in fillers}.union(keywords)
+        self._title = re.compile(
+            rf"\b{_trie_pattern(keywords)}\b(?:\s*\b{_trie_pattern(lead)}\b)*", re.IGNORECASE
+        ) if keywords else None
+
+    def parse(self, text: str) -> ParsedMessage:
+        """Classify a message and extract its title, task IDs and status"""
+        hits = set()
+        task_ids = []
+        status = None
+
+        for number, phrase in self._pattern.findall(text.lower()):
+            if number:
+                task_ids.append(int(number))
+                continue
+            names, phrase_status = self._tags.get(phrase) or self._tags[" ".join(phrase.split())]
+            hits.update(names)
+            if status is None:
+                status = phrase_status
+
+        intent = next((name for name in self.priority if name in hits), None)
+        title = ""
+        if self.title_intent in hits:
+            # Only messages that can carry a title pay for the second match
+            title_end = self._title.search(text).end()
+            title = text[title_end:].strip(" \t\r\n.!?:;,'\"")
+            if title:
+                title = title[0].upper() + title[1:]
+
+        return ParsedMessage(intent, frozenset(hits), title, tuple(task_ids), status)
+
+
+# Shared rules for the task chatbots (TodoAgent, todo_api.py, simple_chatbot.py)
+task_intents = IntentEngine(
+    intents=[
+        ("add", ["add", "create", "new task", "remember", "note", "schedule"]),
+        ("list", ["show", "list", "see", "view", "display", "my tasks", "what", "what's"]),
+        ("complete", ["complete", "done", "finish", "mark as done"]),
+        ("delete", ["delete", "remove", "cancel", "eliminate"]),
+        ("update", ["update", "change", "modify", "edit", "rename"]),
+        # Last, so messages the other chatbots understood keep their intent
+        ("search", ["search", "find", "look for", "look up"]),
+    ],
+    statuses={
+        "pending": ["pending", "incomplete"],
+        "completed": ["completed", "done"],
+    },
+    fillers=[
+        "a task", "a new task", "task", "to", "that", "i need to", "i have to",
+    ],
+    title_intent="add",
+)
@@ -0,0 +1,77 @@
+"""
+Conversation summarizers for Phase 4 Todo AI Chatbot
+Fold new messages into a rolling summary so the agent input stays bounded
+"""
+
+import importlib
+import os
+import re
+from typing import Dict, List, Optional
+
+
+class Summarizer:
+    """
+    Summarizer interface
+    Implementations must be deterministic for the same inputs and keep
+    the returned summary bounded in size
+    """
+
+    def summarize(self, previous_summary: str, messages: List[Dict[str, str]]) -> str:
+        raise NotImplementedError
+
+
+class ExtractiveSummarizer(Summarizer):
+    """
+    Deterministic extractive summarizer for local use
+    Keeps the first sentence of each message and drops the oldest lines
+    once the summary reaches max_lines
+    """
+
+    _sentence_end = re.compile(r"(?<=[.!?])\s")
+
+    def __init__(self, max_lines: int = 30, max_line_chars: int = 120):
+        self.max_lines = max_lines
+        self.max_line_chars = max_line_chars
+
+    def _extract(self, message: Dict[str, str]) -> Optional[str]:
+        content = " ".join(message.get("content", "").split())
+        if not content:
+            return None
+        sentence = self._sentence_end.split(content, maxsplit=1)[0]
+        if len(sentence) > self.max_line_chars:
+            sentence = sentence[: self.max_line_chars - 3].rstrip() + "..."
+        return f"{message.get('role', 'user').capitalize()}: {sentence}"
+
+    def summarize(self, previous_summary: str, messages: List[Dict[str, str]]) -> str:
+        lines = previous_summary.splitlines() if previous_summary else []
+        for message in messages:
+            line = self._extract(message)
+            # Skip exact repeats of the last line (e.g. repeated "show my tasks")
+            if line and (not lines or lines[-1] != line):
+                lines.append(line)
+        return "\n".join(lines[-self.max_lines:])
+
+
+_summarizer: Optional[Summarizer] = None
+
+
+def set_summarizer(summarizer: Summarizer):
+    """Install the summarizer used for conversation summaries"""
+    global _summarizer
+    _summarizer = summarizer
+
+
+def get_summarizer() -> Summarizer:
+    """
+    Return the configured summarizer
+    CHAT_SUMMARIZER may name an implementation as "package.module:ClassName"
+    """
+    global _summarizer
+    if _summarizer is None:
+        spec = os.getenv("CHAT_SUMMARIZER")
+        if spec:
+            module_name, class_name = spec.split(":", 1)
+            _summarizer = getattr(importlib.import_module(module_name), class_name)()
+        else:
+            _summarizer = ExtractiveSummarizer()
+    return _summarizer
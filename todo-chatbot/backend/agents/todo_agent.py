@@ -3,107 +3,149 @@ Mock AI Agent for Phase 4 Todo AI Chatbot
 This implementation works without an API key and simulates AI behavior
 """
 
-import asyncio
-from typing import Dict, Any, List
+import logging
 import re
-from backend.mcp.v2.server import mcp_server
+import threading
+from typing import Awaitable, Callable, Dict, Any, List, Mapping, Optional
+from backend.mcp.v2.server import mcp_server, TOOL_FUNCTIONS
+from backend.agents.intents import task_intents
+from backend.agents.tool_schemas import build_tool_schemas
 import os
 
 
+logger = logging.getLogger(__name__)
+
+# Streaming callback: awaited with an event name and its JSON-serializable data
+EventCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# Word-sized response chunks, each keeping its trailing whitespace
+_RESPONSE_CHUNK = re.compile(r"\S+\s*")
+
+# Search words: what follows the search keyword and any filler ("find my tasks about ...")
+_SEARCH_QUERY = re.compile(
+    r"\b(?:search|find|look\s+for|look\s+up)\b"
+    r"(?:\s+(?:for|me|my|all|the|a|any|tasks?|about|with|called|named|mentioning)\b)*(.*)",
+    re.IGNORECASE | re.DOTALL
+)
+
+# Words around a task name in a command ("mark the groceries one as done")
+_NAME_NOISE = re.compile(
+    r"\b(?:complete|completed|done|finish|finished|mark|marked|as|delete|remove|cancel|eliminate|"
+    r"update|change|modify|edit|rename|the|a|an|my|task|tasks|one|item|please|called|named|"
+    r"with|i'm|im|i|am|have|off)\b",
+    re.IGNORECASE
+)
+# "rename <task> to <new title>"
+_UPDATE_TITLE = re.compile(
+    r"\b(?:update|change|modify|edit|rename)\b(?P<target>.*?)\s+(?:to|into)\s+(?P<title>.+)",
+    re.IGNORECASE | re.DOTALL
+)
+_PUNCTUATION = " \t\r\n.!?:;,'\""
+
+# A task named in a message is acted on when resolve_task's confidence reaches
+# RESOLVE_MIN_CONFIDENCE and beats the runner-up by RESOLVE_MIN_MARGIN
+RESOLVE_MIN_CONFIDENCE = float(os.getenv("RESOLVE_MIN_CONFIDENCE", "0.6"))
+RESOLVE_MIN_MARGIN = float(os.getenv("RESOLVE_MIN_MARGIN", "0.1"))
+
+
+def task_name(text: str) -> str:
+    """The task name left in a command once its command and filler words are removed"""
+    return " ".join(_NAME_NOISE.sub(" ", text).split()).strip(_PUNCTUATION)
+
+
+# Tool schemas, derived once from the MCP task tool signatures
+TOOL_SCHEMAS = build_tool_schemas(TOOL_FUNCTIONS)
+
+
 class TodoAgent:
     """
     AI Agent for managing todos through natural language
     Uses MCP tools to perform task operations
+    Holds no per-turn state, so one instance serves all concurrent requests
     """
     
-    def __init__(self):
-        # Check if API key is available
-        self.has_api_key = bool(os.getenv("GOOGLE_API_KEY"))
-        print(f"API Key Status: {'Available' if self.has_api_key else 'Not available - using mock responses'}")
+    def __init__(self, has_api_key: Optional[bool] = None, tool_schemas: Mapping[str, Any] = TOOL_SCHEMAS):
+        # Environment is read once here; the agent is built once per process
+        self.has_api_key = bool(os.getenv("GOOGLE_API_KEY")) if has_api_key is None else has_api_key
+        logger.info("API Key Status: %s", "Available" if self.has_api_key else "Not available - using mock responses")
         
-        # Define the tools available to the agent
-        self.tools_info = {
-            "add_task": {
-                "description": "Create a new task",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "user_id": {"type": "string", "description": "The user ID"},
-                        "title": {"type": "string", "description": "The task title"},
-                        "description": {"type": "string", "description": "The task description (optional)"}
-                    },
-                    "required": ["user_id", "title"]
-                }
-            },
-            "list_tasks": {
-                "description": "Retrieve tasks from the list",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "user_id": {"type": "string", "description": "The user ID"},
-                        "status": {"type": "string", "description": "Filter tasks by status: 'all', 'pending', 'completed' (optional)"}
-                    },
-                    "required": ["user_id"]
-                }
-            },
-            "complete_task": {
-                "description": "Mark a task as complete",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "user_id": {"type": "string", "description": "The user ID"},
-                        "task_id": {"type": "integer", "description": "The ID of the task to complete"}
-                    },
-                    "required": ["user_id", "task_id"]
-                }
-            },
-            "delete_task": {
-                "description": "Remove a task from the list",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "user_id": {"type": "string", "description": "The user ID"},
-                        "task_id": {"type": "integer", "description": "The ID of the task to delete"}
-                    },
-                    "required": ["user_id", "task_id"]
-                }
-            },
-            "update_task": {
-                "description": "Modify task title or description",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "user_id": {"type": "string", "description": "The user ID"},
-                        "task_id": {"type": "integer", "description": "The ID of the task to update"},
-                        "title": {"type": "string", "description": "The new task title (optional)"},
-                        "description": {"type": "string", "description": "The new task description (optional)"}
-                    },
-                    "required": ["user_id", "task_id"]
-                }
-            }
-        }
+        # Read-only tool schemas derived from the MCP task tools
+        self.tools_info = tool_schemas
     
-    async def run(self, user_message: str, user_id: str, conversation_history: List[Dict[str, str]]) -> Dict[str, Any]:
+    async def run(
+        self,
+        user_message: str,
+        user_id: str,
+        conversation_history: List[Dict[str, str]],
+        session=None,
+        on_event: Optional[EventCallback] = None
+    ) -> Dict[str, Any]:
         """
         Run the agent with the given user message and conversation history
+        Tool calls join the caller's transaction when a session is given
+        When on_event is given it is awaited with ("tool_start", ...), ("tool_end", ...)
+        and ("chunk", ...) events as the turn progresses
         """
-        # Simple keyword-based detection for task operations
-        user_msg_lower = user_message.lower()
+        result = await self._run(user_message, user_id, conversation_history, session, on_event)
+        if on_event is not None:
+            # The mock agent produces its reply at once; a model-backed agent
+            # emits these while tokens arrive
+            for chunk in _RESPONSE_CHUNK.findall(result["response"]):
+                await on_event("chunk", {"text": chunk})
+        return result
+    
+    async def _call_tool(self, name: str, params: Dict[str, Any], session, on_event: Optional[EventCallback]):
+        """Execute one MCP tool, reporting its start and finish to on_event"""
+        if on_event is not None:
+            await on_event("tool_start", {"name": name, "arguments": params})
+        result = await mcp_server.execute_tool(name, params, session=session)
+        if on_event is not None:
+            await on_event("tool_end", {"name": name, "error": result.error})
+        return result
+    
+    async def _resolve_target(self, text: str, user_id: str, status: str, session, on_event, tool_calls: List[Dict[str, str]]):
+        """
+        Resolve the task named in a command with resolve_task
+        Returns (task_id, title, None) for a confident match, (None, None, reply)
+        when the user must be asked, and (None, None, None) when no name was given
+        """
+        name = task_name(text)
+        if not name:
+            return None, None, None
         
-        # Detect intent based on keywords
-        if any(keyword in user_msg_lower for keyword in ["add", "create", "new task", "remember", "note", "schedule"]):
-            # Extract potential task title from the message
-            # Remove common phrases to isolate the task
-            task_text = user_msg_lower
-            for phrase in ["add", "create", "new task to", "remember to", "note to", "i need to", "i have to"]:
-                task_text = task_text.replace(phrase, "").strip()
-            
-            # Use the remaining text as the task title
-            title = task_text.capitalize() if task_text else "New Task"
+        params = {"user_id": user_id, "name": name, "status": status}
+        result = await self._call_tool("resolve_task", params, session, on_event)
+        tool_calls.append({"name": "resolve_task", "arguments": str(params)})
+        
+        if result.error:
+            return None, None, f"Sorry, I couldn't look up that task: {result.error}"
+        found = result.result
+        if found.get("status") == "error" or found["confidence"] < RESOLVE_MIN_CONFIDENCE:
+            return None, None, f"I couldn't find a task called '{name}'. Please specify the task number."
+        
+        best, *others = found["candidates"]
+        close = [c for c in others if best["confidence"] - c["confidence"] < RESOLVE_MIN_MARGIN]
+        # An exact title settles a tie ("buy groceries" next to "buy groceries for the party")
+        if close and best["title"].casefold() != name.casefold():
+            options = " or ".join(f"#{c['task_id']} '{c['title']}'" for c in [best] + close)
+            return None, None, f"Did you mean {options}? Please tell me the task number."
+        return best["task_id"], best["title"], None
+    
+    async def _run(self, user_message: str, user_id: str, conversation_history: List[Dict[str, str]], session, on_event) -> Dict[str, Any]:
+        # One pass over the message: intent, title, task IDs and status
+        parsed = task_intents.parse(user_message)
+        intent = parsed.intent
+        # A search phrase outranks the list keywords it often comes with ("find my tasks about ...")
+        if intent == "list" and "search" in parsed.hits:
+            intent = "search"
+        
+        if intent == "add":
+            # Use the text after the command words as the task title
+            title = parsed.title or "New Task"
             
             # Execute add_task
             params = {"user_id": user_id, "title": title}
-            result = await mcp_server.execute_tool("add_task", params)
+            result = await self._call_tool("add_task", params, session, on_event)
             
             if result.error:
                 response = f"Sorry, I couldn't add the task: {result.error}"
@@ -118,113 +160,176 @@ class TodoAgent:
                 }]
             }
         
-        elif any(keyword in user_msg_lower for keyword in ["show", "list", "see", "view", "display", "my tasks", "what"]):
+        elif intent == "list":
             # Determine status to filter by
-            status = "all"
-            if "pending" in user_msg_lower or "incomplete" in user_msg_lower:
-                status = "pending"
-            elif "completed" in user_msg_lower or "done" in user_msg_lower:
-                status = "completed"
+            status = parsed.status or "all"
             
-            params = {"user_id": user_id, "status": status}
-            result = await mcp_server.execute_tool("list_tasks", params)
+            # Counts come from one grouped query; only the titles shown are loaded
+            count_params = {"user_id": user_id}
+            counts = await self._call_tool("count_tasks", count_params, session, on_event)
+            tool_calls = [{"name": "count_tasks", "arguments": str(count_params)}]
             
-            if result.error:
-                response = f"Sorry, I couldn't retrieve your tasks: {result.error}"
+            if counts.error:
+                response = f"Sorry, I couldn't retrieve your tasks: {counts.error}"
             else:
-                tasks = result.result
-                if not tasks:
+                total = counts.result["total" if status == "all" else status]
+                if not total:
                     if status == "all":
                         response = "You don't have any tasks."
                     else:
                         response = f"You don't have any {status} tasks."
                 else:
-                    task_list = ", ".join([f"'{task['title']}'" for task in tasks[:5]])  # Limit to first 5
-                    if len(tasks) > 5:
-                        task_list += f" and {len(tasks)-5} more"
-                    response = f"Your {status} tasks are: {task_list}."
+                    params = {"user_id": user_id, "status": status, "limit": 5, "fields": ["title"]}
+                    result = await self._call_tool("list_tasks", params, session, on_event)
+                    tool_calls.append({"name": "list_tasks", "arguments": str(params)})
+                    
+                    if result.error:
+                        response = f"Sorry, I couldn't retrieve your tasks: {result.error}"
+                    else:
+                        tasks = result.result["tasks"]
+                        task_list = ", ".join([f"'{task['title']}'" for task in tasks])  # First page of 5
+                        if total > len(tasks):
+                            task_list += f" and {total - len(tasks)} more"
+                        response = f"Your {status} tasks are: {task_list}."
             
             return {
                 "response": response,
-                "tool_calls": [{
-                    "name": "list_tasks",
-                    "arguments": str(params)
-                }]
+                "tool_calls": tool_calls
             }
         
-        elif any(keyword in user_msg_lower for keyword in ["complete", "done", "finish", "mark as done"]):
-            # Try to extract task ID from the message
-            task_id = None
-            # Look for numbers in the message that might represent task IDs
-            numbers = re.findall(r'\d+', user_msg_lower)
-            if numbers:
-                try:
-                    task_id = int(numbers[0])
-                except ValueError:
-                    pass
+        elif intent == "complete":
+            # Numbers in the message are taken as task IDs, anything else as a task name
+            tool_calls = []
+            task_id = parsed.task_ids[0] if parsed.task_ids else None
+            title = None
+            if task_id is None:
+                task_id, title, reply = await self._resolve_target(user_message, user_id, "pending", session, on_event, tool_calls)
+                if reply:
+                    return {"response": reply, "tool_calls": tool_calls}
             
             if task_id is not None:
                 params = {"user_id": user_id, "task_id": task_id}
-                result = await mcp_server.execute_tool("complete_task", params)
+                result = await self._call_tool("complete_task", params, session, on_event)
+                tool_calls.append({"name": "complete_task", "arguments": str(params)})
                 
                 if result.error:
                     response = f"Sorry, I couldn't complete the task: {result.error}"
+                elif title:
+                    response = f"I've marked '{title}' (task #{task_id}) as completed."
                 else:
                     response = f"I've marked task #{task_id} as completed."
                 
                 return {
                     "response": response,
-                    "tool_calls": [{
-                        "name": "complete_task",
-                        "arguments": str(params)
-                    }]
+                    "tool_calls": tool_calls
                 }
             else:
-                # If no specific task ID found, suggest listing tasks first
+                # No task ID or name in the message
                 return {
-                    "response": "Which task would you like to mark as complete? Please specify the task number or list your tasks first.",
+                    "response": "Which task would you like to mark as complete? Please specify the task number or name.",
                     "tool_calls": []
                 }
         
-        elif any(keyword in user_msg_lower for keyword in ["delete", "remove", "cancel", "eliminate"]):
-            # Try to extract task ID from the message
-            task_id = None
-            # Look for numbers in the message that might represent task IDs
-            numbers = re.findall(r'\d+', user_msg_lower)
-            if numbers:
-                try:
-                    task_id = int(numbers[0])
-                except ValueError:
-                    pass
+        elif intent == "delete":
+            # Numbers in the message are taken as task IDs, anything else as a task name
+            tool_calls = []
+            task_id = parsed.task_ids[0] if parsed.task_ids else None
+            title = None
+            if task_id is None:
+                task_id, title, reply = await self._resolve_target(user_message, user_id, "all", session, on_event, tool_calls)
+                if reply:
+                    return {"response": reply, "tool_calls": tool_calls}
             
             if task_id is not None:
                 params = {"user_id": user_id, "task_id": task_id}
-                result = await mcp_server.execute_tool("delete_task", params)
+                result = await self._call_tool("delete_task", params, session, on_event)
+                tool_calls.append({"name": "delete_task", "arguments": str(params)})
                 
                 if result.error:
                     response = f"Sorry, I couldn't delete the task: {result.error}"
+                elif title:
+                    response = f"I've deleted '{title}' (task #{task_id})."
                 else:
                     response = f"I've deleted task #{task_id}."
                 
                 return {
                     "response": response,
-                    "tool_calls": [{
-                        "name": "delete_task",
-                        "arguments": str(params)
-                    }]
+                    "tool_calls": tool_calls
                 }
             else:
-                # If no specific task ID found, suggest listing tasks first
+                # No task ID or name in the message
+                return {
+                    "response": "Which task would you like to delete? Please specify the task number or name.",
+                    "tool_calls": []
+                }
+        
+        elif intent == "update":
+            # "rename <task number or name> to <new title>"
+            match = _UPDATE_TITLE.search(user_message)
+            new_title = match.group("title").strip(_PUNCTUATION) if match else ""
+            if not new_title:
                 return {
-                    "response": "Which task would you like to delete? Please specify the task number or list your tasks first.",
+                    "response": "To update a task, tell me which task and its new title, e.g. 'Rename the groceries task to buy milk'.",
                     "tool_calls": []
                 }
+            
+            tool_calls = []
+            target = match.group("target")
+            target_ids = re.findall(r"\d+", target)
+            if target_ids:
+                task_id = int(target_ids[0])
+            else:
+                task_id, _, reply = await self._resolve_target(target, user_id, "all", session, on_event, tool_calls)
+                if reply:
+                    return {"response": reply, "tool_calls": tool_calls}
+                if task_id is None:
+                    return {
+                        "response": "Which task would you like to update? Please specify the task number or name.",
+                        "tool_calls": []
+                    }
+            
+            params = {"user_id": user_id, "task_id": task_id, "title": new_title}
+            result = await self._call_tool("update_task", params, session, on_event)
+            tool_calls.append({"name": "update_task", "arguments": str(params)})
+            
+            if result.error:
+                response = f"Sorry, I couldn't update the task: {result.error}"
+            else:
+                response = f"I've renamed task #{task_id} to '{new_title}'."
+            
+            return {
+                "response": response,
+                "tool_calls": tool_calls
+            }
         
-        elif any(keyword in user_msg_lower for keyword in ["update", "change", "modify", "edit", "rename"]):
-            # This is more complex, so we'll just respond with instructions
+        elif intent == "search":
+            match = _SEARCH_QUERY.search(user_message)
+            query = match.group(1).strip(" \t\r\n.!?:;,'\"") if match else ""
+            if not query:
+                return {
+                    "response": "What would you like me to search for? For example: 'Find tasks about groceries'.",
+                    "tool_calls": []
+                }
+            
+            params = {"user_id": user_id, "query": query, "limit": 5}
+            result = await self._call_tool("search_tasks", params, session, on_event)
+            
+            if result.error or result.result.get("status") == "error":
+                response = f"Sorry, I couldn't search your tasks: {result.error or result.result['error']}"
+            elif not result.result["tasks"]:
+                response = f"I couldn't find any tasks matching '{query}'."
+            else:
+                tasks = result.result["tasks"]
+                task_list = ", ".join(f"#{task['id']} '{task['title']}'" for task in tasks)
+                more = " (showing the best 5)" if result.result["next_cursor"] else ""
+                response = f"Tasks matching '{query}'{more}: {task_list}."
+            
             return {
-                "response": "To update a task, please specify which task by number and what changes you'd like to make.",
-                "tool_calls": []
+                "response": response,
+                "tool_calls": [{
+                    "name": "search_tasks",
+                    "arguments": str(params)
+                }]
             }
         
         else:
@@ -232,4 +337,27 @@ class TodoAgent:
             return {
                 "response": f"I understand you said: '{user_message}'. I can help you manage tasks by adding, listing, completing, or deleting them. Try saying something like 'Add a task to buy groceries' or 'Show me my tasks'.",
                 "tool_calls": []
-            }
\ No newline at end of file
+            }
+
+
+_agent: Optional[TodoAgent] = None
+_agent_lock = threading.Lock()
+
+
+def get_agent() -> TodoAgent:
+    """
+    Return the process-wide agent, creating it on first use
+    Called at app startup and used as a FastAPI dependency per request
+    """
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                _agent = TodoAgent()
+    return _agent
+
+
+def set_agent(agent: TodoAgent):
+    """Install the agent returned by get_agent (e.g. a differently configured one)"""
+    global _agent
+    _agent = agent
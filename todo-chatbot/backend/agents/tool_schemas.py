@@ -0,0 +1,102 @@
+"""
+Tool schemas for the Phase 4 Todo AI agent
+Derived once from the MCP task tool signatures and docstrings, so the agent's
+tool list cannot drift from the tools themselves
+"""
+
+import inspect
+import re
+import typing
+from typing import Any, Callable, Dict, Mapping
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict; still JSON-serializable, unlike MappingProxyType
+    Shared across requests, so it must never be mutated in place
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Tool schemas are read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __hash__(self):
+        return id(self)
+
+
+def freeze(value: Any) -> Any:
+    """Recursively turn dicts into FrozenDicts and lists into tuples"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+
+# "name (type, required)" or "name (type, optional: note)" in a tool docstring;
+# "required: note" works the same way
+_PARAMETER_DOC = re.compile(r"(\w+) \(([^()]*(?:\([^()]*\)[^()]*)*)\)")
+_PARAMETER_DETAIL = re.compile(r"(.*?),\s*(?:required|optional)(?::\s*(.*))?$", re.S)
+
+
+def _json_schema(annotation) -> Dict[str, Any]:
+    """JSON schema for a tool parameter annotation"""
+    origin = typing.get_origin(annotation)
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if origin is typing.Union and len(args) == 1:
+        return _json_schema(args[0])
+    if origin in (list, typing.List):
+        return {"type": "array", "items": _json_schema(args[0]) if args else {}}
+    if origin in (dict, typing.Dict) or annotation is dict:
+        return {"type": "object"}
+    return {"type": _JSON_TYPES.get(annotation, "string")}
+
+
+def _docstring_section(doc: str, name: str) -> str:
+    match = re.search(rf"{name}:(.*?)(?:\n\s*\w+:|\Z)", doc, re.S)
+    return " ".join(match.group(1).split()) if match else ""
+
+
+def tool_schema(fn: Callable) -> Dict[str, Any]:
+    """
+    Build one tool schema from an MCP tool function
+    Types and required flags come from the signature, descriptions from the
+    Purpose/Parameters lines of the docstring
+    """
+    doc = inspect.getdoc(fn) or ""
+    notes = {}
+    for name, detail in _PARAMETER_DOC.findall(_docstring_section(doc, "Parameters")):
+        match = _PARAMETER_DETAIL.match(detail)
+        if not match:
+            continue
+        # Keep the note after "required:"/"optional:", or a type that says more than one word
+        type_text, note = match.groups()
+        if note or " " in type_text:
+            notes[name] = note or type_text
+
+    hints = typing.get_type_hints(fn)
+    properties = {}
+    required = []
+    for name, param in inspect.signature(fn).parameters.items():
+        if name == "session":
+            continue
+        schema = _json_schema(hints.get(name, str))
+        if name in notes:
+            schema["description"] = notes[name]
+        properties[name] = schema
+        if param.default is inspect.Parameter.empty:
+            required.append(name)
+
+    return {
+        "description": _docstring_section(doc, "Purpose"),
+        "parameters": {"type": "object", "properties": properties, "required": required},
+    }
+
+
+def build_tool_schemas(functions: Mapping[str, Callable]) -> FrozenDict:
+    """Schemas for every tool, frozen so one copy can be shared by all requests"""
+    return freeze({name: tool_schema(fn) for name, fn in functions.items()})
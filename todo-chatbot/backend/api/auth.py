@@ -7,8 +7,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from backend.database.connection import get_db
-from backend.mcp.users import create_user, authenticate_user, get_user_by_email
+from backend.mcp.users import authenticate_user, create_user, get_user_by_email
 from backend.auth.utils import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from backend.auth.passwords import password_hasher, PasswordHasherBusy
 from pydantic import BaseModel
 
 
@@ -25,6 +26,15 @@ class UserLogin(BaseModel):
     password: str
 
 
+def _auth_busy() -> HTTPException:
+    """Shed auth load instead of queueing behind a full hashing pool"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/signup")
 async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     """
@@ -40,8 +50,16 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
     
+    # Release the pooled connection while the hash runs, then hash in the
+    # process pool so the event loop stays free for other requests
+    db.rollback()
+    try:
+        hashed_password = await password_hasher.hash(user_data.password)
+    except PasswordHasherBusy:
+        raise _auth_busy()
+    
     # Create new user with hashed password
-    user = create_user(db, user_data.email, user_data.password)
+    user = create_user(db, user_data.email, hashed_password=hashed_password)
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -64,7 +82,11 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     User login endpoint
     Following Spec-4: Users can log in and receive a session or token
     """
-    user = authenticate_user(db, user_credentials.email, user_credentials.password)
+    try:
+        user = await authenticate_user(db, user_credentials.email, user_credentials.password)
+    except PasswordHasherBusy:
+        raise _auth_busy()
+    
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
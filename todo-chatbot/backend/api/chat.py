@@ -10,20 +10,28 @@ Following Spec-4: Authentication & Authorization
 - Each todo is linked to a single user
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from backend.database.connection import get_db
 from backend.mcp.tasks import get_tasks_by_user, create_task
+from backend.mcp.pagination import DEFAULT_SORT, TASK_PAGE_MAX, TASK_PAGE_SIZE, InvalidPageRequest, parse_fields
 from backend.middleware.auth import get_current_user
 from backend.models.user import User
-from typing import List
+from typing import List, Optional
 
 
 router = APIRouter()
 
+# conversation_history field -> task column
+HISTORY_FIELDS = {"task_id": "id", "title": "title", "status": "status", "created_at": "created_at"}
+
 
 @router.get("/chat")
 async def chat(
+    limit: int = Query(TASK_PAGE_SIZE, ge=1, le=TASK_PAGE_MAX),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    sort: str = Query(DEFAULT_SORT, description="created_at, -created_at, title or -title"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of task_id, title, status, created_at"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -37,7 +45,15 @@ async def chat(
     """
     # Fetch conversation history from database for the authenticated user
     # According to constitution: "Conversation history is fetched from the database"
-    tasks = get_tasks_by_user(db, current_user.id)
+    # One keyset page at a time; pass next_cursor back for the following page
+    try:
+        names = parse_fields(fields, HISTORY_FIELDS, HISTORY_FIELDS)
+        page = get_tasks_by_user(
+            db, current_user.id, limit=limit, cursor=cursor, sort=sort,
+            fields=[HISTORY_FIELDS[name] for name in names]
+        )
+    except InvalidPageRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Return conversation context rebuilt from database
     # According to constitution: "Conversation context is rebuilt per request"
@@ -45,13 +61,10 @@ async def chat(
         "user_id": current_user.id,
         "email": current_user.email,
         "conversation_history": [
-            {
-                "task_id": task.id,
-                "title": task.title,
-                "status": task.status,
-                "created_at": task.created_at
-            } for task in tasks
+            {name: getattr(task, HISTORY_FIELDS[name]) for name in names}
+            for task in page.items
         ],
+        "next_cursor": page.next_cursor,
         "stateless": True,
         "constitution_compliant": True
     }
@@ -4,20 +4,45 @@ Stateless endpoint that persists conversation state to database
 Integrates with existing authentication system
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from typing import Optional, List, Dict, Any
-from backend.database.v2_connection import get_session
-from backend.models.v2.models import Conversation, Message, MessageRole
-from backend.agents.todo_agent import TodoAgent
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import AsyncGenerator, Optional, List, Dict, Any, Union
+from backend.database.v2_connection import dispose_async_engine, engine, get_chat_session, run_in_session
+from backend.models.v2.models import Conversation, ConversationSummary, Message, MessageRole
+from backend.agents.todo_agent import TodoAgent, get_agent
+from backend.agents.summarizer import get_summarizer
+from backend.auth.passwords import password_hasher
 from pydantic import BaseModel
 from datetime import datetime
+import asyncio
+import json
+import logging
+import os
+import anyio
 from backend.middleware.auth import get_current_user
 from backend.models.user import User
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# Build the agent (env, tool schemas) once when the app starts, not per request
+router.add_event_handler("startup", get_agent)
+router.add_event_handler("shutdown", dispose_async_engine)
+router.add_event_handler("shutdown", password_hasher.shutdown)
+
+# Bounded history window handed to the agent on every turn
+CHAT_HISTORY_LIMIT = int(os.getenv("CHAT_HISTORY_LIMIT", "20"))
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000"))
+
+# Fold new messages into the rolling summary every K messages
+CHAT_SUMMARY_EVERY = int(os.getenv("CHAT_SUMMARY_EVERY", "20"))
+CHAT_SUMMARY_BATCH = 500
+
 
 class ChatRequest(BaseModel):
     """Request model for chat endpoint"""
@@ -32,11 +57,191 @@ class ChatResponse(BaseModel):
     tool_calls: List[Dict[str, Any]]
 
 
+class MessageOut(BaseModel):
+    """A single stored chat message"""
+    id: int
+    role: str
+    content: str
+    created_at: Optional[datetime] = None
+
+
+class MessagePage(BaseModel):
+    """One page of conversation history, oldest first"""
+    conversation_id: int
+    messages: List[MessageOut]
+    next_before: Optional[int] = None
+    # Watermark for the next `since_id` call: the newest id the client now holds
+    next_since: Optional[int] = None
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+def fetch_messages_page(session: Session, conversation_id: int, before: Optional[int], limit: int) -> List[Message]:
+    """
+    Keyset page of messages older than `before`, returned oldest first
+    Uses the (conversation_id, id) index, so cost does not grow with history length
+    """
+    statement = select(Message).where(Message.conversation_id == conversation_id)
+    if before is not None:
+        statement = statement.where(Message.id < before)
+    statement = statement.order_by(Message.id.desc()).limit(limit)
+    return list(reversed(session.exec(statement).all()))
+
+
+def fetch_messages_since(session: Session, conversation_id: int, since_id: int, limit: int) -> List[Message]:
+    """
+    Up to `limit` messages newer than `since_id`, oldest first
+    A range scan of the (conversation_id, id) index starting at the watermark
+    """
+    statement = (
+        select(Message)
+        .where(Message.conversation_id == conversation_id, Message.id > since_id)
+        .order_by(Message.id)
+        .limit(limit)
+    )
+    return list(session.exec(statement).all())
+
+
+def load_history_window(session: Session, conversation_id: int, before: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    Load the most recent messages for the agent, bounded by
+    CHAT_HISTORY_LIMIT messages and CHAT_HISTORY_TOKEN_BUDGET tokens
+    """
+    messages = fetch_messages_page(session, conversation_id, before, CHAT_HISTORY_LIMIT)
+    
+    # Keep the newest messages that fit the token budget
+    window = []
+    budget = CHAT_HISTORY_TOKEN_BUDGET
+    for msg in reversed(messages):
+        budget -= _estimate_tokens(msg.content)
+        if budget < 0 and window:
+            break
+        window.append({"role": msg.role.value, "content": msg.content})
+    window.reverse()
+    return window
+
+
+def refresh_conversation_summary(conversation_id: int):
+    """
+    Fold messages newer than the summary watermark into the rolling summary
+    Runs as a background task after the response is sent
+    """
+    summarizer = get_summarizer()
+    with Session(engine) as session:
+        summary = session.get(ConversationSummary, conversation_id)
+        if summary is None:
+            summary = ConversationSummary(conversation_id=conversation_id)
+        
+        while True:
+            statement = select(Message).where(
+                Message.conversation_id == conversation_id,
+                Message.id > summary.last_message_id
+            ).order_by(Message.id).limit(CHAT_SUMMARY_BATCH)
+            messages = session.exec(statement).all()
+            if not messages:
+                break
+            
+            summary.summary = summarizer.summarize(
+                summary.summary,
+                [{"role": msg.role.value, "content": msg.content} for msg in messages]
+            )
+            summary.last_message_id = messages[-1].id
+            summary.message_count += len(messages)
+            summary.updated_at = datetime.utcnow()
+            session.add(summary)
+            session.commit()
+
+
+def _start_turn(session: Session, conversation_id: Optional[int], user_id: str):
+    """
+    Look up the conversation and load the history handed to the agent
+    Runs on a blocking Session or inside AsyncSession.run_sync
+    Read-only: every write of the turn happens in _finish_turn, so on SQLite the
+    write lock is not held while the agent is thinking
+    """
+    if not conversation_id:
+        # New conversation: created when the turn commits
+        return None, []
+    
+    # Try to get existing conversation
+    conversation = session.get(Conversation, conversation_id)
+    if not conversation or conversation.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Conversation not found or unauthorized")
+    
+    # Fetch the recent history window
+    conversation_history = load_history_window(session, conversation.id)
+    
+    # Older context comes from the rolling summary instead of the full transcript
+    summary = session.get(ConversationSummary, conversation.id)
+    if summary and summary.summary:
+        conversation_history.insert(0, {
+            "role": "system",
+            "content": f"Summary of earlier conversation:\n{summary.summary}"
+        })
+    
+    return conversation, conversation_history
+
+
+def _finish_turn(
+    session: Session,
+    conversation: Optional[Conversation],
+    user_id: str,
+    user_content: str,
+    assistant_content: str
+):
+    """
+    Store the conversation, both messages and the timestamp bump, then commit the turn
+    Tool side effects are already flushed into the same transaction
+    Returns the conversation and whether the rolling summary needs a refresh
+    """
+    if conversation is None:
+        # Create new conversation
+        conversation = Conversation(user_id=user_id)
+        session.add(conversation)
+        session.flush()
+    
+    # Store user message and assistant response in database
+    session.add(Message(
+        user_id=user_id,
+        conversation_id=conversation.id,
+        role=MessageRole.user,
+        content=user_content
+    ))
+    session.add(Message(
+        user_id=user_id,
+        conversation_id=conversation.id,
+        role=MessageRole.assistant,
+        content=assistant_content
+    ))
+    
+    # Update conversation timestamp
+    conversation.updated_at = datetime.utcnow()
+    session.add(conversation)
+    
+    summary = session.get(ConversationSummary, conversation.id)
+    watermark = summary.last_message_id if summary else 0
+    pending = session.exec(
+        select(func.count()).select_from(Message).where(
+            Message.conversation_id == conversation.id,
+            Message.id > watermark
+        )
+    ).one()
+    
+    # Single commit for the whole turn: conversation, messages and tool side effects
+    session.commit()
+    return conversation, pending >= CHAT_SUMMARY_EVERY
+
+
 @router.post("/chat")
 async def chat_endpoint(
     request: ChatRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Union[AsyncSession, Session] = Depends(get_chat_session),
+    agent: TodoAgent = Depends(get_agent)
 ):
     """
     Chat endpoint following the specification:
@@ -48,80 +253,249 @@ async def chat_endpoint(
     1. Receive user message
     2. Fetch conversation history from database
     3. Build message array for agent (history + new message)
-    4. Store user message in database
-    5. Run agent with MCP tools
-    6. Store assistant response in database
-    7. Return response to client
-    8. Server holds NO state (ready for next request)
+    4. Run agent with MCP tools
+    5. Store user message and assistant response in database
+    6. Return response to client
+    7. Server holds NO state (ready for next request)
+    
+    With USE_ASYNC_DB the database work is awaited on the event loop
+    The agent receives the rolling summary plus the recent history window
+    The whole turn is one unit of work with a single commit
     """
     
     # Use the authenticated user's ID
     user_id = str(current_user.id)  # Convert to string as required by new models
     
-    # Get or create conversation
-    if request.conversation_id:
-        # Try to get existing conversation
-        conversation = session.get(Conversation, request.conversation_id)
-        if not conversation or conversation.user_id != user_id:
-            raise HTTPException(status_code=404, detail="Conversation not found or unauthorized")
-    else:
-        # Create new conversation
-        conversation = Conversation(user_id=user_id)
-        session.add(conversation)
-        session.commit()
-        session.refresh(conversation)
+    try:
+        conversation, conversation_history = await run_in_session(
+            session, _start_turn, request.conversation_id, user_id
+        )
+        
+        # Run the shared AI agent; its tool calls share this turn's transaction
+        result = await agent.run(
+            user_message=request.message,
+            user_id=user_id,
+            conversation_history=conversation_history,
+            session=session
+        )
+        
+        conversation, needs_summary = await run_in_session(
+            session, _finish_turn, conversation, user_id, request.message, result["response"]
+        )
+    except Exception:
+        # Nothing from a failed turn is persisted
+        await run_in_session(session, lambda s: s.rollback())
+        raise
     
-    # Store user message in database
-    user_message = Message(
-        user_id=user_id,
+    if needs_summary:
+        # Summaries are refreshed off the request path
+        background_tasks.add_task(refresh_conversation_summary, conversation.id)
+    
+    # Return response
+    return ChatResponse(
         conversation_id=conversation.id,
-        role=MessageRole.user,
-        content=request.message
+        response=result["response"],
+        tool_calls=result["tool_calls"]
     )
-    session.add(user_message)
+
+
+def _open_conversation(session: Session, user_id: str) -> Conversation:
+    """
+    Create and commit an empty conversation so a stream can announce its id first
+    """
+    conversation = Conversation(user_id=user_id)
+    session.add(conversation)
     session.commit()
+    return conversation
+
+
+def _abandon_turn(session: Session, opened_conversation_id: Optional[int]):
+    """
+    Roll back a failed or aborted streamed turn, and delete the conversation
+    _open_conversation created for it if no messages were saved to it
+    """
+    session.rollback()
+    if opened_conversation_id is None:
+        return
+    has_messages = session.exec(
+        select(Message.id).where(Message.conversation_id == opened_conversation_id).limit(1)
+    ).first()
+    if has_messages is None:
+        conversation = session.get(Conversation, opened_conversation_id)
+        if conversation is not None:
+            session.delete(conversation)
+            session.commit()
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _stream_turn(
+    sessions: AsyncGenerator,
+    session: Union[AsyncSession, Session],
+    conversation: Conversation,
+    conversation_history: List[Dict[str, str]],
+    message: str,
+    user_id: str,
+    agent: TodoAgent,
+    state: Dict[str, Any],
+    opened_conversation_id: Optional[int] = None
+):
+    """
+    Run one chat turn, yielding SSE events as the agent makes progress
+    The turn still commits once, after the last chunk has been produced;
+    a turn that fails or is aborted leaves nothing behind, not even the
+    conversation opened for it (opened_conversation_id)
+    """
+    queue: asyncio.Queue = asyncio.Queue()
     
-    # Fetch conversation history from database
-    statement = select(Message).where(
-        Message.conversation_id == conversation.id
-    ).order_by(Message.created_at)
-    messages_db = session.exec(statement).all()
-    
-    # Convert to the format expected by the agent
-    conversation_history = [
-        {
-            "role": msg.role.value,
-            "content": msg.content
-        }
-        for msg in messages_db[:-1]  # Exclude the current message
-    ]
-    
-    # Run the AI agent
-    agent = TodoAgent()
-    result = await agent.run(
-        user_message=request.message,
-        user_id=user_id,
-        conversation_history=conversation_history
-    )
+    async def emit(event: str, data: Dict[str, Any]):
+        await queue.put(_sse(event, data))
     
-    # Store assistant response in database
-    assistant_message = Message(
-        user_id=user_id,
-        conversation_id=conversation.id,
-        role=MessageRole.assistant,
-        content=result["response"]
-    )
-    session.add(assistant_message)
-    session.commit()
+    task = None
+    settled = False
+    try:
+        yield _sse("conversation", {"conversation_id": conversation.id})
+        
+        task = asyncio.create_task(agent.run(
+            user_message=message,
+            user_id=user_id,
+            conversation_history=conversation_history,
+            session=session,
+            on_event=emit
+        ))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        while (event := await queue.get()) is not None:
+            yield event
+        result = task.result()
+        
+        conversation, state["needs_summary"] = await run_in_session(
+            session, _finish_turn, conversation, user_id, message, result["response"]
+        )
+        settled = True
+        yield _sse("done", {
+            "conversation_id": conversation.id,
+            "response": result["response"],
+            "tool_calls": result["tool_calls"]
+        })
+    except Exception as exc:
+        # Nothing from a failed turn is persisted
+        settled = True
+        await run_in_session(session, _abandon_turn, opened_conversation_id)
+        # Internal error text (SQL, paths) stays in the log, as with POST /api/chat
+        logger.exception("Streamed chat turn failed")
+        detail = exc.detail if isinstance(exc, HTTPException) else "Internal Server Error"
+        yield _sse("error", {"detail": detail})
+    finally:
+        # Shielded: when the client disconnects the stream is cancelled, and
+        # the session must still be rolled back and returned to the pool
+        with anyio.CancelScope(shield=True):
+            if task is not None and not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+            if not settled:
+                await run_in_session(session, _abandon_turn, opened_conversation_id)
+            await sessions.aclose()
+
+
+@router.post("/chat/stream")
+async def chat_stream_endpoint(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    agent: TodoAgent = Depends(get_agent)
+):
+    """
+    Streaming variant of POST /api/chat using Server-Sent Events
+    Events, in order: conversation (id), tool_start/tool_end per tool call,
+    chunk per piece of the response, then done (or error)
+    The messages are persisted when the stream completes; a new conversation
+    is created up front so its id can be sent first, and deleted again if the
+    turn fails or the client disconnects before it completes
+    """
+    user_id = str(current_user.id)
     
-    # Update conversation timestamp
-    conversation.updated_at = datetime.utcnow()
-    session.add(conversation)
-    session.commit()
+    # The session lives for the whole stream, so it is opened here rather than
+    # through a dependency that could close before the body is sent
+    sessions = get_chat_session()
+    session = await sessions.__anext__()
+    try:
+        conversation, conversation_history = await run_in_session(
+            session, _start_turn, request.conversation_id, user_id
+        )
+        opened_conversation_id = None
+        if conversation is None:
+            conversation = await run_in_session(session, _open_conversation, user_id)
+            opened_conversation_id = conversation.id
+    except Exception:
+        await sessions.aclose()
+        raise
     
-    # Return response
-    return ChatResponse(
-        conversation_id=conversation.id,
-        response=result["response"],
-        tool_calls=result["tool_calls"]
-    )
\ No newline at end of file
+    state: Dict[str, Any] = {"needs_summary": False}
+    
+    def refresh_summary_if_needed():
+        if state["needs_summary"]:
+            refresh_conversation_summary(conversation.id)
+    
+    return StreamingResponse(
+        _stream_turn(
+            sessions, session, conversation, conversation_history, request.message, user_id, agent, state,
+            opened_conversation_id
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(refresh_summary_if_needed)
+    )
+
+
+def _get_messages_page(
+    session: Session,
+    conversation_id: int,
+    user_id: str,
+    before: Optional[int],
+    since_id: Optional[int],
+    limit: int
+) -> MessagePage:
+    conversation = session.get(Conversation, conversation_id)
+    if not conversation or conversation.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Conversation not found or unauthorized")
+    
+    if since_id is not None:
+        messages = fetch_messages_since(session, conversation_id, since_id, limit)
+        next_before = None
+    else:
+        messages = fetch_messages_page(session, conversation_id, before, limit)
+        # A full page means there may be older messages to fetch
+        next_before = messages[0].id if len(messages) == limit else None
+    return MessagePage(
+        conversation_id=conversation_id,
+        messages=[
+            MessageOut(id=msg.id, role=msg.role.value, content=msg.content, created_at=msg.created_at)
+            for msg in messages
+        ],
+        next_before=next_before,
+        # Unchanged when nothing is new, so the client can always store it
+        next_since=messages[-1].id if messages else since_id
+    )
+
+
+@router.get("/conversations/{conversation_id}/messages", response_model=MessagePage)
+async def get_conversation_messages(
+    conversation_id: int,
+    before: Optional[int] = Query(None, description="Return messages with an id lower than this cursor"),
+    since_id: Optional[int] = Query(None, ge=0, description="Return messages with an id higher than this watermark"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    session: Union[AsyncSession, Session] = Depends(get_chat_session)
+):
+    """
+    Page through a conversation's history, newest page first
+    Pass `next_before` from the previous page to load older messages, or
+    `since_id` (0 for the start) to get only messages newer than the client's
+    watermark; a full page means more are waiting, so call again with `next_since`
+    """
+    if before is not None and since_id is not None:
+        raise HTTPException(status_code=400, detail="Pass either before or since_id, not both")
+    user_id = str(current_user.id)
+    return await run_in_session(session, _get_messages_page, conversation_id, user_id, before, since_id, limit)
@@ -0,0 +1,106 @@
+"""
+Password hashing service for Phase 4 system
+Runs bcrypt in a dedicated process pool so auth traffic never blocks the event loop
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+
+# bcrypt cost factor; hashes with any other cost are upgraded on the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Worker processes for hashing; 0 hashes inline on the calling thread
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Hash/verify jobs allowed in flight (running + queued) before requests are shed
+PASSWORD_HASH_MAX_PENDING = int(
+    os.getenv("PASSWORD_HASH_MAX_PENDING", str(max(PASSWORD_HASH_WORKERS, 1) * 8))
+)
+
+# Scheduling priority penalty for worker processes (POSIX nice increment)
+PASSWORD_HASH_NICE = int(os.getenv("PASSWORD_HASH_NICE", "5"))
+
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    # Pinning min and max makes needs_update() flag any hash with a different cost
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+def _init_worker():
+    # Hashing yields the CPU to request handling in the main process
+    if hasattr(os, "nice"):
+        os.nice(PASSWORD_HASH_NICE)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503"""
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with the configured cost"""
+    return pwd_context.hash(password)
+
+
+def verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password against its hash
+    Returns (valid, new_hash); new_hash is set when the stored cost is outdated
+    """
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Async front end to a bounded bcrypt process pool
+    Jobs beyond max_pending are rejected immediately instead of queueing
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._submit(verify_and_update, password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Process-wide hasher used by the auth endpoints
+password_hasher = PasswordHasher()
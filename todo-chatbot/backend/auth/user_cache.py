@@ -0,0 +1,149 @@
+"""
+User lookup cache for Phase 4 system
+Keeps authenticated user records in memory so get_current_user does not
+query the database on every request
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from backend.models.user import User
+
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+
+# Only what authenticated requests read; credentials such as hashed_password are never cached
+CACHED_USER_FIELDS = ("id", "email")
+
+
+class CacheBackend:
+    """
+    Storage interface for the user cache
+    Values are plain dicts of column values, so an external cache shared by
+    several workers can implement this interface
+    """
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Dict[str, Any], ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LRUCacheBackend(CacheBackend):
+    """
+    Bounded in-process backend with per-entry TTL and LRU eviction
+    """
+
+    def __init__(self, max_size: int = USER_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class UserCache:
+    """
+    Read-through cache of user records keyed by user id
+    Returns detached User instances holding only CACHED_USER_FIELDS
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: float = USER_CACHE_TTL):
+        self.backend = backend or LRUCacheBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(user_id) -> str:
+        return f"user:{user_id}"
+
+    def get_user(self, user_id, loader: Callable[[], Optional[User]]) -> Optional[User]:
+        """
+        Return the cached user, or load it with loader() and cache the result
+        Missing users are not cached, so a new signup is visible immediately
+        """
+        values = self.backend.get(self._key(user_id))
+        if values is not None:
+            self.hits += 1
+            return User(**values)
+
+        self.misses += 1
+        user = loader()
+        if user is None:
+            return None
+        values = {field: getattr(user, field) for field in CACHED_USER_FIELDS}
+        self.backend.set(self._key(user_id), values, self.ttl)
+        # Same shape as a hit, so callers never depend on uncached fields
+        return User(**values)
+
+    def invalidate(self, user_id):
+        """Drop one user; call whenever that user's record changes"""
+        self.backend.delete(self._key(user_id))
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": getattr(self.backend, "evictions", 0),
+        }
+
+
+# Process-wide user cache used by get_current_user
+user_cache = UserCache()
+
+
+def set_user_cache_backend(backend: CacheBackend):
+    """Swap the cache storage, e.g. for a cache shared between workers"""
+    user_cache.backend = backend
+
+
+def invalidate_user(user_id):
+    """Invalidation hook for code that creates, updates or deletes users"""
+    user_cache.invalidate(user_id)
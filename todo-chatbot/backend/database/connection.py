@@ -3,16 +3,16 @@ Database connection module for Phase 4 backend
 All persistent state lives in the database
 """
 
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from backend.database.engine import create_db_engine
 import os
 
 
 # Using SQLite for simplicity, but can be changed to PostgreSQL, MySQL, etc.
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./phase4_backend.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
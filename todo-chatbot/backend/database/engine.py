@@ -0,0 +1,238 @@
+"""
+Engine factory for Phase 4 database connections
+One place for pool sizing, SQLite pragmas and pool statistics
+"""
+
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+# Pool settings, overridable through environment variables
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# SQLite settings applied to every new connection
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+
+# Statistics for every engine created through the factory; held weakly so a
+# disposed and dropped engine is not kept alive by its stats
+_pool_stats: "weakref.WeakKeyDictionary[Engine, PoolStats]" = weakref.WeakKeyDictionary()
+
+
+class PoolStats:
+    """
+    Checkout and wait statistics for one engine's connection pool
+    Used to size the pool from real numbers instead of guessing
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False, failed: bool = False):
+        with self._lock:
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            if timed_out:
+                self.timeouts += 1
+            elif failed:
+                self.failures += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "avg_wait_ms": (self.total_wait / self.checkouts * 1000) if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+class _WaitTimingPoolMixin:
+    """
+    Pool mixin that records how long callers wait for a connection
+    Only pool exhaustion counts as a timeout; a connect error is a failure
+    """
+
+    stats: Optional[PoolStats] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        except Exception:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - start, failed=True)
+            raise
+        if self.stats is not None:
+            self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_WaitTimingPoolMixin, QueuePool):
+    """QueuePool with wait statistics"""
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with wait statistics"""
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Configure every new SQLite connection for concurrent chat load
+    WAL lets readers proceed while a writer is active
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+
+def _engine_kwargs(url, poolclass, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    engine_kwargs: Dict[str, Any] = {}
+
+    if url.get_backend_name() == "sqlite":
+        connect_args = dict(kwargs.pop("connect_args", {}))
+        connect_args.setdefault("check_same_thread", False)
+        engine_kwargs["connect_args"] = connect_args
+
+    if not _is_memory_sqlite(url):
+        # In-memory SQLite keeps its own single-connection pool
+        engine_kwargs.update(
+            poolclass=poolclass,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+
+    engine_kwargs.update(kwargs)
+    return engine_kwargs
+
+
+def _instrument(engine: Engine, url):
+    """
+    Attach pool statistics and SQLite pragmas to a (sync) engine
+    """
+    stats = PoolStats()
+    if isinstance(engine.pool, _WaitTimingPoolMixin):
+        engine.pool.stats = stats
+    _pool_stats[engine] = stats
+
+    if url.get_backend_name() == "sqlite" and not _is_memory_sqlite(url):
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+
+    event.listen(engine, "connect", lambda *args: stats.record_connect())
+    event.listen(engine, "checkout", lambda *args: stats.record_checkout())
+    event.listen(engine, "checkin", lambda *args: stats.record_checkin())
+
+
+def create_db_engine(database_url: str, **kwargs) -> Engine:
+    """
+    Create a tuned engine for the given database URL
+    Shared by all connection modules so pool and pragma settings stay consistent
+    """
+    url = make_url(database_url)
+    engine = create_engine(url, **_engine_kwargs(url, InstrumentedQueuePool, kwargs))
+    _instrument(engine, url)
+    return engine
+
+
+def to_async_url(database_url: str) -> str:
+    """
+    Map a sync database URL to its async driver
+    aiosqlite for SQLite, asyncpg for PostgreSQL
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    elif backend == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+def create_async_db_engine(database_url: str, **kwargs) -> AsyncEngine:
+    """
+    Create a tuned async engine with the same pool and pragma settings
+    """
+    url = make_url(to_async_url(database_url))
+    engine = create_async_engine(url, **_engine_kwargs(url, InstrumentedAsyncQueuePool, kwargs))
+    _instrument(engine.sync_engine, url)
+    return engine
+
+
+def get_pool_stats(engine) -> Dict[str, Any]:
+    """
+    Report pool checkout/wait statistics together with the pool's live status
+    """
+    if isinstance(engine, AsyncEngine):
+        engine = engine.sync_engine
+    stats = _pool_stats.get(engine)
+    report = stats.snapshot() if stats else {}
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        report.update(
+            pool_size=pool.size(),
+            overflow=pool.overflow(),
+            checked_in=pool.checkedin(),
+        )
+    return report
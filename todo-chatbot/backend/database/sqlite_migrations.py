@@ -0,0 +1,70 @@
+"""
+Schema versions and forward migrations for the sqlite3 task databases
+todo_api.py and simple_chatbot.py share this schema and upgrade their files at startup
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import List, Tuple
+
+
+# (version, description, statements), applied in order and never edited once released
+MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (1, "users and tasks tables", [
+        # username is UNIQUE, so its automatic index serves login lookups
+        """CREATE TABLE IF NOT EXISTS users
+           (id INTEGER PRIMARY KEY, username TEXT UNIQUE, password TEXT)""",
+        """CREATE TABLE IF NOT EXISTS tasks
+           (id INTEGER PRIMARY KEY, user_id INTEGER, title TEXT,
+           description TEXT, status TEXT, created_at TIMESTAMP)""",
+    ]),
+    (2, "per-user task indexes", [
+        # Listing by user and by (user, status), and keyset pagination by each sort
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_created ON tasks (user_id, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_status_created ON tasks (user_id, status, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_title ON tasks (user_id, title, id)",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Version of the database's schema; 0 before the first migration"""
+    row = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if row is None:
+        return 0
+    return conn.execute("SELECT coalesce(max(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Apply the migrations the database is missing and return its new version
+    Each migration commits on its own; files from before versioning upgrade in place
+    """
+    if schema_version(conn) == LATEST_VERSION:
+        return LATEST_VERSION
+
+    conn.commit()
+    # Taking the write lock first makes concurrent starters apply each migration once
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("""CREATE TABLE IF NOT EXISTS schema_version
+                        (version INTEGER PRIMARY KEY, description TEXT, applied_at TIMESTAMP)""")
+        current = schema_version(conn)
+        for version, description, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute("INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                         (version, description, datetime.now()))
+            conn.commit()
+            conn.execute("BEGIN IMMEDIATE")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return schema_version(conn)
@@ -0,0 +1,134 @@
+"""
+Full-text search index over task titles and descriptions
+SQLite: an FTS5 table over the task table, kept in sync by triggers
+PostgreSQL: a generated, weighted tsvector column with a GIN index
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+
+from backend.models.v2.models import Task
+
+
+# Title matches rank above description matches
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 4.0
+
+_SQLITE_DDL = [
+    # External content: the index stores only tokens, rows stay in task
+    """CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+        user_id, title, description, content='task', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, user_id, title, description)
+        VALUES (new.id, new.user_id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, user_id, title, description)
+        VALUES ('delete', old.id, old.user_id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF user_id, title, description ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, user_id, title, description)
+        VALUES ('delete', old.id, old.user_id, old.title, old.description);
+        INSERT INTO task_fts(rowid, user_id, title, description)
+        VALUES (new.id, new.user_id, new.title, new.description);
+    END""",
+]
+
+_POSTGRES_DDL = [
+    """ALTER TABLE task ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_task_search_vector ON task USING GIN (search_vector)",
+]
+
+
+def install_task_search(connection: Connection):
+    """
+    Create the search index for the connection's dialect; safe to run again
+    An index created over existing rows is filled from them
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_fts'"
+        )).first()
+        for statement in _SQLITE_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text("INSERT INTO task_fts(task_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        # The generated column is computed for existing rows as it is added
+        for statement in _POSTGRES_DDL:
+            connection.execute(text(statement))
+
+
+@event.listens_for(Task.__table__, "after_create")
+def _create_task_search(target, connection, **kw):
+    install_task_search(connection)
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of a search query; punctuation and search operators are ignored"""
+    return re.findall(r"\w+", query.lower())
+
+
+def _fts5_string(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+def search_statement(
+    dialect: str,
+    user_id: str,
+    terms: List[str],
+    status: Optional[str],
+    after: Optional[Tuple[float, int]],
+    limit: int
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Ranked search query for one user's tasks, best match first
+    Every term must match after English stemming ("grocery" finds "groceries").
+    Rows carry a score (higher is better); `after` is the (score, id) of the
+    last row of the previous page
+    """
+    params: Dict[str, Any] = {"user_id": user_id, "limit": limit}
+    where = ["t.user_id = :user_id"]
+    if status:
+        where.append("t.status = :status")
+        params["status"] = status
+    if after is not None:
+        where.append("(s.score < :after_score OR (s.score = :after_score AND t.id < :after_id))")
+        params["after_score"], params["after_id"] = after
+
+    if dialect == "sqlite":
+        match = "{title description} : (" + " AND ".join(_fts5_string(term) for term in terms) + ")"
+        if re.search(r"\w", user_id):
+            # Narrow the match to the user's rows inside the index; t.user_id still decides
+            match = f"user_id : {_fts5_string(user_id)} AND {match}"
+        params["match"] = match
+        source = f"""
+            SELECT rowid AS id, -bm25(task_fts, 0.0, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) AS score
+            FROM task_fts WHERE task_fts MATCH :match
+        """
+    elif dialect == "postgresql":
+        params["query"] = " ".join(terms)
+        source = """
+            SELECT id, ts_rank_cd(search_vector, plainto_tsquery('english', :query)) AS score
+            FROM task WHERE user_id = :user_id AND search_vector @@ plainto_tsquery('english', :query)
+        """
+    else:
+        raise ValueError(f"Task search is not available on {dialect}")
+
+    statement = text(f"""
+        SELECT t.id, t.title, t.description, t.status, s.score
+        FROM ({source}) AS s JOIN task AS t ON t.id = s.id
+        WHERE {' AND '.join(where)}
+        ORDER BY s.score DESC, t.id DESC
+        LIMIT :limit
+    """)
+    return statement, params
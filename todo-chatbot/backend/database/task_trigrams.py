@@ -0,0 +1,141 @@
+"""
+Trigram index over task titles, for resolving a task by an approximate name
+SQLite: a (user_id, trigram, task_id) side table kept in sync by triggers
+PostgreSQL: pg_trgm with a GIN index on the title
+"""
+
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.engine import Connection
+
+from backend.models.v2.models import Task
+
+
+# Title characters indexed on SQLite; longer titles match on their start only
+TRIGRAM_MAX_TITLE = 256
+# Best-sharing tasks re-scored in Python per lookup
+TRIGRAM_CANDIDATES = 20
+
+# Windows of the padded, lowercased title: '  ' || lower(title) || ' '
+_PADDED = "('  ' || lower({title}) || ' ')"
+
+_SQLITE_DDL = [
+    "CREATE TABLE IF NOT EXISTS trigram_position (n INTEGER PRIMARY KEY)",
+    """CREATE TABLE IF NOT EXISTS task_trigram (
+        user_id TEXT NOT NULL,
+        trigram TEXT NOT NULL,
+        task_id INTEGER NOT NULL,
+        PRIMARY KEY (user_id, trigram, task_id)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS ix_task_trigram_task_id ON task_trigram (task_id)",
+    f"""CREATE TRIGGER IF NOT EXISTS task_trigram_insert AFTER INSERT ON task BEGIN
+        INSERT OR IGNORE INTO task_trigram (user_id, trigram, task_id)
+        SELECT new.user_id, substr({_PADDED.format(title='new.title')}, n, 3), new.id
+        FROM trigram_position WHERE n <= length({_PADDED.format(title='new.title')}) - 2;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_trigram_delete AFTER DELETE ON task BEGIN
+        DELETE FROM task_trigram WHERE task_id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS task_trigram_update AFTER UPDATE OF user_id, title ON task BEGIN
+        DELETE FROM task_trigram WHERE task_id = old.id;
+        INSERT OR IGNORE INTO task_trigram (user_id, trigram, task_id)
+        SELECT new.user_id, substr({_PADDED.format(title='new.title')}, n, 3), new.id
+        FROM trigram_position WHERE n <= length({_PADDED.format(title='new.title')}) - 2;
+    END""",
+]
+
+_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_task_title_trgm ON task USING GIN (title gin_trgm_ops)",
+]
+
+
+def install_task_trigrams(connection: Connection):
+    """
+    Create the trigram index for the connection's dialect; safe to run again
+    An index created over existing rows is filled from them
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_trigram'"
+        )).first()
+        for statement in _SQLITE_DDL:
+            connection.execute(text(statement))
+        connection.execute(
+            text("INSERT OR IGNORE INTO trigram_position (n) VALUES (:n)"),
+            [{"n": n} for n in range(1, TRIGRAM_MAX_TITLE + 1)]
+        )
+        if not exists:
+            connection.execute(text(f"""
+                INSERT OR IGNORE INTO task_trigram (user_id, trigram, task_id)
+                SELECT task.user_id, substr({_PADDED.format(title='task.title')}, n, 3), task.id
+                FROM task JOIN trigram_position ON n <= length({_PADDED.format(title='task.title')}) - 2
+            """))
+    elif dialect == "postgresql":
+        for statement in _POSTGRES_DDL:
+            connection.execute(text(statement))
+
+
+@event.listens_for(Task.__table__, "after_create")
+def _create_task_trigrams(target, connection, **kw):
+    install_task_trigrams(connection)
+
+
+# SQLite's lower() only folds ASCII, so Python must fold the same way
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def title_trigrams(title: str) -> Set[str]:
+    """Trigrams the SQLite triggers index for a title"""
+    padded = "  " + title[:TRIGRAM_MAX_TITLE].translate(_ASCII_LOWER) + " "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def name_trigrams(name: str) -> Set[str]:
+    """
+    Trigrams of a name to look up
+    Padded with one leading space so a word in the middle of a title matches fully
+    """
+    padded = " " + " ".join(name.split()).translate(_ASCII_LOWER) + " "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def resolve_statement(dialect: str, user_id: str, name: str, status: Optional[str] = None) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Candidate tasks for a name, best first
+    Rows carry id, title, status and `shared`: on SQLite the number of the
+    name's trigrams found in the title, on PostgreSQL pg_trgm word_similarity
+    """
+    params: Dict[str, Any] = {"user_id": user_id, "limit": TRIGRAM_CANDIDATES}
+    status_filter = ""
+    if status:
+        status_filter = "AND t.status = :status"
+        params["status"] = status
+
+    if dialect == "sqlite":
+        params["trigrams"] = sorted(name_trigrams(name))
+        statement = text(f"""
+            SELECT t.id, t.title, t.status, c.shared
+            FROM (
+                SELECT task_id, count(*) AS shared FROM task_trigram
+                WHERE user_id = :user_id AND trigram IN :trigrams
+                GROUP BY task_id
+            ) AS c JOIN task AS t ON t.id = c.task_id
+            WHERE t.user_id = :user_id {status_filter}
+            ORDER BY c.shared DESC, t.id DESC
+            LIMIT :limit
+        """).bindparams(bindparam("trigrams", expanding=True))
+    elif dialect == "postgresql":
+        params["name"] = " ".join(name.split())
+        statement = text(f"""
+            SELECT t.id, t.title, t.status, word_similarity(:name, t.title) AS shared
+            FROM task AS t
+            WHERE t.user_id = :user_id AND :name <% t.title {status_filter}
+            ORDER BY shared DESC, t.id DESC
+            LIMIT :limit
+        """)
+    else:
+        raise ValueError(f"Task name lookup is not available on {dialect}")
+    return statement, params
@@ -4,7 +4,7 @@ Creates all tables based on models
 """
 
 from backend.database.connection import engine
-from backend.models.task import Base as TaskBase
+from backend.models.task import Base as TaskBase, Task
 from backend.models.user import Base as UserBase
 
 
@@ -15,6 +15,9 @@ def init_db():
     print("Initializing Phase 4 backend database...")
     TaskBase.metadata.create_all(bind=engine)
     UserBase.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add any new indexes explicitly
+    for index in Task.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
     print("Backend database initialized successfully!")
     print("All persistent state will live in the database as per Phase 4 constitution.")
 
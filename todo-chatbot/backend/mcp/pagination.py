@@ -0,0 +1,127 @@
+"""
+Keyset pagination for the task listing tools and APIs
+Pages are ordered by (sort key, id) and continue from an opaque cursor, so
+fetching any page costs one index range scan however many tasks a user has
+"""
+
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import tuple_
+
+
+TASK_PAGE_SIZE = int(os.getenv("TASK_PAGE_SIZE", "50"))
+TASK_PAGE_MAX = int(os.getenv("TASK_PAGE_MAX", "200"))
+
+# Sort option -> (sort key, descending); the id breaks ties within a key
+TASK_SORTS = {
+    "created_at": ("created_at", False),
+    "-created_at": ("created_at", True),
+    "title": ("title", False),
+    "-title": ("title", True),
+}
+DEFAULT_SORT = "created_at"
+
+
+class InvalidPageRequest(ValueError):
+    """Raised for an unknown sort, unknown field or malformed cursor"""
+
+
+class Page(NamedTuple):
+    """One page of rows and the cursor for the next page (None on the last)"""
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def parse_sort(sort: Optional[str]) -> Tuple[str, bool]:
+    try:
+        return TASK_SORTS[sort or DEFAULT_SORT]
+    except KeyError:
+        raise InvalidPageRequest(f"Unknown sort '{sort}'; use one of {', '.join(TASK_SORTS)}")
+
+
+def page_size(limit: Optional[int]) -> int:
+    """Clamp a requested page size to 1..TASK_PAGE_MAX"""
+    if limit is None:
+        return TASK_PAGE_SIZE
+    return max(1, min(int(limit), TASK_PAGE_MAX))
+
+
+def parse_fields(fields: Union[str, Sequence[str], None], allowed: Sequence[str], default: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Fields to return, from a list or a comma-separated string
+    Unknown names are rejected rather than silently dropped
+    """
+    if not fields:
+        return tuple(default)
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    names = tuple(dict.fromkeys(name.strip() for name in fields if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise InvalidPageRequest(f"Unknown fields: {', '.join(unknown)}")
+    return names or tuple(default)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(sort: Optional[str], key: Any, row_id: int) -> str:
+    """Opaque cursor pointing just past the row with this sort key and id"""
+    payload = json.dumps([sort or DEFAULT_SORT, _encode_value(key), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: Optional[str]) -> Tuple[Any, int]:
+    """
+    (sort key, id) of the last row of the previous page
+    A cursor is only valid with the sort it was issued for
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, key, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        key = _decode_value(key)
+    except (ValueError, TypeError, KeyError):
+        raise InvalidPageRequest("Malformed cursor")
+    if cursor_sort != (sort or DEFAULT_SORT) or not isinstance(row_id, int):
+        raise InvalidPageRequest("Cursor does not match this sort")
+    return key, row_id
+
+
+def keyset(statement, key_column, id_column, sort: Optional[str], cursor: Optional[str], limit: int):
+    """
+    Restrict a Select or ORM Query to the page after `cursor`
+    Fetches one row more than the page so page_of can tell whether another follows
+    """
+    _, descending = parse_sort(sort)
+    if cursor:
+        after = decode_cursor(cursor, sort)
+        position = tuple_(key_column, id_column)
+        statement = statement.where(position < after if descending else position > after)
+    if descending:
+        statement = statement.order_by(key_column.desc(), id_column.desc())
+    else:
+        statement = statement.order_by(key_column, id_column)
+    return statement.limit(limit + 1)
+
+
+def page_of(rows: Sequence[Any], sort: Optional[str], limit: int) -> Page:
+    """Trim the look-ahead row from a keyset result and build the next cursor"""
+    if len(rows) <= limit:
+        return Page(list(rows), None)
+    key, _ = parse_sort(sort)
+    items = list(rows[:limit])
+    last = items[-1]
+    return Page(items, encode_cursor(sort, getattr(last, key), last.id))
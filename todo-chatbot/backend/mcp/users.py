@@ -9,21 +9,27 @@ Following Phase 4 constitution:
 """
 
 from sqlalchemy.orm import Session
-from backend.models.user import User, get_password_hash, verify_password
+from backend.models.user import User, get_password_hash
+from backend.auth.passwords import password_hasher
+from backend.auth.user_cache import invalidate_user
 from typing import Optional
 
 
-def create_user(db: Session, email: str, password: str) -> User:
+def create_user(db: Session, email: str, password: Optional[str] = None,
+                hashed_password: Optional[str] = None) -> User:
     """
     MCP Tool to create a user
     Stateless, deterministic, database-only
-    Passwords are hashed as required by Spec-4
+    Passwords are hashed as required by Spec-4; callers that hash off the
+    event loop pass hashed_password instead of password
     """
-    hashed_password = get_password_hash(password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(password)
     db_user = User(email=email, hashed_password=hashed_password)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    invalidate_user(db_user.id)
     return db_user
 
 
@@ -35,14 +41,38 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+async def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     """
     MCP Tool to authenticate a user
     Verifies credentials and returns user if valid
+    bcrypt runs in the password hashing pool, never on the event loop; raises
+    PasswordHasherBusy when the pool is full
     """
     user = get_user_by_email(db, email)
-    if not user or not verify_password(password, user.hashed_password):
+    if not user:
         return None
+    # Detach before releasing the pooled connection for the hash: the rollback
+    # would otherwise expire the user and every later attribute read reloads it
+    db.expunge(user)
+    db.rollback()
+    valid, new_hash = await password_hasher.verify(password, user.hashed_password)
+    if not valid:
+        return None
+    # Transparently upgrade hashes made with an outdated bcrypt cost
+    if new_hash:
+        user = update_password_hash(db, db.merge(user, load=False), new_hash)
+    return user
+
+
+def update_password_hash(db: Session, user: User, hashed_password: str) -> User:
+    """
+    MCP Tool to replace a user's password hash
+    Used to upgrade hashes when the configured bcrypt cost changes
+    """
+    user.hashed_password = hashed_password
+    db.commit()
+    db.refresh(user)
+    invalidate_user(user.id)
     return user
 
 
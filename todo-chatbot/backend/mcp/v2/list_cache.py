@@ -0,0 +1,107 @@
+"""
+Versioned cache of task listing results for Phase 4 Todo AI Chatbot
+Entries are tagged with the user's task list version from the database, so a
+cached result is only served while no task write has happened since, in this
+worker or any other sharing the database
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+TASK_LIST_CACHE_SIZE = int(os.getenv("TASK_LIST_CACHE_SIZE", "1024"))
+# Results with more tasks than this are not cached, to bound memory per entry
+TASK_LIST_CACHE_MAX_TASKS = int(os.getenv("TASK_LIST_CACHE_MAX_TASKS", "1000"))
+
+# session.info key: users whose task list this transaction has modified
+_DIRTY_KEY = "task_list_dirty_users"
+
+
+def _copy(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a tool result down to its task dicts, which is all callers may modify"""
+    result = dict(result)
+    if "tasks" in result:
+        result["tasks"] = [dict(task) for task in result["tasks"]]
+    return result
+
+
+class TaskListCache:
+    """
+    LRU cache of serialized task listing results (list_tasks pages, count_tasks)
+    Keys start with the user_id; the rest identifies the query
+    """
+
+    def __init__(self, max_size: int = TASK_LIST_CACHE_SIZE, max_tasks: int = TASK_LIST_CACHE_MAX_TASKS):
+        self.max_size = max_size
+        self.max_tasks = max_tasks
+        self._entries: "OrderedDict[Hashable, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, version: int) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result if it was stored for this version"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = entry[1]
+        return _copy(result)
+
+    def put(self, key: Hashable, version: int, result: Dict[str, Any]):
+        if len(result.get("tasks", ())) > self.max_tasks:
+            return
+        # Stored as a private copy so callers may modify what they were given
+        result = _copy(result)
+        with self._lock:
+            self._entries[key] = (version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+
+def mark_dirty(session: Session, user_id: str):
+    """
+    Record that this transaction changed the user's tasks
+    Until it ends, its reads see uncommitted data and must bypass the cache
+    """
+    session.info.setdefault(_DIRTY_KEY, set()).add(user_id)
+
+
+def is_dirty(session: Session, user_id: str) -> bool:
+    return user_id in session.info.get(_DIRTY_KEY, ())
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_dirty(session: Session):
+    session.info.pop(_DIRTY_KEY, None)
+
+
+# Process-wide cache used by list_tasks and count_tasks
+task_list_cache = TaskListCache()
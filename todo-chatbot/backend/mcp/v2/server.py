@@ -4,12 +4,17 @@ Exposes task operations as tools for the AI agent
 """
 
 import asyncio
-from typing import Dict, Any, List
+import inspect
+from typing import Dict, Any, List, Optional, Union
 from pydantic import BaseModel
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
 from backend.mcp.v2.task_tools import (
-    add_task, list_tasks, complete_task, delete_task, update_task
+    add_task, list_tasks, count_tasks, search_tasks, resolve_task, complete_task, delete_task, update_task,
+    add_tasks, complete_tasks, delete_tasks, update_tasks
 )
-from backend.database.v2_connection import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.database.v2_connection import get_session, async_engine, run_in_session, USE_ASYNC_DB
 
 
 class MCPCall(BaseModel):
@@ -20,8 +25,48 @@ class MCPCall(BaseModel):
 
 class MCPResult(BaseModel):
     """Represents an MCP result"""
-    result: Any
-    error: str = None
+    result: Any = None
+    error: Optional[str] = None
+
+
+class MCPBatchAborted(Exception):
+    """
+    Raised when an all-or-nothing batch fails inside a caller-owned transaction
+    The caller must roll back its unit of work; results holds the per-call outcome
+    """
+    
+    def __init__(self, results: List[MCPResult]):
+        super().__init__("Batch aborted: " + next(r.error for r in results if r.error))
+        self.results = results
+
+
+# Task tool functions behind each MCP tool, used to validate parameters
+TOOL_FUNCTIONS = {
+    "add_task": add_task,
+    "list_tasks": list_tasks,
+    "count_tasks": count_tasks,
+    "search_tasks": search_tasks,
+    "resolve_task": resolve_task,
+    "complete_task": complete_task,
+    "delete_task": delete_task,
+    "update_task": update_task,
+    "add_tasks": add_tasks,
+    "complete_tasks": complete_tasks,
+    "delete_tasks": delete_tasks,
+    "update_tasks": update_tasks
+}
+
+
+def _required_parameters(fn) -> List[str]:
+    return [
+        name for name, param in inspect.signature(fn).parameters.items()
+        if name != "session" and param.default is inspect.Parameter.empty
+    ]
+
+
+def _is_error(result: Any) -> bool:
+    """Tools report not-found/unauthorized as a result with status 'error'"""
+    return isinstance(result, dict) and result.get("status") == "error"
 
 
 class MCPServer:
@@ -34,35 +79,187 @@ class MCPServer:
         self.tools = {
             "add_task": self._execute_add_task,
             "list_tasks": self._execute_list_tasks,
+            "count_tasks": self._execute_count_tasks,
+            "search_tasks": self._execute_search_tasks,
+            "resolve_task": self._execute_resolve_task,
             "complete_task": self._execute_complete_task,
             "delete_task": self._execute_delete_task,
-            "update_task": self._execute_update_task
+            "update_task": self._execute_update_task,
+            "add_tasks": self._execute_add_tasks,
+            "complete_tasks": self._execute_complete_tasks,
+            "delete_tasks": self._execute_delete_tasks,
+            "update_tasks": self._execute_update_tasks
         }
+        self.required_parameters = {
+            name: _required_parameters(fn) for name, fn in TOOL_FUNCTIONS.items()
+        }
+        self.use_async = USE_ASYNC_DB
     
-    async def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> MCPResult:
+    async def execute_tool(
+        self,
+        tool_name: str,
+        parameters: Dict[str, Any],
+        session: Optional[Union[AsyncSession, Session]] = None
+    ) -> MCPResult:
         """
         Execute an MCP tool with the given parameters
+        
+        When a session is passed the tool joins the caller's transaction and
+        the caller commits; otherwise the tool runs and commits on its own session
         """
         if tool_name not in self.tools:
             return MCPResult(error=f"Tool '{tool_name}' not found")
         
+        if session is not None:
+            try:
+                result = await run_in_session(session, self.tools[tool_name], **parameters)
+                return MCPResult(result=result)
+            except SQLAlchemyError:
+                # The shared transaction is no longer usable: fail the whole unit of work
+                raise
+            except Exception as e:
+                return MCPResult(error=str(e))
+        
         try:
+            if self.use_async:
+                # Tools run on an AsyncSession via run_sync: no executor hop
+                async with AsyncSession(async_engine, expire_on_commit=False) as own_session:
+                    result = await own_session.run_sync(self._run_and_commit, tool_name, parameters)
+                return MCPResult(result=result)
+            
             # Get a database session
             session_gen = get_session()
-            session = next(session_gen)
+            own_session = next(session_gen)
             
             try:
                 result = await asyncio.get_event_loop().run_in_executor(
                     None, 
-                    lambda: self.tools[tool_name](session, **parameters)
+                    lambda: self._run_and_commit(own_session, tool_name, parameters)
                 )
                 return MCPResult(result=result)
             finally:
                 # Close the session
-                session.close()
+                own_session.close()
         except Exception as e:
             return MCPResult(error=str(e))
     
+    def _run_and_commit(self, session, tool_name: str, parameters: Dict[str, Any]):
+        """Run a tool in its own transaction"""
+        result = self.tools[tool_name](session, **parameters)
+        session.commit()
+        return result
+    
+    def _validate_call(self, call: MCPCall) -> Optional[str]:
+        if call.tool_name not in self.tools:
+            return f"Tool '{call.tool_name}' not found"
+        missing = [
+            name for name in self.required_parameters[call.tool_name]
+            if call.parameters.get(name) is None
+        ]
+        if missing:
+            return f"Missing required parameters: {', '.join(missing)}"
+        return None
+    
+    async def execute_tools(
+        self,
+        calls: List[MCPCall],
+        atomic: bool = True,
+        session: Optional[Union[AsyncSession, Session]] = None
+    ) -> List[MCPResult]:
+        """
+        Execute a batch of MCP calls in a single session and transaction
+        
+        atomic=True (all-or-nothing): the first failing call rolls back the whole
+        batch and the remaining calls are skipped. With a caller-owned session the
+        batch cannot be undone on its own, so MCPBatchAborted is raised instead
+        
+        atomic=False (best-effort): failing calls are reported and the rest still run;
+        only a database error, which leaves the transaction unusable, aborts the batch
+        """
+        errors = [self._validate_call(call) for call in calls]
+        if any(errors):
+            if atomic:
+                # Reject the whole batch before touching the database
+                return [
+                    MCPResult(error=error or "Not executed: batch rejected")
+                    for error in errors
+                ]
+        
+        if session is not None:
+            results, aborted_at = await run_in_session(session, self._run_batch, calls, errors, atomic)
+            if aborted_at is not None:
+                raise MCPBatchAborted(results)
+            return results
+        
+        if self.use_async:
+            async with AsyncSession(async_engine, expire_on_commit=False) as own_session:
+                return await own_session.run_sync(self._run_batch_and_commit, calls, errors, atomic)
+        
+        session_gen = get_session()
+        own_session = next(session_gen)
+        try:
+            return await asyncio.get_event_loop().run_in_executor(
+                None,
+                lambda: self._run_batch_and_commit(own_session, calls, errors, atomic)
+            )
+        finally:
+            own_session.close()
+    
+    def _run_batch(self, session, calls: List[MCPCall], errors: List[Optional[str]], atomic: bool):
+        """
+        Run the calls in order on one session without committing
+        Returns the per-call results and the index of the call that aborted the
+        batch (None if it ran to the end)
+        """
+        results: List[MCPResult] = []
+        for index, call in enumerate(calls):
+            if errors[index]:
+                results.append(MCPResult(error=errors[index]))
+                continue
+            
+            fatal = False
+            try:
+                result = self.tools[call.tool_name](session, **call.parameters)
+            except SQLAlchemyError as e:
+                # The transaction is unusable: nothing after this point can run
+                results.append(MCPResult(error=str(e)))
+                fatal = True
+            except Exception as e:
+                results.append(MCPResult(error=str(e)))
+            else:
+                if _is_error(result):
+                    results.append(MCPResult(result=result, error=result.get("error")))
+                else:
+                    results.append(MCPResult(result=result))
+            
+            if fatal or (atomic and results[-1].error):
+                results.extend(
+                    MCPResult(error=f"Not executed: call {index} failed")
+                    for _ in calls[index + 1:]
+                )
+                return results, index
+        return results, None
+    
+    def _run_batch_and_commit(self, session, calls: List[MCPCall], errors: List[Optional[str]], atomic: bool) -> List[MCPResult]:
+        """Run a batch in its own transaction: one commit, or a rollback on abort"""
+        try:
+            results, aborted_at = self._run_batch(session, calls, errors, atomic)
+        except Exception:
+            session.rollback()
+            raise
+        
+        if aborted_at is None:
+            session.commit()
+            return results
+        
+        session.rollback()
+        # Calls that succeeded before the abort were undone with the transaction
+        return [
+            MCPResult(result=r.result, error=f"Rolled back: call {aborted_at} failed")
+            if i < aborted_at and not r.error else r
+            for i, r in enumerate(results)
+        ]
+    
     def _execute_add_task(self, session, **params):
         """Execute add_task tool"""
         return add_task(
@@ -77,6 +274,37 @@ class MCPServer:
         return list_tasks(
             session=session,
             user_id=params.get("user_id"),
+            status=params.get("status", "all"),
+            limit=params.get("limit"),
+            cursor=params.get("cursor"),
+            sort=params.get("sort", "created_at"),
+            fields=params.get("fields")
+        )
+    
+    def _execute_count_tasks(self, session, **params):
+        """Execute count_tasks tool"""
+        return count_tasks(
+            session=session,
+            user_id=params.get("user_id")
+        )
+    
+    def _execute_search_tasks(self, session, **params):
+        """Execute search_tasks tool"""
+        return search_tasks(
+            session=session,
+            user_id=params.get("user_id"),
+            query=params.get("query"),
+            status=params.get("status", "all"),
+            limit=params.get("limit"),
+            cursor=params.get("cursor")
+        )
+    
+    def _execute_resolve_task(self, session, **params):
+        """Execute resolve_task tool"""
+        return resolve_task(
+            session=session,
+            user_id=params.get("user_id"),
+            name=params.get("name"),
             status=params.get("status", "all")
         )
     
@@ -105,6 +333,40 @@ class MCPServer:
             title=params.get("title"),
             description=params.get("description")
         )
+    
+    def _execute_add_tasks(self, session, **params):
+        """Execute add_tasks tool"""
+        return add_tasks(
+            session=session,
+            user_id=params.get("user_id"),
+            tasks=params.get("tasks") or []
+        )
+    
+    def _execute_complete_tasks(self, session, **params):
+        """Execute complete_tasks tool"""
+        return complete_tasks(
+            session=session,
+            user_id=params.get("user_id"),
+            task_ids=params.get("task_ids"),
+            status=params.get("status")
+        )
+    
+    def _execute_delete_tasks(self, session, **params):
+        """Execute delete_tasks tool"""
+        return delete_tasks(
+            session=session,
+            user_id=params.get("user_id"),
+            task_ids=params.get("task_ids"),
+            status=params.get("status")
+        )
+    
+    def _execute_update_tasks(self, session, **params):
+        """Execute update_tasks tool"""
+        return update_tasks(
+            session=session,
+            user_id=params.get("user_id"),
+            updates=params.get("updates") or []
+        )
 
 
 # Global MCP server instance
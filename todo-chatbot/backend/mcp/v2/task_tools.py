@@ -1,19 +1,62 @@
 """
 MCP Tools for Phase 4 Todo AI Chatbot
 Following the specification for task operations
+
+Tools flush their changes but never commit: the caller owns the transaction,
+so a whole chat turn (messages and tool side effects) commits once
 """
 
-from sqlmodel import Session, select
-from backend.models.v2.models import Task, TaskStatus
-from typing import List, Optional
+from sqlmodel import Session, select, insert, update, delete, case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from backend.models.v2.models import Task, TaskStatus, TaskListVersion
+from backend.mcp.v2.list_cache import task_list_cache, mark_dirty, is_dirty
+from backend.mcp.pagination import (
+    DEFAULT_SORT, decode_cursor, encode_cursor, keyset, page_of, page_size, parse_fields, parse_sort
+)
+from backend.database.task_search import search_statement, search_terms
+from backend.database.task_trigrams import name_trigrams, resolve_statement, title_trigrams
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
 
+# Ids per IN (...) list in bulk statements, well under SQLite's variable limit
+BULK_CHUNK_SIZE = 500
+
+# Candidates resolve_task returns alongside its best match
+RESOLVE_CANDIDATES = 3
+
+_UPSERT_DIALECTS = {"sqlite": sqlite, "postgresql": postgresql}
+
+
+def _bump_task_version(session: Session, user_id: str):
+    """
+    Bump the user's task list version in the caller's transaction
+    Cached list_tasks results for the user stop matching once it commits
+    """
+    dialect = _UPSERT_DIALECTS.get(session.get_bind().dialect.name)
+    if dialect is not None:
+        statement = dialect.insert(TaskListVersion).values(user_id=user_id, version=1)
+        session.exec(statement.on_conflict_do_update(
+            index_elements=[TaskListVersion.user_id],
+            set_={"version": TaskListVersion.version + 1}
+        ))
+    else:
+        bumped = session.exec(
+            update(TaskListVersion)
+            .where(TaskListVersion.user_id == user_id)
+            .values(version=TaskListVersion.version + 1)
+        )
+        if not bumped.rowcount:
+            session.exec(insert(TaskListVersion).values(user_id=user_id, version=1))
+    mark_dirty(session, user_id)
+
+
 def add_task(session: Session, user_id: str, title: str, description: Optional[str] = None) -> dict:
     """
     MCP Tool: add_task
     Purpose: Create a new task
-    Parameters: user_id (string, required), title (string, required), description (string, optional)
+    Parameters: user_id (string, required: id of the signed-in user), title (string, required: short name of the task),
+    description (string, optional: longer notes for the task)
     Returns: task_id, status, title
     """
     task = Task(
@@ -25,8 +68,8 @@ def add_task(session: Session, user_id: str, title: str, description: Optional[s
         updated_at=datetime.utcnow()
     )
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    session.flush()
+    _bump_task_version(session, user_id)
     
     return {
         "task_id": task.id,
@@ -35,42 +78,214 @@ def add_task(session: Session, user_id: str, title: str, description: Optional[s
     }
 
 
-def list_tasks(session: Session, user_id: str, status: Optional[str] = "all") -> List[dict]:
+def _versioned(session: Session, key: tuple, compute: Callable[[], dict]) -> dict:
+    """
+    Serve a listing result from task_list_cache while the user's task list
+    version is unchanged; key[0] is the user_id
+    """
+    user_id = key[0]
+    version = session.exec(
+        select(TaskListVersion.version).where(TaskListVersion.user_id == user_id)
+    ).first() or 0
+    # A transaction with its own task writes sees rows no other reader can yet
+    cacheable = not is_dirty(session, user_id)
+    if cacheable:
+        cached = task_list_cache.get(key, version)
+        if cached is not None:
+            return cached
+    
+    result = compute()
+    if cacheable:
+        task_list_cache.put(key, version, result)
+    return result
+
+
+# list_tasks field -> (columns it needs, value from a result row)
+_TASK_FIELDS: Dict[str, Tuple[Tuple[str, ...], Callable[[Any], Any]]] = {
+    "id": (("id",), lambda row: row.id),
+    "title": (("title",), lambda row: row.title),
+    "description": (("description",), lambda row: row.description),
+    "status": (("status",), lambda row: row.status.value),
+    "completed": (("status",), lambda row: row.status == TaskStatus.completed),
+    "created_at": (("created_at",), lambda row: row.created_at.isoformat() if row.created_at else None),
+    "updated_at": (("updated_at",), lambda row: row.updated_at.isoformat() if row.updated_at else None),
+}
+_DEFAULT_TASK_FIELDS = ("id", "title", "description", "status", "completed")
+_SORT_COLUMNS = {"created_at": Task.created_at, "title": Task.title}
+
+
+def list_tasks(
+    session: Session,
+    user_id: str,
+    status: Optional[str] = "all",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = "created_at",
+    fields: Optional[List[str]] = None
+) -> dict:
     """
     MCP Tool: list_tasks
-    Purpose: Retrieve tasks from the list
-    Parameters: user_id (string, required), status (string, optional: "all", "pending", "completed")
-    Returns: Array of task objects
+    Purpose: Retrieve one page of tasks from the list
+    Parameters: user_id (string, required), status (string, optional: "all", "pending", "completed"), limit (integer, optional: page size, default 50, at most 200), cursor (string, optional: next_cursor of the previous page), sort (string, optional: "created_at", "-created_at", "title", "-title"), fields (array of strings, optional: any of id, title, description, status, completed, created_at, updated_at)
+    Returns: tasks (array of task objects), next_cursor (null on the last page)
     """
-    query = select(Task).where(Task.user_id == user_id)
+    try:
+        status_criteria = _status_filter(status)
+        sort_key, _ = parse_sort(sort)
+        names = parse_fields(fields, _TASK_FIELDS, _DEFAULT_TASK_FIELDS)
+        size = page_size(limit)
+        if cursor:
+            decode_cursor(cursor, sort)
+    except ValueError as e:
+        return {"status": "error", "error": str(e), "tasks": [], "next_cursor": None}
     
-    if status and status != "all":
-        if status == "completed":
-            query = query.where(Task.status == TaskStatus.completed)
-        elif status == "pending":
-            query = query.where(Task.status == TaskStatus.pending)
-        elif status == "in_progress":
-            query = query.where(Task.status == TaskStatus.in_progress)
-    
-    tasks = session.exec(query).all()
-    
-    return [
-        {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "status": task.status.value,
-            "completed": task.status == TaskStatus.completed
+    def compute() -> dict:
+        # Only the projected columns, plus what the cursor is built from
+        columns = dict.fromkeys(["id", sort_key])
+        for name in names:
+            columns.update(dict.fromkeys(_TASK_FIELDS[name][0]))
+        query = select(*(getattr(Task, column) for column in columns)).where(Task.user_id == user_id)
+        if status_criteria is not None:
+            query = query.where(status_criteria)
+        query = keyset(query, _SORT_COLUMNS[sort_key], Task.id, sort, cursor, size)
+        
+        page = page_of(session.exec(query).all(), sort, size)
+        return {
+            "tasks": [
+                {name: _TASK_FIELDS[name][1](row) for name in names}
+                for row in page.items
+            ],
+            "next_cursor": page.next_cursor
         }
-        for task in tasks
-    ]
+    
+    key = (user_id, "list", status or "all", sort or DEFAULT_SORT, cursor, size, names)
+    return _versioned(session, key, compute)
+
+
+def count_tasks(session: Session, user_id: str) -> dict:
+    """
+    MCP Tool: count_tasks
+    Purpose: Count tasks by status without loading them
+    Parameters: user_id (string, required: id of the signed-in user)
+    Returns: total and a count per status (pending, in_progress, completed)
+    """
+    def compute() -> dict:
+        counts = {status.value: 0 for status in TaskStatus}
+        rows = session.exec(
+            select(Task.status, func.count()).where(Task.user_id == user_id).group_by(Task.status)
+        ).all()
+        for status, count in rows:
+            counts[TaskStatus(status).value] = count
+        return {"total": sum(counts.values()), **counts}
+    
+    return _versioned(session, (user_id, "count"), compute)
+
+
+def search_tasks(
+    session: Session,
+    user_id: str,
+    query: str,
+    status: Optional[str] = "all",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> dict:
+    """
+    MCP Tool: search_tasks
+    Purpose: Find tasks whose title or description contains all the given words, best match first
+    Parameters: user_id (string, required), query (string, required: words to look for), status (string, optional: "all", "pending", "completed"), limit (integer, optional: page size, default 50, at most 200), cursor (string, optional: next_cursor of the previous page)
+    Returns: tasks (array of task objects with a relevance score), next_cursor (null on the last page)
+    """
+    terms = search_terms(query or "")
+    if not terms:
+        return {"status": "error", "error": "Search query has no words", "tasks": [], "next_cursor": None}
+    try:
+        status_value = TaskStatus(status).value if status and status != "all" else None
+        size = page_size(limit)
+        after = decode_cursor(cursor, "search") if cursor else None
+    except ValueError as e:
+        return {"status": "error", "error": str(e), "tasks": [], "next_cursor": None}
+    
+    def compute() -> dict:
+        dialect = session.get_bind().dialect.name
+        statement, params = search_statement(dialect, user_id, terms, status_value, after, size + 1)
+        rows = session.exec(statement, params=params).all()
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            next_cursor = encode_cursor("search", rows[-1].score, rows[-1].id)
+        return {
+            "tasks": [
+                {
+                    "id": row.id,
+                    "title": row.title,
+                    "description": row.description,
+                    "status": row.status,
+                    "completed": row.status == TaskStatus.completed.value,
+                    "score": row.score
+                }
+                for row in rows
+            ],
+            "next_cursor": next_cursor
+        }
+    
+    key = (user_id, "search", " ".join(terms), status_value, cursor, size)
+    return _versioned(session, key, compute)
+
+
+def resolve_task(session: Session, user_id: str, name: str, status: Optional[str] = "all") -> dict:
+    """
+    MCP Tool: resolve_task
+    Purpose: Find the task whose title best matches an approximate name, typos allowed
+    Parameters: user_id (string, required), name (string, required: part or all of the task title), status (string, optional: "all", "pending", "completed")
+    Returns: task_id, title and confidence (0 to 1) of the best match, and the top candidates
+    """
+    name = " ".join((name or "").split())
+    if not name:
+        return {"status": "error", "error": "Specify a task name", "task_id": None, "candidates": []}
+    try:
+        status_value = TaskStatus(status).value if status and status != "all" else None
+    except ValueError as e:
+        return {"status": "error", "error": str(e), "task_id": None, "candidates": []}
+    
+    def compute() -> dict:
+        dialect = session.get_bind().dialect.name
+        statement, params = resolve_statement(dialect, user_id, name, status_value)
+        rows = session.exec(statement, params=params).all()
+        if dialect == "sqlite":
+            # Share of the name's trigrams found in the title; ties go to the
+            # title with fewer other trigrams (Jaccard similarity)
+            wanted = len(name_trigrams(name))
+            scored = [
+                (row.shared / wanted, row.shared / (wanted + len(title_trigrams(row.title)) - row.shared), row)
+                for row in rows
+            ]
+        else:
+            scored = [(row.shared, row.shared, row) for row in rows]
+        scored.sort(key=lambda item: (item[0], item[1], item[2].id), reverse=True)
+        
+        candidates = [
+            {"task_id": row.id, "title": row.title, "status": row.status, "confidence": round(confidence, 3)}
+            for confidence, _, row in scored[:RESOLVE_CANDIDATES]
+        ]
+        if not candidates:
+            return {"status": "error", "error": f"No task matches '{name}'", "task_id": None, "candidates": []}
+        best = candidates[0]
+        return {
+            "task_id": best["task_id"],
+            "title": best["title"],
+            "confidence": best["confidence"],
+            "candidates": candidates
+        }
+    
+    key = (user_id, "resolve", name.lower(), status_value)
+    return _versioned(session, key, compute)
 
 
 def complete_task(session: Session, user_id: str, task_id: int) -> dict:
     """
     MCP Tool: complete_task
     Purpose: Mark a task as complete
-    Parameters: user_id (string, required), task_id (integer, required)
+    Parameters: user_id (string, required: id of the signed-in user), task_id (integer, required: id of the task to complete)
     Returns: task_id, status, title
     """
     task = session.get(Task, task_id)
@@ -94,8 +309,8 @@ def complete_task(session: Session, user_id: str, task_id: int) -> dict:
     task.status = TaskStatus.completed
     task.updated_at = datetime.utcnow()
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    session.flush()
+    _bump_task_version(session, user_id)
     
     return {
         "task_id": task.id,
@@ -108,7 +323,7 @@ def delete_task(session: Session, user_id: str, task_id: int) -> dict:
     """
     MCP Tool: delete_task
     Purpose: Remove a task from the list
-    Parameters: user_id (string, required), task_id (integer, required)
+    Parameters: user_id (string, required: id of the signed-in user), task_id (integer, required: id of the task to delete)
     Returns: task_id, status, title
     """
     task = session.get(Task, task_id)
@@ -131,7 +346,8 @@ def delete_task(session: Session, user_id: str, task_id: int) -> dict:
     
     title = task.title
     session.delete(task)
-    session.commit()
+    session.flush()
+    _bump_task_version(session, user_id)
     
     return {
         "task_id": task_id,
@@ -144,7 +360,8 @@ def update_task(session: Session, user_id: str, task_id: int, title: Optional[st
     """
     MCP Tool: update_task
     Purpose: Modify task title or description
-    Parameters: user_id (string, required), task_id (integer, required), title (string, optional), description (string, optional)
+    Parameters: user_id (string, required: id of the signed-in user), task_id (integer, required: id of the task to change),
+    title (string, optional: new title), description (string, optional: new description)
     Returns: task_id, status, title
     """
     task = session.get(Task, task_id)
@@ -172,11 +389,264 @@ def update_task(session: Session, user_id: str, task_id: int, title: Optional[st
     
     task.updated_at = datetime.utcnow()
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    session.flush()
+    _bump_task_version(session, user_id)
     
     return {
         "task_id": task.id,
         "status": "updated",
         "title": task.title
-    }
\ No newline at end of file
+    }
+
+
+def _chunks(ids: List[int], size: int = BULK_CHUNK_SIZE) -> Iterator[List[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _missing_outcomes(session: Session, user_id: str, task_ids: List[int], action: str) -> List[dict]:
+    """
+    Outcomes for ids a bulk statement did not touch: not found, or owned by someone else
+    One lookup per chunk, only for the ids that were missed
+    """
+    existing = set()
+    for chunk in _chunks(task_ids):
+        existing.update(session.exec(select(Task.id).where(Task.id.in_(chunk))).all())
+    
+    outcomes = []
+    for task_id in task_ids:
+        if task_id in existing:
+            outcomes.append({
+                "task_id": task_id,
+                "status": "error",
+                "title": "Unauthorized",
+                "error": f"You don't have permission to {action} this task"
+            })
+        else:
+            outcomes.append({
+                "task_id": task_id,
+                "status": "error",
+                "title": "Task not found",
+                "error": "Task not found"
+            })
+    return outcomes
+
+
+def _status_filter(status: Optional[str]):
+    if status and status != "all":
+        return Task.status == TaskStatus(status)
+    return None
+
+
+def _bulk_by_ids_or_status(
+    session: Session,
+    user_id: str,
+    task_ids: Optional[List[int]],
+    status: Optional[str],
+    build_statement,
+    done_status: str,
+    action: str
+) -> dict:
+    """
+    Shared driver for set-based bulk tools
+    build_statement(*criteria) returns a DML statement with RETURNING (id, title);
+    ownership (user_id) is always part of the criteria
+    """
+    if not task_ids and not status:
+        return {"status": "error", "error": "Specify task_ids or status", "count": 0, "tasks": []}
+    
+    try:
+        status_criteria = _status_filter(status)
+    except ValueError:
+        return {"status": "error", "error": f"Unknown status '{status}'", "count": 0, "tasks": []}
+    
+    base_criteria = [Task.user_id == user_id]
+    if status_criteria is not None:
+        base_criteria.append(status_criteria)
+    
+    rows = []
+    if task_ids:
+        task_ids = list(dict.fromkeys(task_ids))
+        for chunk in _chunks(task_ids):
+            rows.extend(session.exec(build_statement(*base_criteria, Task.id.in_(chunk))).all())
+    else:
+        rows.extend(session.exec(build_statement(*base_criteria)).all())
+    
+    outcomes = [
+        {"task_id": row.id, "status": done_status, "title": row.title}
+        for row in rows
+    ]
+    if task_ids:
+        touched = {row.id for row in rows}
+        missed = [task_id for task_id in task_ids if task_id not in touched]
+        if status_criteria is not None:
+            # Owned but filtered out by status: skipped, not an error
+            owned = {}
+            for chunk in _chunks(missed):
+                owned.update(
+                    (row.id, row) for row in session.exec(
+                        select(Task.id, Task.title, Task.status).where(Task.user_id == user_id, Task.id.in_(chunk))
+                    ).all()
+                )
+            outcomes.extend(
+                {
+                    "task_id": task_id,
+                    "status": "skipped",
+                    "title": owned[task_id].title,
+                    "reason": f"Task is {TaskStatus(owned[task_id].status).value}, not {status}"
+                }
+                for task_id in missed if task_id in owned
+            )
+            missed = [task_id for task_id in missed if task_id not in owned]
+        outcomes.extend(_missing_outcomes(session, user_id, missed, action))
+    
+    if rows:
+        _bump_task_version(session, user_id)
+    return {"status": done_status, "count": len(rows), "tasks": outcomes}
+
+
+def add_tasks(session: Session, user_id: str, tasks: List[Dict[str, Any]]) -> dict:
+    """
+    MCP Tool: add_tasks
+    Purpose: Create many tasks at once with a multi-row insert
+    Parameters: user_id (string, required), tasks (array of {title, description?}, required)
+    Returns: count and per-task task_id, status, title
+    """
+    if not isinstance(tasks, list):
+        return {"status": "error", "error": "tasks must be a list of {title, description?}", "count": 0, "tasks": []}
+    
+    now = datetime.utcnow()
+    rows = []
+    outcomes: List[Optional[dict]] = []
+    for item in tasks:
+        if not isinstance(item, dict):
+            outcomes.append({
+                "task_id": None, "status": "error", "title": None,
+                "error": "Each task must be an object with a title"
+            })
+            continue
+        title = item.get("title")
+        if not title or not isinstance(title, str):
+            outcomes.append({"task_id": None, "status": "error", "title": None, "error": "Title is required"})
+            continue
+        description = item.get("description")
+        if description is not None and not isinstance(description, str):
+            outcomes.append({"task_id": None, "status": "error", "title": title, "error": "Description must be a string"})
+            continue
+        outcomes.append(None)
+        rows.append({
+            "user_id": user_id,
+            "title": title,
+            "description": description,
+            "status": TaskStatus.pending,
+            "created_at": now,
+            "updated_at": now
+        })
+    
+    created = []
+    if rows:
+        statement = insert(Task).returning(Task.id, Task.title, sort_by_parameter_order=True)
+        created = session.exec(statement, params=rows).all()
+        _bump_task_version(session, user_id)
+    
+    # RETURNING rows come back in insert order: fill the gaps left for valid items
+    created_iter = iter(created)
+    for index, outcome in enumerate(outcomes):
+        if outcome is None:
+            row = next(created_iter)
+            outcomes[index] = {"task_id": row.id, "status": "created", "title": row.title}
+    
+    return {"status": "created", "count": len(created), "tasks": outcomes}
+
+
+def complete_tasks(session: Session, user_id: str, task_ids: Optional[List[int]] = None, status: Optional[str] = None) -> dict:
+    """
+    MCP Tool: complete_tasks
+    Purpose: Mark many tasks as complete in one statement
+    Parameters: user_id (string, required), task_ids (array of integers, optional),
+    status (string, optional: only tasks currently in this status, e.g. "pending")
+    Returns: count and per-task task_id, status, title (listed ids in another status are "skipped" with a reason)
+    """
+    now = datetime.utcnow()
+    return _bulk_by_ids_or_status(
+        session, user_id, task_ids, status,
+        lambda *criteria: update(Task).where(*criteria).values(
+            status=TaskStatus.completed, updated_at=now
+        ).returning(Task.id, Task.title),
+        "completed", "modify"
+    )
+
+
+def delete_tasks(session: Session, user_id: str, task_ids: Optional[List[int]] = None, status: Optional[str] = None) -> dict:
+    """
+    MCP Tool: delete_tasks
+    Purpose: Remove many tasks in one statement
+    Parameters: user_id (string, required), task_ids (array of integers, optional),
+    status (string, optional: only tasks currently in this status, e.g. "completed")
+    Returns: count and per-task task_id, status, title (listed ids in another status are "skipped" with a reason)
+    """
+    return _bulk_by_ids_or_status(
+        session, user_id, task_ids, status,
+        lambda *criteria: delete(Task).where(*criteria).returning(Task.id, Task.title),
+        "deleted", "delete"
+    )
+
+
+def update_tasks(session: Session, user_id: str, updates: List[Dict[str, Any]]) -> dict:
+    """
+    MCP Tool: update_tasks
+    Purpose: Modify the title or description of many tasks in one statement
+    Parameters: user_id (string, required), updates (array of {task_id, title?, description?}, required)
+    Returns: count and per-task task_id, status, title
+    """
+    if not isinstance(updates, list):
+        return {"status": "error", "error": "updates must be a list of {task_id, title?, description?}", "count": 0, "tasks": []}
+    
+    titles: Dict[int, str] = {}
+    descriptions: Dict[int, str] = {}
+    task_ids: List[int] = []
+    invalid = []
+    for item in updates:
+        if not isinstance(item, dict):
+            invalid.append({
+                "task_id": None, "status": "error", "title": None,
+                "error": "Each update must be an object with a task_id"
+            })
+            continue
+        task_id = item.get("task_id")
+        if not isinstance(task_id, int) or isinstance(task_id, bool):
+            invalid.append({"task_id": None, "status": "error", "title": None, "error": "task_id must be an integer"})
+            continue
+        title = item.get("title")
+        if title is not None and (not title or not isinstance(title, str)):
+            invalid.append({"task_id": task_id, "status": "error", "title": None, "error": "Title must be a non-empty string"})
+            continue
+        description = item.get("description")
+        if description is not None and not isinstance(description, str):
+            invalid.append({"task_id": task_id, "status": "error", "title": None, "error": "Description must be a string"})
+            continue
+        if title is not None:
+            titles[task_id] = title
+        if description is not None:
+            descriptions[task_id] = description
+        task_ids.append(task_id)
+    
+    if not task_ids:
+        if invalid:
+            return {"status": "updated", "count": 0, "tasks": invalid}
+        return {"status": "error", "error": "Specify updates with task_id", "count": 0, "tasks": []}
+    
+    now = datetime.utcnow()
+    
+    def build_statement(*criteria):
+        # One UPDATE per chunk: CASE picks each row's new value by id
+        values: Dict[str, Any] = {"updated_at": now}
+        if titles:
+            values["title"] = case(titles, value=Task.id, else_=Task.title)
+        if descriptions:
+            values["description"] = case(descriptions, value=Task.id, else_=Task.description)
+        return update(Task).where(*criteria).values(**values).returning(Task.id, Task.title)
+    
+    result = _bulk_by_ids_or_status(session, user_id, task_ids, None, build_statement, "updated", "modify")
+    result["tasks"].extend(invalid)
+    return result
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from backend.auth.utils import verify_token, security
 from backend.database.connection import get_db
 from backend.mcp.users import get_user
+from backend.auth.user_cache import user_cache
 
 
 async def get_current_user(
@@ -29,7 +30,8 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = get_user(db, token_data.user_id)
+    # Served from the user cache; the database is only hit on a miss
+    user = user_cache.get_user(token_data.user_id, lambda: get_user(db, token_data.user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
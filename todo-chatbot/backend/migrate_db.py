@@ -1,88 +1,195 @@
 """
 Database migration script for Phase 4 Todo AI Chatbot
 Migrates data from old models to new SQLModel-based models
+Source rows are streamed and inserted in batches; each batch commits with a
+checkpoint, so an interrupted run picks up where it stopped
 """
 
-import sqlite3
-from sqlmodel import Session, select
-from backend.database.v2_connection import engine, get_session
-from backend.models.v2.models import Task, User as NewUser
-from backend.models.user import User as OldUser
+import hashlib
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, insert, select, update
+from backend.database.v2_connection import engine
+from backend.models.v2.models import MigrationCheckpoint, Task, TaskListVersion, TaskStatus
 from backend.models.task import Task as OldTask
 from backend.database.connection import SessionLocal as OldSessionLocal
-from datetime import datetime
+from backend.mcp.v2.task_tools import BULK_CHUNK_SIZE
+
+
+# Tasks inserted per transaction; each commit also moves the checkpoint
+MIGRATE_BATCH_SIZE = int(os.getenv("MIGRATE_BATCH_SIZE", "5000"))
+# Source rows fetched per round trip while streaming
+MIGRATE_YIELD_PER = int(os.getenv("MIGRATE_YIELD_PER", "10000"))
+# Seconds between progress lines
+MIGRATE_PROGRESS_SECONDS = float(os.getenv("MIGRATE_PROGRESS_SECONDS", "5"))
+
+TASKS_CHECKPOINT = "tasks"
+
+_STATUSES = {status.value: status for status in TaskStatus}
+
+
+def task_key(user_id: str, title: Optional[str], description: Optional[str]) -> bytes:
+    """
+    Fixed-size digest of the (user_id, title, description) a task is deduplicated on
+    16 bytes per task keeps the set for millions of tasks in memory
+    """
+    # None and "" are different descriptions; the prefix keeps them apart
+    parts = (user_id, title or "", "-" if description is None else "+" + description)
+    return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).digest()
+
+
+def existing_task_keys(session: Session) -> Set[bytes]:
+    """Keys of every task already in the new database, streamed"""
+    result = session.execute(
+        select(Task.user_id, Task.title, Task.description).execution_options(yield_per=MIGRATE_YIELD_PER)
+    )
+    return {task_key(*row) for row in result}
+
+
+def _load_checkpoint(session: Session, name: str) -> MigrationCheckpoint:
+    checkpoint = session.get(MigrationCheckpoint, name)
+    if checkpoint is None:
+        checkpoint = MigrationCheckpoint(name=name)
+        session.add(checkpoint)
+        session.commit()
+    return checkpoint
+
+
+def _bump_versions(session: Session, user_ids: Iterable[str]):
+    """Invalidate cached task lists of every user the batch added tasks for"""
+    user_ids = sorted(user_ids)
+    for start in range(0, len(user_ids), BULK_CHUNK_SIZE):
+        chunk = user_ids[start:start + BULK_CHUNK_SIZE]
+        session.exec(
+            update(TaskListVersion)
+            .where(TaskListVersion.user_id.in_(chunk))
+            .values(version=TaskListVersion.version + 1)
+        )
+        known = set(session.exec(select(TaskListVersion.user_id).where(TaskListVersion.user_id.in_(chunk))))
+        missing = [{"user_id": user_id, "version": 1} for user_id in chunk if user_id not in known]
+        if missing:
+            session.exec(insert(TaskListVersion), params=missing)
+
+
+def _commit_batch(session: Session, checkpoint: MigrationCheckpoint, rows: List[Dict], last_source_id: int, skipped: int):
+    """Insert one batch and move the checkpoint past it, in one transaction"""
+    if rows:
+        # A Core insert is one executemany; the ORM bulk path splits a batch
+        # wherever a row's None columns differ from the previous row's
+        session.execute(insert(Task.__table__), rows)
+        _bump_versions(session, {row["user_id"] for row in rows})
+    checkpoint.last_source_id = last_source_id
+    checkpoint.migrated += len(rows)
+    checkpoint.skipped += skipped
+    checkpoint.updated_at = datetime.utcnow()
+    session.add(checkpoint)
+    session.commit()
+
+
+def migrate_tasks(
+    old_db: OrmSession,
+    new_session: Session,
+    batch_size: int = MIGRATE_BATCH_SIZE,
+    yield_per: int = MIGRATE_YIELD_PER,
+    progress_seconds: float = MIGRATE_PROGRESS_SECONDS
+) -> MigrationCheckpoint:
+    """
+    Copy old tasks into the new task table, in source id order, skipping any
+    whose (user_id, title, description) the new table already holds
+    Resumes after the checkpoint's last_source_id; returns the final checkpoint
+    """
+    checkpoint = _load_checkpoint(new_session, TASKS_CHECKPOINT)
+    if checkpoint.completed_at is not None:
+        print(f"Tasks already migrated ({checkpoint.migrated} migrated, {checkpoint.skipped} skipped)")
+        return checkpoint
+    if checkpoint.last_source_id:
+        print(f"Resuming after source task {checkpoint.last_source_id} ({checkpoint.migrated} migrated so far)")
+    
+    started = time.perf_counter()
+    seen = existing_task_keys(new_session)
+    print(f"Loaded {len(seen)} existing task keys in {time.perf_counter() - started:.1f}s")
+    
+    statement = (
+        select(
+            OldTask.id, OldTask.user_id, OldTask.title, OldTask.description,
+            OldTask.status, OldTask.created_at, OldTask.updated_at
+        )
+        .where(OldTask.id > checkpoint.last_source_id)
+        .order_by(OldTask.id)
+        .execution_options(yield_per=yield_per)
+    )
+    
+    rows: List[Dict] = []
+    skipped = 0
+    last_source_id = checkpoint.last_source_id
+    processed = 0
+    started = last_report = time.perf_counter()
+    for source_id, user_id, title, description, status, created_at, updated_at in old_db.execute(statement):
+        # In the new model user_id is a string
+        user_id = str(user_id)
+        key = task_key(user_id, title, description)
+        if key in seen:
+            skipped += 1
+        else:
+            seen.add(key)
+            created_at = created_at or datetime.utcnow()
+            rows.append({
+                "user_id": user_id,
+                "title": title,
+                "description": description,
+                "status": _STATUSES.get(status, TaskStatus.pending),
+                "created_at": created_at,
+                "updated_at": updated_at or created_at,
+            })
+        last_source_id = source_id
+        processed += 1
+    
+        if len(rows) + skipped >= batch_size:
+            _commit_batch(new_session, checkpoint, rows, last_source_id, skipped)
+            rows, skipped = [], 0
+            now = time.perf_counter()
+            if now - last_report >= progress_seconds:
+                last_report = now
+                print(f"Processed {processed} tasks ({processed / (now - started):.0f} rows/s), "
+                      f"{checkpoint.migrated} migrated, {checkpoint.skipped} skipped, "
+                      f"checkpoint at source task {last_source_id}")
+    
+    _commit_batch(new_session, checkpoint, rows, last_source_id, skipped)
+    checkpoint.completed_at = datetime.utcnow()
+    new_session.add(checkpoint)
+    new_session.commit()
+    elapsed = time.perf_counter() - started
+    print(f"Processed {processed} tasks in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.0f} rows/s): "
+          f"{checkpoint.migrated} migrated, {checkpoint.skipped} skipped")
+    return checkpoint
 
 
 def migrate_data():
     """
     Migrate data from old SQLAlchemy models to new SQLModel models
+    Users have no table in the new models: tasks keep the old user id as a string
     """
     print("Starting data migration from old models to new SQLModel-based models...")
+    MigrationCheckpoint.__table__.create(bind=engine, checkfirst=True)
     
-    # Create old session
     old_db = OldSessionLocal()
-    
-    # Create new session
-    new_session_gen = get_session()
-    new_session = next(new_session_gen)
-    
+    new_session = Session(engine)
     try:
-        # Migrate users
-        old_users = old_db.query(OldUser).all()
-        print(f"Migrating {len(old_users)} users...")
-        
-        for old_user in old_users:
-            # In the new model, user_id is a string, so we'll use the email as the identifier
-            # Check if user already exists
-            existing_user_query = select(NewUser).where(NewUser.email == old_user.email)
-            existing_user = new_session.exec(existing_user_query).first()
-            
-            if not existing_user:
-                # Create new user record (though NewUser isn't defined in the new models)
-                # Actually, looking back at the spec, we don't need a separate User model
-                # since user_id is just a string in the new models
-                print(f"Migrated user: {old_user.email}")
-        
-        # Migrate tasks
-        old_tasks = old_db.query(OldTask).all()
-        print(f"Migrating {len(old_tasks)} tasks...")
-        
-        for old_task in old_tasks:
-            # Convert old task to new task
-            # Note: In the new model, user_id is a string, but in the old model it was an integer
-            # We'll need to handle this conversion appropriately
-            new_task = Task(
-                user_id=str(old_task.user_id),  # Convert to string as per spec
-                title=old_task.title,
-                description=old_task.description,
-                status=old_task.status,  # This might need mapping depending on enum values
-                created_at=old_task.created_at,
-                updated_at=old_task.updated_at or old_task.created_at
-            )
-            
-            # Check if task already exists
-            existing_task_query = select(Task).where(
-                Task.user_id == str(old_task.user_id),
-                Task.title == old_task.title,
-                Task.description == old_task.description
-            )
-            existing_task = new_session.exec(existing_task_query).first()
-            
-            if not existing_task:
-                new_session.add(new_task)
-                print(f"Migrated task: {old_task.title} for user {old_task.user_id}")
-        
-        # Commit the changes
-        new_session.commit()
+        migrate_tasks(old_db, new_session)
         print("Data migration completed successfully!")
-        
     except Exception as e:
-        print(f"Error during migration: {str(e)}")
         new_session.rollback()
+        print(f"Error during migration: {str(e)}")
+        print("Committed batches are kept; run the migration again to resume")
+        raise
     finally:
         old_db.close()
         new_session.close()
 
 
 if __name__ == "__main__":
-    migrate_data()
\ No newline at end of file
+    migrate_data()
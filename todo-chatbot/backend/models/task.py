@@ -3,8 +3,9 @@ Models for Phase 4 backend system
 All persistent state lives in the database
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index, ForeignKey
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
 from sqlalchemy.orm import relationship
 from backend.database.connection import Base
 
@@ -15,12 +16,18 @@ class Task(Base):
     MCP tools are the only way to create, update, or delete tasks
     """
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset pagination of a user's tasks by created_at or title
+        Index("ix_tasks_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_tasks_user_id_title_id", "user_id", "title", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(Text)
     status = Column(String, default="pending")  # pending, in_progress, completed
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set in Python as well, so SQLite stores it in the same format keyset cursors bind
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     user_id = Column(Integer, ForeignKey("users.id"), index=True)  # Associated user
     
@@ -7,10 +7,7 @@ MCP tools are the only way to create, update, or delete users
 from sqlalchemy import Column, Integer, String, DateTime
 from sqlalchemy.sql import func
 from backend.database.connection import Base
-from passlib.context import CryptContext
-
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from backend.auth.passwords import pwd_context
 
 
 class User(Base):
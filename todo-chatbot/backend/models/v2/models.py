@@ -4,6 +4,7 @@ Using SQLModel for the ORM
 """
 
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -20,6 +21,13 @@ class Task(SQLModel, table=True):
     Task model representing todo items
     Following the specification: user_id, id, title, description, completed, created_at, updated_at
     """
+    __table_args__ = (
+        # Keyset pagination per user, for each list_tasks sort and the status filter
+        Index("ix_task_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_task_user_id_status_created_at_id", "user_id", "status", "created_at", "id"),
+        Index("ix_task_user_id_title_id", "user_id", "title", "id"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(index=True)  # Changed from int to str to match spec
     title: str
@@ -50,9 +58,54 @@ class Message(SQLModel, table=True):
     Message model representing chat history
     Following the specification: user_id, id, conversation_id, role (user/assistant), content, created_at
     """
+    __table_args__ = (
+        # Keyset pagination over a conversation's history
+        Index("ix_message_conversation_id_id", "conversation_id", "id"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(index=True)
     conversation_id: int = Field(index=True)  # Removed foreign key constraint for simplicity
     role: MessageRole
     content: str
-    created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+
+
+class ConversationSummary(SQLModel, table=True):
+    """
+    Rolling summary of a conversation, updated incrementally off the request path
+    last_message_id is the watermark: every message up to it is folded into summary
+    """
+    __tablename__ = "conversation_summary"
+    
+    conversation_id: int = Field(primary_key=True)
+    summary: str = ""
+    last_message_id: int = 0
+    message_count: int = 0
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+
+
+class TaskListVersion(SQLModel, table=True):
+    """
+    Per-user version of the task list, bumped by every task write in the same
+    transaction; cached list_tasks results are only served for the current version
+    """
+    __tablename__ = "task_list_version"
+    
+    user_id: str = Field(primary_key=True)
+    version: int = 0
+
+
+class MigrationCheckpoint(SQLModel, table=True):
+    """
+    Progress of a resumable data migration, committed with each batch it covers
+    last_source_id is the watermark: every source row up to it has been handled
+    """
+    __tablename__ = "migration_checkpoint"
+    
+    name: str = Field(primary_key=True)
+    last_source_id: int = 0
+    migrated: int = 0
+    skipped: int = 0
+    completed_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,64 @@
+"""
+Microbenchmark: per-turn agent overhead
+Measures getting the shared agent plus a turn that calls no tools, next to
+building a fresh agent per request, and exits non-zero when the per-turn
+overhead exceeds AGENT_OVERHEAD_BUDGET_US
+
+Usage (from todo-chatbot/):
+    python -m benchmarks.bench_agent_overhead
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from backend.agents.todo_agent import TodoAgent, get_agent
+from backend.agents.tool_schemas import build_tool_schemas
+from backend.mcp.v2.server import TOOL_FUNCTIONS
+
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "20000"))
+AGENT_OVERHEAD_BUDGET_US = float(os.getenv("AGENT_OVERHEAD_BUDGET_US", "50"))
+
+
+def per_call_us(fn, iterations: int = ITERATIONS) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, (time.perf_counter() - start) / iterations * 1e6)
+    return best
+
+
+async def turn_us(iterations: int = ITERATIONS) -> float:
+    """Shared agent plus a turn that needs no tool call"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await get_agent().run("hello there", "bench", [])
+        best = min(best, (time.perf_counter() - start) / iterations * 1e6)
+    return best
+
+
+def main():
+    get_agent()
+    shared = per_call_us(get_agent)
+    fresh = per_call_us(TodoAgent, ITERATIONS // 10)
+    schemas = per_call_us(lambda: build_tool_schemas(TOOL_FUNCTIONS), ITERATIONS // 100)
+    turn = asyncio.run(turn_us())
+
+    print(f"get_agent():          {shared:8.2f} us")
+    print(f"TodoAgent():          {fresh:8.2f} us")
+    print(f"build_tool_schemas(): {schemas:8.2f} us")
+    print(f"no-tool turn:         {turn:8.2f} us (budget {AGENT_OVERHEAD_BUDGET_US:.0f} us)")
+
+    if turn > AGENT_OVERHEAD_BUDGET_US:
+        print("FAIL: per-turn agent overhead is over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: async vs blocking database path for chat turns
+Runs concurrent chat turns (history load, add_task tool, messages store)
+and reports throughput, turn latency, event loop lag and commits per turn
+for each mode
+
+Usage (from todo-chatbot/):
+    DATABASE_URL=sqlite:////tmp/bench_chat.db python -m benchmarks.bench_async_chat
+"""
+
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/bench_chat.db")
+os.environ["USE_ASYNC_DB"] = "true"
+# The blocking path holds a pooled connection across the whole turn and waits for
+# the pool on the event loop thread, so size the pool above the concurrency
+os.environ.setdefault("DB_POOL_SIZE", "100")
+
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.database.v2_connection import engine, async_engine, run_in_session
+from backend.api.v2_chat import _start_turn, _finish_turn
+from backend.mcp.v2.server import mcp_server
+import backend.models.v2.models  # noqa: F401 - register tables
+
+
+TURNS = int(os.getenv("BENCH_TURNS", "400"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "50"))
+
+
+async def chat_turn(use_async: bool, user_id: str):
+    if use_async:
+        session = AsyncSession(async_engine, expire_on_commit=False)
+    else:
+        session = Session(engine)
+    try:
+        conversation, _ = await run_in_session(session, _start_turn, None, user_id)
+        await mcp_server.execute_tool(
+            "add_task", {"user_id": user_id, "title": "Buy milk"}, session=session
+        )
+        await run_in_session(
+            session, _finish_turn, conversation, user_id, "add buy milk", "I've added 'Buy milk'."
+        )
+    finally:
+        if use_async:
+            await session.close()
+        else:
+            session.close()
+
+
+async def loop_lag_probe(stop: asyncio.Event, lags: list):
+    """Measure how late the event loop wakes a 1 ms sleeper"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+commits = {"count": 0}
+
+
+def _count_commit(conn):
+    commits["count"] += 1
+
+
+async def run_mode(use_async: bool):
+    mcp_server.use_async = use_async
+    commits["count"] = 0
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+    lags = []
+    stop = asyncio.Event()
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await chat_turn(use_async, f"bench-{i % CONCURRENCY}")
+            latencies.append(time.perf_counter() - start)
+
+    probe = asyncio.create_task(loop_lag_probe(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(TURNS)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+
+    latencies.sort()
+    return {
+        "turns/s": TURNS / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "max_loop_lag_ms": max(lags) * 1000 if lags else 0.0,
+        "commits/turn": commits["count"] / TURNS,
+    }
+
+
+async def main():
+    SQLModel.metadata.create_all(engine)
+    event.listen(engine, "commit", _count_commit)
+    event.listen(async_engine.sync_engine, "commit", _count_commit)
+    for label, use_async in (("sync", False), ("async", True)):
+        result = await run_mode(use_async)
+        print(f"{label:>5}: " + ", ".join(f"{k}={v:.1f}" for k, v in result.items()))
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
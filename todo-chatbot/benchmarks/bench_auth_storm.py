@@ -0,0 +1,108 @@
+"""
+Benchmark: chat latency during a login storm
+Runs a burst of concurrent logins next to a fixed-rate stream of chat turns and
+reports chat p50/p99, login outcomes and event loop lag, with bcrypt inline
+on the event loop versus offloaded to the hashing process pool
+
+Usage (from todo-chatbot/):
+    python -m benchmarks.bench_auth_storm
+"""
+
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:////tmp/bench_auth.db")
+os.environ.setdefault("BENCH_TURNS", "200")
+
+from fastapi import HTTPException
+from backend.database.connection import Base, SessionLocal, engine as users_engine
+from backend.mcp.users import create_user, get_user_by_email
+from backend.api.auth import login, UserLogin
+from backend.auth.passwords import PasswordHasher, password_hasher
+import backend.api.auth as auth_api
+from benchmarks.bench_async_chat import chat_turn, loop_lag_probe, async_engine, engine, SQLModel
+
+
+LOGINS = int(os.getenv("BENCH_LOGINS", "200"))
+LOGIN_CONCURRENCY = int(os.getenv("BENCH_LOGIN_CONCURRENCY", "50"))
+CHAT_TURNS = int(os.getenv("BENCH_CHAT_TURNS", "100"))
+CHAT_INTERVAL = float(os.getenv("BENCH_CHAT_INTERVAL", "0.02"))
+
+EMAIL = "storm@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+async def login_once(outcomes: dict):
+    db = SessionLocal()
+    try:
+        await login(UserLogin(email=EMAIL, password=PASSWORD), db=db)
+        outcomes["ok"] += 1
+    except HTTPException as exc:
+        outcomes[exc.status_code] = outcomes.get(exc.status_code, 0) + 1
+    finally:
+        db.close()
+
+
+async def run_mode(label: str, hasher: PasswordHasher):
+    auth_api.password_hasher = hasher
+    # Start the worker processes before measuring
+    await hasher.hash("warm-up")
+    outcomes = {"ok": 0}
+    chat_latencies = []
+    lags = []
+    stop = asyncio.Event()
+    semaphore = asyncio.Semaphore(LOGIN_CONCURRENCY)
+
+    async def one_login():
+        async with semaphore:
+            await login_once(outcomes)
+
+    async def one_chat(i: int, scheduled: float):
+        await chat_turn(True, f"storm-{i % 10}")
+        # Open-loop: latency counts from when the turn should have started
+        chat_latencies.append(time.perf_counter() - scheduled)
+
+    async def chat_stream():
+        base = time.perf_counter()
+        turns = []
+        for i in range(CHAT_TURNS):
+            scheduled = base + i * CHAT_INTERVAL
+            await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+            turns.append(asyncio.create_task(one_chat(i, scheduled)))
+        await asyncio.gather(*turns)
+
+    probe = asyncio.create_task(loop_lag_probe(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(chat_stream(), *(one_login() for _ in range(LOGINS)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+
+    chat_latencies.sort()
+    shed = sum(v for k, v in outcomes.items() if k != "ok")
+    print(
+        f"{label:>6}: elapsed={elapsed:.1f}s logins_ok={outcomes['ok']} shed_503={shed} "
+        f"chat_p50_ms={statistics.median(chat_latencies) * 1000:.1f} "
+        f"chat_p99_ms={chat_latencies[int(len(chat_latencies) * 0.99) - 1] * 1000:.1f} "
+        f"max_loop_lag_ms={max(lags) * 1000:.1f}"
+    )
+
+
+async def main():
+    Base.metadata.create_all(users_engine)
+    SQLModel.metadata.create_all(engine)
+    db = SessionLocal()
+    if not get_user_by_email(db, EMAIL):
+        create_user(db, EMAIL, PASSWORD)
+    db.close()
+
+    await run_mode("inline", PasswordHasher(workers=0))
+    await run_mode("pool", password_hasher)
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+Benchmark: intent classification throughput
+Parses a generated corpus of chat messages with the previous keyword-scan
+chains and with the compiled intent engine, and reports messages/s and how
+often the two agree on the intent
+
+Usage (from todo-chatbot/):
+    python -m benchmarks.bench_intents
+"""
+
+import os
+import random
+import re
+import time
+
+from backend.agents.intents import task_intents
+
+
+MESSAGES = int(os.getenv("BENCH_MESSAGES", "50000"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "3"))
+
+TEMPLATES = [
+    "Add a task to {title}",
+    "add {title}",
+    "Remember to {title}",
+    "I need to {title} tomorrow",
+    "Create new task to {title}",
+    "Show me all my tasks",
+    "What's pending?",
+    "list my completed tasks",
+    "Mark task {id} as complete",
+    "I'm done with task {id}",
+    "Delete task {id}",
+    "please remove {id}",
+    "Change task {id} to '{title}'",
+    "rename task {id}",
+    "hello there, how are you today?",
+    "Can you tell me a joke about {title}?",
+]
+TITLES = [
+    "buy groceries", "call mom tonight", "finish the quarterly report",
+    "book flights to Lisbon", "water the plants", "renew passport",
+    "prepare slides for Monday standup", "pay the electricity bill",
+]
+
+
+def legacy_parse(message: str):
+    """The keyword-scan chain previously inlined in every chatbot"""
+    text = message.lower()
+    if any(k in text for k in ["add", "create", "new task", "remember", "note", "schedule"]):
+        title = text
+        for phrase in ["add", "create", "new task to", "remember to", "note to", "i need to", "i have to"]:
+            title = title.replace(phrase, "").strip()
+        return "add", title.capitalize(), (), None
+    if any(k in text for k in ["show", "list", "see", "view", "display", "my tasks", "what"]):
+        status = None
+        if "pending" in text or "incomplete" in text:
+            status = "pending"
+        elif "completed" in text or "done" in text:
+            status = "completed"
+        return "list", "", (), status
+    if any(k in text for k in ["complete", "done", "finish", "mark as done"]):
+        return "complete", "", tuple(int(n) for n in re.findall(r"\d+", text)), None
+    if any(k in text for k in ["delete", "remove", "cancel", "eliminate"]):
+        return "delete", "", tuple(int(n) for n in re.findall(r"\d+", text)), None
+    if any(k in text for k in ["update", "change", "modify", "edit", "rename"]):
+        return "update", "", (), None
+    return None, "", (), None
+
+
+def build_corpus(size: int):
+    rng = random.Random(42)
+    return [
+        rng.choice(TEMPLATES).format(title=rng.choice(TITLES), id=rng.randint(1, 5000))
+        for _ in range(size)
+    ]
+
+
+def throughput(parse, corpus):
+    best = 0.0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for message in corpus:
+            parse(message)
+        best = max(best, len(corpus) / (time.perf_counter() - start))
+    return best
+
+
+def main():
+    corpus = build_corpus(MESSAGES)
+    legacy = throughput(legacy_parse, corpus)
+    engine = throughput(task_intents.parse, corpus)
+    agree = sum(legacy_parse(m)[0] == task_intents.parse(m).intent for m in corpus) / len(corpus)
+    print(f"messages={len(corpus)}")
+    print(f"  legacy: {legacy:,.0f} msg/s")
+    print(f"  engine: {engine:,.0f} msg/s ({engine / legacy:.2f}x)")
+    print(f"  intent agreement: {agree:.1%}")
+
+
+if __name__ == "__main__":
+    main()
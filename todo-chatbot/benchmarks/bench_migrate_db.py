@@ -0,0 +1,144 @@
+"""
+Benchmark: migrating old tasks into the new task table
+Seeds BENCH_MIGRATE_TASKS old tasks (default 200k, a few percent of them
+already migrated or duplicated), runs the streaming migration with an
+interruption halfway, resumes it, and checks every task arrived exactly once.
+Also times the previous row-by-row "already exists?" approach on a slice
+
+Usage (from todo-chatbot/):
+    python -m benchmarks.bench_migrate_db
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import func, insert as sa_insert
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import Session, SQLModel, insert, select
+
+from backend import migrate_db
+from backend.database.connection import Base
+from backend.database.engine import create_db_engine
+from backend.models.task import Task as OldTask
+from backend.models.v2.models import MigrationCheckpoint, Task, TaskStatus
+
+
+TASKS = int(os.getenv("BENCH_MIGRATE_TASKS", "200000"))
+USERS = int(os.getenv("BENCH_MIGRATE_USERS", "1000"))
+# Tasks the previous approach is timed on; it makes one query per task
+LEGACY_TASKS = int(os.getenv("BENCH_MIGRATE_LEGACY_TASKS", "5000"))
+BATCH = 50000
+
+
+def seed(old_engine, new_engine):
+    rng = random.Random(11)
+    now = datetime(2024, 1, 1)
+    preexisting = []
+    with old_engine.begin() as conn:
+        for start in range(0, TASKS, BATCH):
+            rows = []
+            for i in range(start, min(start + BATCH, TASKS)):
+                # Every 50th task repeats an earlier one
+                n = rng.randrange(max(i, 1)) if i % 50 == 49 else i
+                rows.append({
+                    "user_id": n % USERS,
+                    "title": f"task {n}",
+                    "description": None if n % 3 else f"details {n}",
+                    "status": "completed" if n % 4 == 0 else "pending",
+                    "created_at": now,
+                    "updated_at": None,
+                })
+            conn.execute(sa_insert(OldTask.__table__), rows)
+            # Every 40th was migrated by an earlier run
+            preexisting += [
+                {"user_id": str(r["user_id"]), "title": r["title"], "description": r["description"],
+                 "status": TaskStatus.pending, "created_at": now, "updated_at": now}
+                for r in rows[::40]
+            ]
+    with Session(new_engine) as session:
+        session.exec(insert(Task), params=preexisting)
+        session.commit()
+
+
+def expected_count(old_engine) -> int:
+    with old_engine.connect() as conn:
+        return conn.exec_driver_sql(
+            "SELECT count(*) FROM (SELECT DISTINCT user_id, title, coalesce('+' || description, '-') FROM tasks)"
+        ).scalar()
+
+
+def legacy_rate(old_session_factory, new_engine) -> float:
+    """Rows/s of the previous approach: one existence query and one add per task"""
+    old_db = old_session_factory()
+    start = time.perf_counter()
+    with Session(new_engine) as session:
+        for old in old_db.query(OldTask).limit(LEGACY_TASKS).all():
+            existing = session.exec(select(Task).where(
+                Task.user_id == str(old.user_id),
+                Task.title == old.title,
+                Task.description == old.description
+            )).first()
+            if not existing:
+                session.add(Task(user_id=str(old.user_id), title=old.title, description=old.description,
+                                 status=TaskStatus.pending, created_at=old.created_at, updated_at=old.created_at))
+        session.rollback()
+    old_db.close()
+    return LEGACY_TASKS / (time.perf_counter() - start)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        old_engine = create_db_engine(f"sqlite:///{tmp}/old.db")
+        new_engine = create_db_engine(f"sqlite:///{tmp}/new.db")
+        Base.metadata.create_all(old_engine)
+        SQLModel.metadata.create_all(new_engine)
+        OldSession = sessionmaker(bind=old_engine)
+
+        start = time.perf_counter()
+        seed(old_engine, new_engine)
+        print(f"Seeded {TASKS} old tasks in {time.perf_counter() - start:.1f}s")
+        expected = expected_count(old_engine)
+
+        print(f"Previous approach: {legacy_rate(OldSession, new_engine):.0f} rows/s over {LEGACY_TASKS} tasks")
+
+        # Stop the first run halfway through, as a crash would
+        commit_batch = migrate_db._commit_batch
+        calls = {"n": 0}
+
+        def failing_commit(*args, **kwargs):
+            calls["n"] += 1
+            if calls["n"] > TASKS // migrate_db.MIGRATE_BATCH_SIZE // 2:
+                raise Interrupted()
+            commit_batch(*args, **kwargs)
+
+        migrate_db._commit_batch = failing_commit
+        start = time.perf_counter()
+        with Session(new_engine) as session:
+            try:
+                migrate_db.migrate_tasks(OldSession(), session)
+            except Interrupted:
+                session.rollback()
+        migrate_db._commit_batch = commit_batch
+        with Session(new_engine) as session:
+            checkpoint = session.get(MigrationCheckpoint, migrate_db.TASKS_CHECKPOINT)
+            print(f"Interrupted at source task {checkpoint.last_source_id}")
+            checkpoint = migrate_db.migrate_tasks(OldSession(), session)
+        elapsed = time.perf_counter() - start
+
+        with Session(new_engine) as session:
+            total = session.exec(select(func.count()).select_from(Task)).one()
+        print(f"Streaming migration: {TASKS / elapsed:.0f} rows/s overall, including the interruption")
+        print(f"New task table holds {total} tasks, {expected} distinct expected")
+        if total != expected:
+            raise SystemExit("Mismatch: tasks were lost or duplicated")
+
+
+if __name__ == "__main__":
+    main()
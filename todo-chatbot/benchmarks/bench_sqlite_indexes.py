@@ -0,0 +1,100 @@
+"""
+Benchmark: hot todo_api / simple_chatbot queries before and after the migrations
+Builds a database file with the unversioned schema, times the hot queries,
+upgrades it in place with migrate(), then checks with EXPLAIN QUERY PLAN that
+every hot query uses an index and times them again. Exits non-zero when a
+hot query still scans a table
+
+Usage (from todo-chatbot/):
+    python -m benchmarks.bench_sqlite_indexes
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from backend.database.sqlite_migrations import LATEST_VERSION, migrate, schema_version
+
+
+TASKS = int(os.getenv("BENCH_TASKS", "200000"))
+USERS = int(os.getenv("BENCH_USERS", "1000"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "50"))
+
+# (label, statement, parameters) as issued by todo_api.py and simple_chatbot.py
+HOT_QUERIES = [
+    ("list all", "SELECT * FROM tasks WHERE user_id = ?", (42,)),
+    ("list by status", "SELECT * FROM tasks WHERE user_id = ? AND status = ?", (42, "pending")),
+    ("first page", "SELECT id, created_at FROM tasks WHERE user_id = ? ORDER BY created_at ASC, id ASC LIMIT ?", (42, 51)),
+    ("owned update", "UPDATE tasks SET status = 'completed' WHERE id = ? AND user_id = ?", (4242, 42)),
+    ("owned delete", "DELETE FROM tasks WHERE id = ? AND user_id = ?", (-1, 42)),
+    ("login", "SELECT id FROM users WHERE username = ? AND password = ?", ("user42", "secret")),
+]
+
+
+def seed(path: str):
+    """A file as created before schema versioning"""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT UNIQUE, password TEXT)")
+    conn.execute("""CREATE TABLE tasks (id INTEGER PRIMARY KEY, user_id INTEGER, title TEXT,
+                    description TEXT, status TEXT, created_at TIMESTAMP)""")
+    rng = random.Random(7)
+    conn.executemany("INSERT INTO users (username, password) VALUES (?, ?)",
+                     [(f"user{i}", "secret") for i in range(USERS)])
+    conn.executemany(
+        "INSERT INTO tasks (user_id, title, description, status, created_at) VALUES (?, ?, '', ?, ?)",
+        [(rng.randrange(USERS), f"task {i}", rng.choice(["pending", "completed"]), f"2024-01-01 00:00:{i:09d}")
+         for i in range(TASKS)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def time_queries(conn: sqlite3.Connection) -> dict:
+    timings = {}
+    for label, statement, params in HOT_QUERIES:
+        best = float("inf")
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            conn.execute(statement, params).fetchall()
+            best = min(best, time.perf_counter() - start)
+        conn.rollback()
+        timings[label] = best * 1000
+    return timings
+
+
+def plan(conn: sqlite3.Connection, statement: str, params) -> str:
+    return "; ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", params))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed(path)
+        conn = sqlite3.connect(path)
+        print(f"{TASKS:,} tasks for {USERS:,} users, schema version {schema_version(conn)}")
+        before = time_queries(conn)
+
+        start = time.perf_counter()
+        version = migrate(conn)
+        print(f"migrated to version {version} in {(time.perf_counter() - start) * 1000:.0f}ms")
+        assert version == LATEST_VERSION and migrate(conn) == LATEST_VERSION
+        after = time_queries(conn)
+
+        scans = []
+        for label, statement, params in HOT_QUERIES:
+            query_plan = plan(conn, statement, params)
+            if "SCAN" in query_plan:
+                scans.append(label)
+            print(f"  {label:<15} {before[label]:8.3f}ms -> {after[label]:7.3f}ms  {query_plan}")
+        conn.close()
+
+    if scans:
+        print(f"FAIL: full table scans in {', '.join(scans)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: task listing cost as a user's task count grows
+Times the first and a deep keyset page of list_tasks, count_tasks and loading
+every task, for users with 1k, 10k and 50k tasks, and prints the query plan
+of a page so the composite index can be checked
+
+Usage (from todo-chatbot/):
+    python -m benchmarks.bench_task_pages
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine, insert, select
+
+from backend.mcp.v2.list_cache import task_list_cache
+from backend.mcp.v2.task_tools import count_tasks, list_tasks
+from backend.models.v2.models import Task, TaskStatus
+
+
+SIZES = [int(n) for n in os.getenv("BENCH_TASK_COUNTS", "1000,10000,50000").split(",")]
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "20"))
+
+
+def seed(session: Session, user_id: str, count: int):
+    start = datetime(2024, 1, 1)
+    rows = [
+        {
+            "user_id": user_id,
+            "title": f"Task {i:06d}",
+            "status": TaskStatus.completed if i % 3 == 0 else TaskStatus.pending,
+            "created_at": start + timedelta(seconds=i),
+            "updated_at": start + timedelta(seconds=i),
+        }
+        for i in range(count)
+    ]
+    session.exec(insert(Task), params=rows)
+    session.commit()
+
+
+def best_ms(fn) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        # Measure the database path, not the list cache
+        task_list_cache.clear()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def deep_cursor(session: Session, user_id: str, count: int) -> str:
+    """Cursor into the middle of the user's tasks"""
+    page = list_tasks(session, user_id, limit=200)
+    for _ in range(count // 2 // 200):
+        page = list_tasks(session, user_id, limit=200, cursor=page["next_cursor"])
+    return page["next_cursor"]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            print(f"{'tasks':>7} {'first page':>11} {'deep page':>10} {'titles x5':>10} {'counts':>8} {'load all':>9}")
+            for count in SIZES:
+                user_id = f"user-{count}"
+                seed(session, user_id, count)
+                cursor = deep_cursor(session, user_id, count)
+                first = best_ms(lambda: list_tasks(session, user_id))
+                deep = best_ms(lambda: list_tasks(session, user_id, cursor=cursor))
+                titles = best_ms(lambda: list_tasks(session, user_id, "pending", limit=5, fields=["title"]))
+                counts = best_ms(lambda: count_tasks(session, user_id))
+                load_all = best_ms(lambda: session.exec(select(Task).where(Task.user_id == user_id)).all())
+                print(f"{count:>7} {first:>9.2f}ms {deep:>8.2f}ms {titles:>8.2f}ms {counts:>6.2f}ms {load_all:>7.2f}ms")
+                session.expunge_all()
+
+            plan = session.exec(text(
+                "EXPLAIN QUERY PLAN SELECT id, created_at, title FROM task "
+                "WHERE user_id = :user_id AND (created_at, id) > (:created_at, :id) "
+                "ORDER BY created_at, id LIMIT 51"
+            ), params={"user_id": "user-1000", "created_at": "2024-01-01", "id": 0}).all()
+            print("page query plan:")
+            for row in plan:
+                print("  " + row[-1])
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
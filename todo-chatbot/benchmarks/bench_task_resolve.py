@@ -0,0 +1,105 @@
+"""
+Benchmark: resolve_task latency for users with many tasks
+Seeds BENCH_USERS users with BENCH_TASKS_PER_USER tasks each (default 10k)
+through the trigram triggers, then times resolving exact, partial and
+misspelled names next to listing the user's tasks and matching in Python
+
+Usage (from todo-chatbot/):
+    python -m benchmarks.bench_task_resolve
+"""
+
+import difflib
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from sqlmodel import Session, SQLModel, create_engine, insert, select
+
+from backend.mcp.v2.list_cache import task_list_cache
+from backend.mcp.v2.task_tools import resolve_task
+from backend.models.v2.models import Task, TaskStatus
+
+
+TASKS_PER_USER = int(os.getenv("BENCH_TASKS_PER_USER", "10000"))
+USERS = int(os.getenv("BENCH_USERS", "10"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "20"))
+BATCH = 50000
+
+VERBS = ["buy", "call", "email", "fix", "pay", "book", "clean", "plan", "review", "send"]
+OBJECTS = [
+    "groceries", "mom", "landlord", "bike", "rent", "flights", "garage", "party",
+    "report", "invoice", "dentist", "car", "slides", "budget", "garden", "passport",
+]
+
+
+def seed(session: Session):
+    rng = random.Random(7)
+    now = datetime(2024, 1, 1)
+    total = TASKS_PER_USER * USERS
+    for start in range(0, total, BATCH):
+        rows = [
+            {
+                "user_id": str(i % USERS),
+                "title": f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {i}",
+                "status": TaskStatus.pending,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(start, min(start + BATCH, total))
+        ]
+        session.exec(insert(Task), params=rows)
+        session.commit()
+    # One distinctive task per user to resolve
+    for user in range(USERS):
+        session.add(Task(user_id=str(user), title="Renew passport before the trip", status=TaskStatus.pending))
+    session.commit()
+
+
+def best_ms(fn) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        # Measure the database path, not the list cache
+        task_list_cache.clear()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def list_and_match(session: Session, user_id: str, name: str):
+    titles = session.exec(select(Task.id, Task.title).where(Task.user_id == user_id)).all()
+    return max(titles, key=lambda row: difflib.SequenceMatcher(None, name.lower(), row.title.lower()).ratio())
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            start = time.perf_counter()
+            seed(session)
+            print(f"seeded {USERS:,} users x {TASKS_PER_USER:,} tasks in {time.perf_counter() - start:.1f}s")
+
+            names = [
+                ("exact", "renew passport before the trip"),
+                ("partial", "passport renewal"),
+                ("misspelled", "renw pasport"),
+                ("common words", "buy groceries"),
+            ]
+            user_id = "3"
+            print(f"user {user_id!r}, resolve_task vs listing every task and matching in Python:")
+            for label, name in names:
+                found = resolve_task(session, user_id, name)
+                resolved = best_ms(lambda: resolve_task(session, user_id, name))
+                listed = best_ms(lambda: list_and_match(session, user_id, name))
+                print(
+                    f"  {label:<12} {name!r:<34} {resolved:7.2f}ms  list+match {listed:8.2f}ms"
+                    f"  -> {found.get('title')!r} ({found.get('confidence')})"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
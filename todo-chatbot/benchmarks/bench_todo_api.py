@@ -0,0 +1,88 @@
+"""
+Load test: todo_api.py request rate with pooled connections
+Drives a mix of task listings, task creation and chat messages through the
+app from BENCH_CLIENTS threads, once with the pooled get_db dependency and once
+with a connection opened and closed per request (the previous behaviour)
+
+Usage (from todo-chatbot/):
+    python -m benchmarks.bench_todo_api
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("TODO_API_DB", os.path.join(tempfile.mkdtemp(), "bench_todo_api.db"))
+
+from fastapi.testclient import TestClient
+
+import todo_api
+
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "3000"))
+CLIENTS = [int(n) for n in os.getenv("BENCH_CLIENTS", "1,4,16").split(",")]
+USERS = 50
+
+
+def connection_per_request():
+    conn = sqlite3.connect(todo_api.DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def request(client: TestClient, i: int):
+    user_id = i % USERS
+    kind = i % 10
+    if kind < 6:
+        response = client.get(f"/tasks/{user_id}", params={"limit": 20})
+    elif kind < 8:
+        response = client.post("/tasks/", json={"user_id": user_id, "title": f"task {i}"})
+    else:
+        response = client.post("/chat/", json={"user_id": user_id, "message": "show my pending tasks"})
+    assert response.status_code == 200, response.text
+
+
+def run(clients: int) -> float:
+    """Requests per second with `clients` threads sharing REQUESTS requests"""
+    counter = iter(range(REQUESTS))
+    lock = threading.Lock()
+
+    def worker():
+        with TestClient(todo_api.app) as client:
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                request(client, i)
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return REQUESTS / (time.perf_counter() - start)
+
+
+def main():
+    with TestClient(todo_api.app) as client:
+        for i in range(USERS * 20):
+            client.post("/tasks/", json={"user_id": i % USERS, "title": f"seed {i}"})
+    print(f"{REQUESTS:,} requests (60% list, 20% create, 20% chat) against {todo_api.DATABASE_PATH}")
+    for clients in CLIENTS:
+        todo_api.app.dependency_overrides[todo_api.get_db] = connection_per_request
+        per_request = run(clients)
+        todo_api.app.dependency_overrides.clear()
+        pooled = run(clients)
+        print(f"  {clients:>3} clients: open/close {per_request:7.0f} req/s  pooled {pooled:7.0f} req/s"
+              f"  ({pooled / per_request:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,9 @@ Creates all tables based on new SQLModel models
 """
 
 from backend.database.v2_connection import engine
-from backend.models.v2.models import Task, Conversation, Message
+from backend.models.v2.models import Task, Conversation, Message, ConversationSummary, TaskListVersion
+from backend.database.task_search import install_task_search
+from backend.database.task_trigrams import install_task_trigrams
 
 
 def init_db():
@@ -15,8 +17,18 @@ def init_db():
     Task.metadata.create_all(bind=engine)
     Conversation.metadata.create_all(bind=engine)
     Message.metadata.create_all(bind=engine)
+    ConversationSummary.metadata.create_all(bind=engine)
+    TaskListVersion.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add any new indexes explicitly
+    for table in (Task.__table__, Conversation.__table__, Message.__table__):
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    # Full-text search and title trigram indexes, filled from any existing tasks
+    with engine.begin() as connection:
+        install_task_search(connection)
+        install_task_trigrams(connection)
     print("Database initialized successfully!")
-    print("Tables created: tasks, conversations, messages")
+    print("Tables created: tasks, conversations, messages, conversation summaries, task list versions, task search and trigram indexes")
     print("All persistent state will live in the database as per Phase 4 constitution.")
 
 
@@ -0,0 +1,168 @@
+"""
+In-memory cache for the chat page and static files
+Each file is read once (again only when its mtime changes), compressed ahead
+of time and served with a strong ETag, so repeat requests get 304 Not Modified
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Seconds between mtime checks of a cached file; 0 reads each file only once
+STATIC_RELOAD_SECONDS = float(os.getenv("STATIC_RELOAD_SECONDS", "2"))
+# Browser cache lifetime of static files; the chat page always revalidates
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "86400"))
+
+# Smaller files are not worth a compressed variant
+_MIN_COMPRESS_SIZE = 256
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+def _compress(body: bytes) -> Dict[str, bytes]:
+    variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+
+
+def _accepted(header: str) -> Dict[str, float]:
+    """Codings of an Accept-Encoding header with their q-values"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    return accepted
+
+
+class Asset:
+    """One file's bytes, compressed variants and validators"""
+
+    __slots__ = ("body", "variants", "etag", "media_type", "mtime_ns", "size", "checked_at")
+
+    def __init__(self, path: str):
+        stat = os.stat(path)
+        with open(path, "rb") as f:
+            self.body = f.read()
+        self.mtime_ns, self.size = stat.st_mtime_ns, stat.st_size
+        self.media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        compressible = self.media_type.startswith(_COMPRESSIBLE) and len(self.body) >= _MIN_COMPRESS_SIZE
+        self.variants = _compress(self.body) if compressible else {}
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.checked_at = time.monotonic()
+
+    def tag(self, encoding: Optional[str]) -> str:
+        # Each encoding is its own representation, so it needs its own strong tag
+        return f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+
+    def encoding_for(self, accept_encoding: str) -> Optional[str]:
+        accepted = _accepted(accept_encoding)
+        candidates = [
+            encoding for encoding in ("br", "gzip")
+            if encoding in self.variants and accepted.get(encoding, accepted.get("*", 0)) > 0
+        ]
+        return max(candidates, key=lambda encoding: accepted.get(encoding, accepted.get("*", 0)), default=None)
+
+
+class AssetCache:
+    """Files under one directory, loaded on first request and kept in memory"""
+
+    def __init__(self, directory: str, reload_seconds: float = STATIC_RELOAD_SECONDS):
+        self.directory = os.path.realpath(directory)
+        self.reload_seconds = reload_seconds
+        self._assets: Dict[str, Asset] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Optional[str]:
+        path = os.path.realpath(os.path.join(self.directory, name))
+        # Never serve anything outside the directory
+        if not path.startswith(self.directory + os.sep):
+            return None
+        return path
+
+    def get(self, name: str) -> Optional[Asset]:
+        """The cached file, reloaded when its mtime or size changed; None if it doesn't exist"""
+        # One entry per file, however the name is spelled
+        name = os.path.normpath(name)
+        asset = self._assets.get(name)
+        if asset is not None and (not self.reload_seconds or time.monotonic() - asset.checked_at < self.reload_seconds):
+            return asset
+
+        path = self._path(name)
+        if path is None:
+            return None
+        with self._lock:
+            asset = self._assets.get(name)
+            try:
+                stat = os.stat(path)
+                if asset is None or (stat.st_mtime_ns, stat.st_size) != (asset.mtime_ns, asset.size):
+                    if not os.path.isfile(path):
+                        return None
+                    asset = Asset(path)
+                    self._assets[name] = asset
+                else:
+                    asset.checked_at = time.monotonic()
+            except FileNotFoundError:
+                self._assets.pop(name, None)
+                return None
+            return asset
+
+    def preload(self) -> int:
+        """Read and compress every file now, so no request pays for it; returns the file count"""
+        count = 0
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                if self.get(os.path.relpath(os.path.join(root, filename), self.directory)) is not None:
+                    count += 1
+        return count
+
+    def response(self, request: Request, name: str, cache_control: str) -> Response:
+        """
+        A 200 with the best encoding the client accepts, a 304 when its copy is current, or a 404
+        May read and compress a changed file, so call it from a sync route (threadpool)
+        """
+        asset = self.get(name)
+        if asset is None:
+            return Response(status_code=404, content="Not Found")
+        encoding = asset.encoding_for(request.headers.get("accept-encoding", ""))
+        tag = asset.tag(encoding)
+        headers = {"ETag": tag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # If-None-Match compares weakly
+            tags = {value.strip()[2:] if value.strip().startswith("W/") else value.strip()
+                    for value in if_none_match.split(",")}
+            if tag in tags or "*" in tags:
+                return Response(status_code=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(
+            content=asset.variants[encoding] if encoding else asset.body,
+            media_type=asset.media_type,
+            headers=headers
+        )
+
+
+# The chat page and everything under /static
+static_assets = AssetCache(os.path.join(os.path.dirname(__file__), "static"))
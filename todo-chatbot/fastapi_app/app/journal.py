@@ -0,0 +1,250 @@
+"""
+Durable snapshot + append-only log for the in-memory todo store
+Changes are appended to a log and fsynced in groups; a snapshot of the whole
+store periodically starts a fresh log, so recovery replays little of it
+"""
+
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from typing import IO, Dict, List, Optional
+
+from app.store import TodoRecord, TodoStore
+
+logger = logging.getLogger(__name__)
+
+# Directory for the snapshot and log files; unset keeps the store in memory only
+TODO_STORE_DIR = os.getenv("TODO_STORE_DIR", "")
+# Logged changes after which a snapshot starts a new log
+TODO_SNAPSHOT_EVERY = int(os.getenv("TODO_SNAPSHOT_EVERY", "100000"))
+# Extra time the flusher waits for more changes to share one fsync
+TODO_LOG_GROUP_MS = float(os.getenv("TODO_LOG_GROUP_MS", "0"))
+
+
+def _encode(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class TodoJournal:
+    """
+    Files in `directory`: snapshot.N holds the store as it was when log.N
+    started (a JSON header line, then one line with every todo), and log.N
+    every change since, one JSON array per line
+    Recovery loads the newest snapshot and replays the logs from its number on.
+    Writers append under the store lock and wait outside it; one flusher thread
+    writes and fsyncs everything appended meanwhile (group commit)
+    """
+
+    def __init__(self, directory: str, snapshot_every: int = TODO_SNAPSHOT_EVERY, group_ms: float = TODO_LOG_GROUP_MS):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.group_ms = group_ms
+        # Interleaved appends from two processes would corrupt the log
+        self._lock_file = open(os.path.join(directory, "LOCK"), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            raise RuntimeError(f"{directory} is used by another process; run a single worker per todo store")
+
+        self._cond = threading.Condition()
+        self._pending: List[str] = []
+        self._appended = 0
+        self._durable = 0
+        self._error: Optional[BaseException] = None
+        self._since_snapshot = 0
+        self._generation = 0
+        self._log: Optional[IO[str]] = None
+        self._store: Optional[TodoStore] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._snapshotter: Optional[threading.Thread] = None
+        self._closing = False
+        self.stats = {"groups": 0, "entries": 0, "snapshots": 0}
+
+    def _path(self, kind: str, generation: int) -> str:
+        return os.path.join(self.directory, f"{kind}.{generation:08d}")
+
+    def _generations(self, kind: str) -> List[int]:
+        prefix = kind + "."
+        return sorted(
+            int(name[len(prefix):]) for name in os.listdir(self.directory)
+            if name.startswith(prefix) and name[len(prefix):].isdigit()
+        )
+
+    def recover(self, store: TodoStore) -> Dict[str, float]:
+        """Load the newest snapshot into `store` and replay the logs written after it"""
+        start = time.perf_counter()
+        snapshots = self._generations("snapshot")
+        base = snapshots[-1] if snapshots else 0
+        loaded = self._load_snapshot(base, store) if snapshots else 0
+        replayed = 0
+        logs = [generation for generation in self._generations("log") if generation >= base]
+        for generation in logs:
+            replayed += self._replay(self._path("log", generation), store)
+        # New changes go to a new log, never after a possibly torn last line
+        self._generation = max([base] + logs) + 1
+        self._since_snapshot = replayed
+        result = {"snapshot_todos": loaded, "replayed": replayed, "seconds": time.perf_counter() - start}
+        logger.info("Recovered %d todos from snapshot and %d logged changes in %.2fs",
+                    loaded, replayed, result["seconds"])
+        return result
+
+    def _load_snapshot(self, generation: int, store: TodoStore) -> int:
+        with open(self._path("snapshot", generation), encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            # One document parses about twice as fast as a line per todo
+            records = [TodoRecord(*row) for row in json.loads(f.readline())]
+        store.load(records, header["next_id"])
+        return len(records)
+
+    def _replay(self, path: str, store: TodoStore) -> int:
+        count = 0
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line) if line.endswith("\n") else None
+                except ValueError:
+                    entry = None
+                if entry is None:
+                    # The torn tail of a crash mid-write; nothing was acknowledged after it
+                    break
+                store.apply(entry)
+                count += 1
+        return count
+
+    def start(self, store: TodoStore):
+        """Open the log for the store's changes and start the flusher"""
+        self._store = store
+        self._log = open(self._path("log", self._generation), "a", encoding="utf-8")
+        self._flusher = threading.Thread(target=self._flush_loop, name="todo-journal", daemon=True)
+        self._flusher.start()
+        store.attach(self)
+
+    def append(self, entry) -> int:
+        """Queue one change, under the store lock; returns its sequence number"""
+        line = _encode(entry)
+        with self._cond:
+            if self._error is not None:
+                raise RuntimeError("Todo journal failed") from self._error
+            self._pending.append(line)
+            self._appended += 1
+            self._since_snapshot += 1
+            self._cond.notify_all()
+            return self._appended
+
+    def wait(self, seq: int):
+        """Block until change `seq` is on disk"""
+        with self._cond:
+            while self._durable < seq:
+                if self._error is not None:
+                    raise RuntimeError("Todo journal failed") from self._error
+                self._cond.wait()
+
+    def _write_pending(self):
+        """Write and fsync everything appended so far; flusher thread only"""
+        with self._cond:
+            lines, self._pending = self._pending, []
+            seq = self._appended
+        if lines:
+            self._log.write("".join(lines))
+            self._log.flush()
+            os.fsync(self._log.fileno())
+        with self._cond:
+            self._durable = seq
+            if lines:
+                self.stats["groups"] += 1
+                self.stats["entries"] += len(lines)
+            self._cond.notify_all()
+
+    def _flush_loop(self):
+        try:
+            while True:
+                with self._cond:
+                    while not self._pending and not self._closing:
+                        self._cond.wait()
+                    if not self._pending:
+                        return
+                if self.group_ms:
+                    time.sleep(self.group_ms / 1000)
+                self._write_pending()
+                if self._since_snapshot >= self.snapshot_every and not self._snapshot_running():
+                    self._start_snapshot()
+        except BaseException as e:
+            logger.exception("Todo journal flush failed")
+            with self._cond:
+                self._error = e
+                self._cond.notify_all()
+
+    def _snapshot_running(self) -> bool:
+        return self._snapshotter is not None and self._snapshotter.is_alive()
+
+    def _rotate(self):
+        """Finish the current log and open the next; runs under the store lock"""
+        self._write_pending()
+        self._log.close()
+        self._generation += 1
+        self._log = open(self._path("log", self._generation), "a", encoding="utf-8")
+        self._since_snapshot = 0
+
+    def _start_snapshot(self):
+        # Copying references under the store lock is quick; writing them is not
+        records, next_id = self._store.checkpoint(self._rotate)
+        self._snapshotter = threading.Thread(
+            target=self._write_snapshot, args=(self._generation, records, next_id),
+            name="todo-snapshot", daemon=True
+        )
+        self._snapshotter.start()
+
+    def _write_snapshot(self, generation: int, records: List[TodoRecord], next_id: int):
+        path = self._path("snapshot", generation)
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(_encode({"next_id": next_id, "todos": len(records)}))
+                f.write(_encode([[r.id, r.title, r.description, r.completed] for r in records]))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + ".tmp", path)
+            directory = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+        except OSError:
+            # The logs still hold every change; the next snapshot tries again
+            logger.exception("Todo snapshot %d failed", generation)
+            return
+        # The new snapshot covers everything before its log
+        for kind in ("snapshot", "log"):
+            for older in self._generations(kind):
+                if older < generation:
+                    os.remove(self._path(kind, older))
+        self.stats["snapshots"] += 1
+
+    def close(self):
+        """Flush outstanding changes, finish a running snapshot and release the directory"""
+        if self._store is not None:
+            self._store.detach()
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+        if self._snapshotter is not None:
+            self._snapshotter.join()
+        if self._log is not None:
+            self._log.close()
+        self._lock_file.close()
+
+
+def open_journal(store: TodoStore, directory: str = TODO_STORE_DIR, **options) -> Optional[TodoJournal]:
+    """Recover `store` from `directory` and log its changes there; None when no directory is set"""
+    if not directory:
+        return None
+    journal = TodoJournal(directory, **options)
+    journal.recover(store)
+    journal.start(store)
+    return journal
@@ -1,28 +1,51 @@
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 from dotenv import load_dotenv
 import os
+from app.assets import STATIC_MAX_AGE, static_assets
 
 # Load environment variables
 load_dotenv()
 
 app = FastAPI()
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+# Static files, served from memory with ETags and precompressed variants
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"], name="static")
+def static_file(path: str, request: Request):
+    return static_assets.response(request, path, f"public, max-age={STATIC_MAX_AGE}")
 
 # Include routers
 from app.routers import todos, chatbot
 app.include_router(todos.router)
 app.include_router(chatbot.router)
 
+# Optional durability for the todo store (TODO_STORE_DIR)
+from app.journal import open_journal
+from app.store import todo_store
+journal = None
+
+@app.on_event("startup")
+def preload_static():
+    # Compress before serving; brotli at quality 11 is too slow for a request
+    static_assets.preload()
+
+@app.on_event("startup")
+def recover_todos():
+    global journal
+    journal = open_journal(todo_store)
+
+@app.on_event("shutdown")
+def close_todos():
+    if journal is not None:
+        journal.close()
+
 @app.get("/")
 def read_root():
     debug_mode = os.getenv("DEBUG", "False").lower() == "true"
     return {"message": "Hello World", "debug": debug_mode}
 
 @app.get("/chat", response_class=HTMLResponse)
-async def chat_page():
-    with open("app/static/index.html") as f:
-        return HTMLResponse(content=f.read())
\ No newline at end of file
+def chat_page(request: Request):
+    # Sync, so a reload after the file changes compresses in the threadpool
+    # Revalidated on every load; unchanged pages cost a 304
+    return static_assets.response(request, "index.html", "no-cache")
\ No newline at end of file
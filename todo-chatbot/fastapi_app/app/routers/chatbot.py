@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import List
-from app.routers.todos import TodoItem, todos_db
+from app.store import todo_store
+from app.intents import todo_intents
 
 router = APIRouter(prefix="/chatbot", tags=["chatbot"])
 
@@ -17,22 +18,17 @@ def chat_with_bot(request: ChatRequest):
     """
     Simple AI chatbot that can interact with todo list
     """
-    user_message = request.message.lower()
+    # Process the user message to determine intent in one pass
+    parsed = todo_intents.parse(request.message)
     
-    # Process the user message to determine intent
-    if "hello" in user_message or "hi" in user_message:
+    if "greet" in parsed.hits:
         return ChatResponse(response="Hello! I'm your AI assistant. I can help you manage your todo list. Try saying 'add a todo', 'show my todos', or 'complete a todo'.")
     
-    elif "add" in user_message and "todo" in user_message:
-        # Extract todo title from message (simple extraction)
-        import re
-        match = re.search(r"add a?n? ?todo (?:to|for|about|that|which|will)? ?(?:be )?(?:to )?(.+)", user_message)
-        if match:
-            title = match.group(1).strip()
-            # Create a new todo
-            new_todo = TodoItem(title=title, description=f"Added via chatbot: {request.message}")
-            new_todo.id = len(todos_db) + 1
-            todos_db.append(new_todo)
+    elif "add" in parsed.hits and "todo" in parsed.hits:
+        # The title is the text after "add a todo to ..."
+        if parsed.title:
+            title = parsed.title
+            todo_store.add(title, f"Added via chatbot: {request.message}")
             return ChatResponse(
                 response=f"I've added '{title}' to your todo list.",
                 action_taken="added_todo"
@@ -40,41 +36,34 @@ def chat_with_bot(request: ChatRequest):
         else:
             return ChatResponse(response="I didn't understand what you want to add. Please say something like 'add a todo to buy groceries'.")
     
-    elif "show" in user_message and "todo" in user_message:
-        if not todos_db:
+    elif "show" in parsed.hits and "todo" in parsed.hits:
+        todos = todo_store.list()
+        if not todos:
             return ChatResponse(response="Your todo list is empty. You can add items by saying 'add a todo to ...'")
         
-        todo_titles = [f"{i+1}. {todo.title} ({'completed' if todo.completed else 'pending'})" for i, todo in enumerate(todos_db)]
+        todo_titles = [f"{i+1}. {todo.title} ({'completed' if todo.completed else 'pending'})" for i, todo in enumerate(todos)]
         todos_str = "\n".join(todo_titles)
         return ChatResponse(
             response=f"Here are your todos:\n{todos_str}",
             action_taken="showed_todos"
         )
     
-    elif "complete" in user_message and any(str(todo.id) in user_message or todo.title.lower() in user_message for todo in todos_db):
-        # Find which todo to complete
-        for todo in todos_db:
-            if str(todo.id) in user_message or todo.title.lower() in user_message:
-                todo.completed = True
-                return ChatResponse(
-                    response=f"I've marked '{todo.title}' as completed!",
-                    action_taken="completed_todo"
-                )
-        return ChatResponse(response="I couldn't find that todo in your list.")
+    elif "complete" in parsed.hits and (todo := todo_store.find_in_message(request.message, parsed.task_ids)):
+        # Named by ID or by its title, found through the store's indexes
+        todo_store.set_completed(todo.id)
+        return ChatResponse(
+            response=f"I've marked '{todo.title}' as completed!",
+            action_taken="completed_todo"
+        )
     
-    elif "delete" in user_message and any(str(todo.id) in user_message or todo.title.lower() in user_message for todo in todos_db):
-        # Find which todo to delete
-        for i, todo in enumerate(todos_db):
-            if str(todo.id) in user_message or todo.title.lower() in user_message:
-                removed_title = todo.title
-                del todos_db[i]
-                return ChatResponse(
-                    response=f"I've deleted '{removed_title}' from your todo list.",
-                    action_taken="deleted_todo"
-                )
-        return ChatResponse(response="I couldn't find that todo in your list.")
+    elif "delete" in parsed.hits and (todo := todo_store.find_in_message(request.message, parsed.task_ids)):
+        todo_store.delete(todo.id)
+        return ChatResponse(
+            response=f"I've deleted '{todo.title}' from your todo list.",
+            action_taken="deleted_todo"
+        )
     
-    elif "help" in user_message:
+    elif "help" in parsed.hits:
         return ChatResponse(
             response="I'm your AI assistant for managing todos. You can ask me to:\n"
             "- Add a todo: 'add a todo to buy milk'\n"
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 from pydantic import BaseModel
+from app.store import TodoRecord, todo_store
 
 router = APIRouter(prefix="/todos", tags=["todos"])
 
@@ -11,51 +12,39 @@ class TodoItem(BaseModel):
     description: str = ""
     completed: bool = False
 
-# In-memory storage for todos (in production, you'd use a database)
-todos_db = []
-next_id = 1
+def to_item(record: TodoRecord) -> TodoItem:
+    return TodoItem(id=record.id, title=record.title, description=record.description, completed=record.completed)
 
 @router.get("/", response_model=List[TodoItem])
 def get_todos(completed: Optional[bool] = Query(None)):
     """Get all todos, optionally filtered by completion status"""
-    if completed is None:
-        return todos_db
-    return [todo for todo in todos_db if todo.completed == completed]
+    return [to_item(record) for record in todo_store.list(completed)]
 
 @router.post("/", response_model=TodoItem)
 def create_todo(todo: TodoItem):
     """Create a new todo item"""
-    global next_id
-    todo.id = next_id
-    next_id += 1
-    todos_db.append(todo)
-    return todo
+    return to_item(todo_store.add(todo.title, todo.description, todo.completed))
 
 @router.get("/{todo_id}", response_model=TodoItem)
 def get_todo(todo_id: int):
     """Get a specific todo by ID"""
-    for todo in todos_db:
-        if todo.id == todo_id:
-            return todo
-    raise HTTPException(status_code=404, detail="Todo not found")
+    record = todo_store.get(todo_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    return to_item(record)
 
 @router.put("/{todo_id}", response_model=TodoItem)
 def update_todo(todo_id: int, updated_todo: TodoItem):
     """Update a specific todo by ID"""
-    for i, todo in enumerate(todos_db):
-        if todo.id == todo_id:
-            todos_db[i] = updated_todo
-            return updated_todo
-    raise HTTPException(status_code=404, detail="Todo not found")
+    record = todo_store.replace(todo_id, updated_todo.title, updated_todo.description, updated_todo.completed)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    return to_item(record)
 
 @router.delete("/{todo_id}")
 def delete_todo(todo_id: int):
     """Delete a specific todo by ID"""
-    global todos_db
-    initial_length = len(todos_db)
-    todos_db = [todo for todo in todos_db if todo.id != todo_id]
-    
-    if len(todos_db) == initial_length:
+    if todo_store.delete(todo_id) is None:
         raise HTTPException(status_code=404, detail="Todo not found")
     
     return {"message": "Todo deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""
+In-memory todo store shared by the todos and chatbot routers
+Todos are compact records keyed by id, with secondary indexes by completion
+state and by normalized title, so lookups and writes don't scan the list
+"""
+
+import os
+import re
+import threading
+from contextlib import ExitStack
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Partitions of the store, each with its own lock
+TODO_STORE_SHARDS = int(os.getenv("TODO_STORE_SHARDS", "16"))
+
+
+_WORDS = re.compile(r"\w+")
+
+
+def normalize_title(text: str) -> str:
+    """Lowercased words of a title or message, for matching titles inside messages"""
+    return " ".join(_WORDS.findall(text.lower()))
+
+
+class TodoRecord:
+    """One todo at rest; the routers turn it into a TodoItem at the edge"""
+
+    __slots__ = ("id", "title", "description", "completed")
+
+    def __init__(self, id: int, title: str, description: str = "", completed: bool = False):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.completed = completed
+
+
+class _Shard:
+    """The todos whose id falls in one partition, with their indexes and lock"""
+
+    __slots__ = ("lock", "todos", "by_completed", "by_title", "title_words")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.todos: Dict[int, TodoRecord] = {}
+        # Ids per completion state
+        self.by_completed: Dict[bool, Dict[int, None]] = {False: {}, True: {}}
+        # Ids per normalized title
+        self.by_title: Dict[str, Dict[int, None]] = {}
+        # Longest indexed title in words, bounding the spans tried by find_in_message
+        self.title_words = 0
+
+
+class TodoStore:
+    """
+    Todos partitioned by id over shards, each with a lock and its own indexes
+    by completion state and title; writers to different shards don't contend.
+    Ids come from a counter under its own lock and are never reused.
+    Records are replaced, never changed in place, so readers take no lock:
+    each read copies a dict or looks up a key in one step under the GIL and
+    sees whole records. With a journal attached each change is logged and
+    the call returns once it is durable
+    """
+
+    def __init__(self, shards: int = TODO_STORE_SHARDS):
+        self._shards = [_Shard() for _ in range(max(shards, 1))]
+        self._id_lock = threading.Lock()
+        self._next_id = 1
+        self._journal = None
+
+    def __len__(self) -> int:
+        return sum(len(shard.todos) for shard in self._shards)
+
+    def attach(self, journal):
+        """Log every change from now on to `journal` (see app.journal.TodoJournal)"""
+        self._journal = journal
+
+    def detach(self):
+        journal, self._journal = self._journal, None
+        return journal
+
+    def _shard(self, todo_id: int) -> _Shard:
+        return self._shards[todo_id % len(self._shards)]
+
+    def _all_shards(self) -> ExitStack:
+        """Hold every shard lock, always taken in the same order"""
+        stack = ExitStack()
+        for shard in self._shards:
+            stack.enter_context(shard.lock)
+        return stack
+
+    @staticmethod
+    def _index(shard: _Shard, record: TodoRecord):
+        shard.by_completed[record.completed][record.id] = None
+        key = normalize_title(record.title)
+        shard.by_title.setdefault(key, {})[record.id] = None
+        shard.title_words = max(shard.title_words, key.count(" ") + 1)
+
+    @staticmethod
+    def _unindex(shard: _Shard, record: TodoRecord):
+        shard.by_completed[record.completed].pop(record.id, None)
+        key = normalize_title(record.title)
+        ids = shard.by_title.get(key)
+        if ids is not None:
+            ids.pop(record.id, None)
+            if not ids:
+                del shard.by_title[key]
+
+    def apply(self, entry: Sequence) -> Optional[TodoRecord]:
+        """
+        Apply one change: ("a", id, title, description, completed) adds,
+        ("r", id, title, description, completed) replaces, ("c", id, completed)
+        sets completion and ("d", id) deletes. Returns the new record (the
+        removed one for "d"), or None when the todo doesn't exist
+        Callers hold the todo's shard lock, except while recovering before serving
+        """
+        op, todo_id = entry[0], entry[1]
+        shard = self._shard(todo_id)
+        if op == "a":
+            record = TodoRecord(*entry[1:])
+            with self._id_lock:
+                self._next_id = max(self._next_id, todo_id + 1)
+        else:
+            old = shard.todos.get(todo_id)
+            if old is None:
+                return None
+            self._unindex(shard, old)
+            if op == "d":
+                del shard.todos[todo_id]
+                return old
+            if op == "c":
+                record = TodoRecord(todo_id, old.title, old.description, entry[2])
+            else:
+                record = TodoRecord(*entry[1:])
+        shard.todos[todo_id] = record
+        self._index(shard, record)
+        return record
+
+    def _change(self, op: str, todo_id: Optional[int], *fields) -> Optional[TodoRecord]:
+        if todo_id is None:
+            with self._id_lock:
+                todo_id = self._next_id
+                self._next_id += 1
+        entry = (op, todo_id, *fields)
+        # Read once: detach() may clear it concurrently at shutdown
+        journal = self._journal
+        with self._shard(todo_id).lock:
+            record = self.apply(entry)
+            # Logged under the shard lock, so each todo's changes are logged in order
+            seq = journal.append(entry) if record is not None and journal is not None else None
+        # Wait outside the lock so other changes join the same fsync
+        if seq is not None:
+            journal.wait(seq)
+        return record
+
+    def add(self, title: str, description: str = "", completed: bool = False) -> TodoRecord:
+        return self._change("a", None, title, description, completed)
+
+    def get(self, todo_id: int) -> Optional[TodoRecord]:
+        return self._shard(todo_id).todos.get(todo_id)
+
+    def replace(self, todo_id: int, title: str, description: str = "", completed: bool = False) -> Optional[TodoRecord]:
+        """Overwrite a todo's fields, keeping its id; None if it doesn't exist"""
+        return self._change("r", todo_id, title, description, completed)
+
+    def set_completed(self, todo_id: int, completed: bool = True) -> Optional[TodoRecord]:
+        return self._change("c", todo_id, completed)
+
+    def delete(self, todo_id: int) -> Optional[TodoRecord]:
+        """Remove a todo and return it; None if it doesn't exist"""
+        return self._change("d", todo_id)
+
+    def load(self, records: Iterable[TodoRecord], next_id: int):
+        """Replace the contents with a snapshot's records"""
+        with self._all_shards():
+            for shard in self._shards:
+                shard.todos, shard.by_completed, shard.by_title, shard.title_words = {}, {False: {}, True: {}}, {}, 0
+            for record in records:
+                shard = self._shard(record.id)
+                shard.todos[record.id] = record
+                self._index(shard, record)
+            with self._id_lock:
+                self._next_id = next_id
+
+    def checkpoint(self, rotate: Callable[[], None]) -> Tuple[List[TodoRecord], int]:
+        """
+        The records and next id as of now, with `rotate` run at the same instant
+        so a journal can start a new log exactly where the snapshot ends
+        """
+        with self._all_shards():
+            rotate()
+            records = [record for shard in self._shards for record in list(shard.todos.values())]
+            with self._id_lock:
+                return records, self._next_id
+
+    def list(self, completed: Optional[bool] = None) -> List[TodoRecord]:
+        """Todos in id order, optionally only those with the given completion state"""
+        records: List[TodoRecord] = []
+        for shard in self._shards:
+            if completed is None:
+                records.extend(list(shard.todos.values()))
+                continue
+            # The index and the records are read at different instants; keep
+            # only todos that still exist in the requested state
+            todos = shard.todos
+            for todo_id in tuple(shard.by_completed[completed]):
+                record = todos.get(todo_id)
+                if record is not None and record.completed == completed:
+                    records.append(record)
+        records.sort(key=attrgetter("id"))
+        return records
+
+    def find_in_message(self, message: str, ids: Iterable[int] = ()) -> Optional[TodoRecord]:
+        """
+        The lowest-id todo named in a message, by one of `ids` or by its whole title
+        appearing as a run of words; looks up each run instead of scanning every todo
+        """
+        words = normalize_title(message).split()
+        longest = max(shard.title_words for shard in self._shards)
+        runs = [
+            " ".join(words[start:end])
+            for start in range(len(words))
+            for end in range(start + 1, min(start + longest, len(words)) + 1)
+        ]
+        found = set(ids)
+        for shard in self._shards:
+            by_title = shard.by_title
+            for run in runs:
+                ids_with_title = by_title.get(run)
+                if ids_with_title:
+                    found.update(tuple(ids_with_title))
+        for todo_id in sorted(found):
+            record = self.get(todo_id)
+            if record is not None:
+                return record
+        return None
+
+
+# The store behind both routers
+todo_store = TodoStore()
@@ -0,0 +1,101 @@
+"""
+Benchmark: /chat page loads from the asset cache
+Serves BENCH_REQUESTS page loads from BENCH_CLIENTS threads three ways: the
+previous handler reading index.html from disk each time, the cached page
+(gzip) and revalidation answered with 304, counting file opens and stats
+
+Usage (from fastapi_app/):
+    python -m benchmarks.bench_assets
+"""
+
+import builtins
+import os
+import threading
+import time
+from collections import Counter
+
+from fastapi.responses import HTMLResponse
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "3000"))
+CLIENTS = int(os.getenv("BENCH_CLIENTS", "8"))
+
+
+def disk_chat_page():
+    """The handler before the asset cache"""
+    with open("app/static/index.html") as f:
+        return HTMLResponse(content=f.read())
+
+
+class FileCalls:
+    """Counts open() and os.stat() calls while active"""
+
+    def __init__(self):
+        self.calls = Counter()
+
+    def __enter__(self):
+        self._open, self._stat = builtins.open, os.stat
+
+        def counted_open(*args, **kwargs):
+            self.calls["open"] += 1
+            return self._open(*args, **kwargs)
+
+        def counted_stat(*args, **kwargs):
+            self.calls["stat"] += 1
+            return self._stat(*args, **kwargs)
+
+        builtins.open, os.stat = counted_open, counted_stat
+        return self
+
+    def __exit__(self, *exc):
+        builtins.open, os.stat = self._open, self._stat
+
+
+def run(path: str, headers: dict) -> tuple:
+    """Requests per second and filesystem calls for REQUESTS loads of `path`"""
+    counter = iter(range(REQUESTS))
+    lock = threading.Lock()
+
+    def client():
+        with TestClient(app) as http:
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        return
+                response = http.get(path, headers=headers)
+                assert response.status_code in (200, 304)
+
+    threads = [threading.Thread(target=client) for _ in range(CLIENTS)]
+    with FileCalls() as files:
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    return REQUESTS / elapsed, dict(files.calls)
+
+
+def main():
+    app.add_api_route("/chat-from-disk", disk_chat_page, response_class=HTMLResponse)
+    with TestClient(app) as http:
+        first = http.get("/chat", headers={"Accept-Encoding": "gzip"})
+    etag = first.headers["etag"]
+    print(f"{REQUESTS:,} page loads from {CLIENTS} threads "
+          f"({len(first.content):,} B page, {first.headers['content-length']} B gzip):")
+    cases = [
+        ("read from disk", "/chat-from-disk", {"Accept-Encoding": "identity"}),
+        ("cached, identity", "/chat", {"Accept-Encoding": "identity"}),
+        ("cached, gzip", "/chat", {"Accept-Encoding": "gzip"}),
+        ("revalidated (304)", "/chat", {"Accept-Encoding": "gzip", "If-None-Match": etag}),
+    ]
+    for label, path, headers in cases:
+        rate, calls = run(path, headers)
+        print(f"  {label:<18} {rate:7.0f} req/s  file calls {calls or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
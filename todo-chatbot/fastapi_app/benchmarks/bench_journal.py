@@ -0,0 +1,83 @@
+"""
+Benchmark: write throughput and recovery time of the journaled todo store
+Runs BENCH_OPS changes (default one million: 70% add, 15% complete, 10%
+update, 5% delete) from BENCH_THREADS writer threads, each call returning only
+once its change is fsynced, then recovers a fresh store from the files. Run
+once logging only and once with snapshots every TODO_SNAPSHOT_EVERY changes
+
+Usage (from fastapi_app/):
+    python -m benchmarks.bench_journal
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+
+from app.journal import TODO_SNAPSHOT_EVERY, TodoJournal
+from app.store import TodoStore
+
+
+OPS = int(os.getenv("BENCH_OPS", "1000000"))
+THREADS = int(os.getenv("BENCH_THREADS", "64"))
+SINGLE_OPS = int(os.getenv("BENCH_SINGLE_OPS", "2000"))
+
+
+def run_writers(store: TodoStore, ops: int, threads: int) -> float:
+    """Changes per second with `threads` writers sharing `ops` changes"""
+    def writer(seed: int, count: int):
+        rng = random.Random(seed)
+        for i in range(count):
+            kind = rng.random()
+            todo_id = rng.randrange(1, max(store._next_id, 2))
+            if kind < 0.70:
+                store.add(f"todo {seed}-{i}", "from the benchmark")
+            elif kind < 0.85:
+                store.set_completed(todo_id)
+            elif kind < 0.95:
+                store.replace(todo_id, f"todo {todo_id} v2", "updated")
+            else:
+                store.delete(todo_id)
+
+    workers = [threading.Thread(target=writer, args=(n, ops // threads)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (ops // threads) * threads / (time.perf_counter() - start)
+
+
+def run(label: str, snapshot_every: int):
+    with tempfile.TemporaryDirectory() as directory:
+        store = TodoStore()
+        journal = TodoJournal(directory, snapshot_every=snapshot_every)
+        journal.recover(store)
+        journal.start(store)
+        single = run_writers(store, SINGLE_OPS, 1)
+        grouped = run_writers(store, OPS, THREADS)
+        journal.close()
+        todos = len(store)
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        stats = journal.stats
+
+        recovered = TodoStore()
+        result = TodoJournal(directory).recover(recovered)
+        assert len(recovered) == todos and recovered._next_id == store._next_id
+        print(f"{label}:")
+        print(f"  1 writer:          {single:9,.0f} changes/s (one fsync each)")
+        print(f"  {THREADS} writers:        {grouped:9,.0f} changes/s, "
+              f"{stats['entries'] / stats['groups']:.1f} changes per fsync, {stats['snapshots']} snapshots")
+        print(f"  recovery:          {result['seconds']:.2f}s for {todos:,} todos "
+              f"({result['snapshot_todos']:,} from snapshot, {result['replayed']:,} replayed, {size / 1e6:.0f} MB on disk)")
+
+
+def main():
+    print(f"{OPS:,} changes from {THREADS} threads")
+    run("log only", OPS * 2)
+    run(f"snapshot every {TODO_SNAPSHOT_EVERY:,} changes", TODO_SNAPSHOT_EVERY)
+
+
+if __name__ == "__main__":
+    main()
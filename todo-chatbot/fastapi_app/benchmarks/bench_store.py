@@ -0,0 +1,88 @@
+"""
+Benchmark: TodoStore operation cost as the todo count grows
+Times get, update, complete, delete, add and chat lookup by title at 1k, 100k
+and 1M todos next to the previous list-backed storage, and compares memory
+per todo for TodoRecord against a TodoItem model
+
+Usage (from fastapi_app/):
+    python -m benchmarks.bench_store
+"""
+
+import os
+import random
+import time
+import tracemalloc
+
+from app.routers.todos import TodoItem
+from app.store import TodoRecord, TodoStore
+
+
+SIZES = [int(n) for n in os.getenv("BENCH_SIZES", "1000,100000,1000000").split(",")]
+OPS = int(os.getenv("BENCH_OPS", "10000"))
+# The list baseline is linear per operation, so it gets fewer
+LIST_OPS = int(os.getenv("BENCH_LIST_OPS", "20"))
+
+
+def per_op_us(fn, ids) -> float:
+    start = time.perf_counter()
+    for todo_id in ids:
+        fn(todo_id)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def bench_store(size: int, rng: random.Random) -> dict:
+    store = TodoStore()
+    for i in range(size):
+        store.add(f"todo {i}", "", i % 2 == 0)
+    ids = rng.sample(range(1, size + 1), min(OPS, size))
+    return {
+        "get": per_op_us(store.get, ids),
+        "update": per_op_us(lambda i: store.replace(i, f"todo {i} v2"), ids),
+        "complete": per_op_us(store.set_completed, ids),
+        "find by title": per_op_us(lambda i: store.find_in_message(f"please complete todo {i} v2 now"), ids),
+        "delete": per_op_us(store.delete, ids),
+        "add": per_op_us(lambda i: store.add(f"todo {i}"), ids),
+    }
+
+
+def bench_list(size: int, rng: random.Random) -> dict:
+    """The list storage the routers used before TodoStore"""
+    todos = [TodoItem(id=i, title=f"todo {i}") for i in range(1, size + 1)]
+    ids = rng.sample(range(1, size + 1), min(LIST_OPS, size))
+
+    def get(todo_id):
+        for todo in todos:
+            if todo.id == todo_id:
+                return todo
+
+    def delete(todo_id):
+        nonlocal todos
+        todos = [todo for todo in todos if todo.id != todo_id]
+
+    return {"get": per_op_us(get, ids), "delete": per_op_us(delete, ids)}
+
+
+def bytes_per_todo(make, count: int = 100000) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [make(i) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used / count
+
+
+def main():
+    rng = random.Random(7)
+    for size in SIZES:
+        store = bench_store(size, rng)
+        listed = bench_list(size, rng)
+        print(f"{size:>9,} todos: " + "  ".join(f"{op} {us:.2f}us" for op, us in store.items()))
+        print(f"{'':>9}  list:  get {listed['get']:.1f}us  delete {listed['delete']:.1f}us")
+    record = bytes_per_todo(lambda i: TodoRecord(i, f"todo {i}"))
+    model = bytes_per_todo(lambda i: TodoItem(id=i, title=f"todo {i}"))
+    print(f"memory per todo: TodoRecord {record:.0f} B, TodoItem {model:.0f} B")
+
+
+if __name__ == "__main__":
+    main()
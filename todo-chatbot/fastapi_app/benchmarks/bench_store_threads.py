@@ -0,0 +1,139 @@
+"""
+Stress test: TodoStore under concurrent writers and readers
+Checks that concurrent adds get unique, gapless ids and that the store ends
+with exactly the todos that were added and not deleted, while readers list
+and look up todos throughout. Then reports throughput by thread count for a
+single-lock store (1 shard) and the sharded store, in memory and journaled
+
+Usage (from fastapi_app/):
+    python -m benchmarks.bench_store_threads
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from app.journal import TodoJournal
+from app.store import TODO_STORE_SHARDS, TodoStore
+
+
+THREADS = [int(n) for n in os.getenv("BENCH_THREADS", "1,2,4,8,16").split(",")]
+OPS = int(os.getenv("BENCH_OPS", "200000"))
+JOURNAL_OPS = int(os.getenv("BENCH_JOURNAL_OPS", "20000"))
+SEED_TODOS = int(os.getenv("BENCH_SEED_TODOS", "100000"))
+
+
+def start_all(threads):
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def check_correctness(writers: int = 16, adds: int = 5000) -> bool:
+    store = TodoStore()
+    added = [[] for _ in range(writers)]
+    deleted = [[] for _ in range(writers)]
+    stop = threading.Event()
+    read_errors = []
+
+    def writer(n: int):
+        rng = random.Random(n)
+        for i in range(adds):
+            record = store.add(f"todo {n}-{i}")
+            added[n].append(record.id)
+            if rng.random() < 0.2:
+                store.set_completed(record.id)
+            if rng.random() < 0.1:
+                store.delete(record.id)
+                deleted[n].append(record.id)
+
+    def reader():
+        while not stop.is_set():
+            try:
+                for record in store.list(completed=True):
+                    assert record.completed
+                ids = [record.id for record in store.list()]
+                assert ids == sorted(ids)
+            except Exception as e:
+                read_errors.append(e)
+                return
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    for thread in readers:
+        thread.start()
+    start_all([threading.Thread(target=writer, args=(n,)) for n in range(writers)])
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    ids = [todo_id for ids in added for todo_id in ids]
+    expected = set(ids) - {todo_id for ids in deleted for todo_id in ids}
+    checks = {
+        "no duplicate ids": len(ids) == len(set(ids)),
+        "no lost ids": sorted(ids) == list(range(1, writers * adds + 1)),
+        "contents match": {record.id for record in store.list()} == expected and len(store) == len(expected),
+        "readers saw consistent records": not read_errors,
+    }
+    print(f"correctness, {writers} writers x {adds:,} adds with 2 readers:")
+    for name, ok in checks.items():
+        print(f"  {name:<32} {'ok' if ok else 'FAILED'}")
+    return all(checks.values())
+
+
+def mixed_ops_per_second(store: TodoStore, threads: int, ops: int, reads: float) -> float:
+    """Changes and reads per second, `reads` of them get() lookups"""
+    def worker(n: int, count: int):
+        rng = random.Random(n)
+        for i in range(count):
+            todo_id = rng.randrange(1, SEED_TODOS)
+            kind = rng.random()
+            if kind < reads:
+                store.get(todo_id)
+            elif kind < reads + (1 - reads) / 2:
+                store.add(f"todo {n}-{i}")
+            else:
+                store.set_completed(todo_id, rng.random() < 0.5)
+
+    per_thread = ops // threads
+    elapsed = start_all([threading.Thread(target=worker, args=(n, per_thread)) for n in range(threads)])
+    return per_thread * threads / elapsed
+
+
+def seeded(shards: int) -> TodoStore:
+    store = TodoStore(shards)
+    for i in range(SEED_TODOS):
+        store.add(f"todo {i}")
+    return store
+
+
+def main():
+    ok = check_correctness()
+
+    print(f"in memory, {OPS:,} ops (80% get, 10% add, 10% complete) over {SEED_TODOS:,} todos, ops/s:")
+    for shards in (1, TODO_STORE_SHARDS):
+        store = seeded(shards)
+        rates = [mixed_ops_per_second(store, threads, OPS, 0.8) for threads in THREADS]
+        print(f"  {shards:>2} shards: " + "  ".join(f"{t}t {r:9,.0f}" for t, r in zip(THREADS, rates)))
+
+    print(f"journaled, {JOURNAL_OPS:,} changes (add and complete, each fsynced before returning), ops/s:")
+    for shards in (1, TODO_STORE_SHARDS):
+        with tempfile.TemporaryDirectory() as directory:
+            store = seeded(shards)
+            journal = TodoJournal(directory)
+            journal.start(store)
+            rates = [mixed_ops_per_second(store, threads, JOURNAL_OPS, 0.0) for threads in THREADS]
+            journal.close()
+        print(f"  {shards:>2} shards: " + "  ".join(f"{t}t {r:9,.0f}" for t, r in zip(THREADS, rates)))
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
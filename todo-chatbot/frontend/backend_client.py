@@ -0,0 +1,169 @@
+"""
+HTTP client for the backend API used by the Streamlit frontend
+One keep-alive connection pool with timeouts, jittered retries for idempotent
+calls, per-call latency logging and an asyncio front for concurrent calls
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8001")
+# Seconds to connect, and to wait for a response (between chunks when streaming)
+BACKEND_CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "3.05"))
+BACKEND_READ_TIMEOUT = float(os.getenv("BACKEND_READ_TIMEOUT", "30"))
+BACKEND_STREAM_TIMEOUT = float(os.getenv("BACKEND_STREAM_TIMEOUT", "120"))
+# Keep-alive connections held open to the backend
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "10"))
+# Extra attempts for idempotent calls, with full-jitter exponential backoff
+BACKEND_RETRIES = int(os.getenv("BACKEND_RETRIES", "2"))
+BACKEND_BACKOFF = float(os.getenv("BACKEND_BACKOFF", "0.2"))
+# Calls slower than this are logged as warnings
+BACKEND_SLOW_MS = float(os.getenv("BACKEND_SLOW_MS", "1000"))
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class BackendClient:
+    """
+    Calls to the backend over one pooled requests.Session
+    Shared by every Streamlit session, so it holds no per-user state: the
+    caller passes the user's token with each call
+    """
+
+    def __init__(
+        self,
+        base_url: str = BACKEND_URL,
+        timeout: float = BACKEND_READ_TIMEOUT,
+        retries: int = BACKEND_RETRIES,
+        pool_size: int = BACKEND_POOL_SIZE
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (BACKEND_CONNECT_TIMEOUT, timeout)
+        self.retries = retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _headers(self, token: Optional[str]) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    def _log(self, method: str, path: str, status: Any, started: float, attempt: int, stage: str = ""):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        failed = not isinstance(status, int) or status >= 500
+        level = logging.WARNING if failed or elapsed_ms >= BACKEND_SLOW_MS else logging.INFO
+        retry = f" (attempt {attempt + 1})" if attempt else ""
+        stage = f" {stage}" if stage else ""
+        logger.log(level, "%s %s -> %s%s in %.0fms%s", method, path, status, stage, elapsed_ms, retry)
+
+    def request(self, method: str, path: str, token: Optional[str] = None, **kwargs) -> requests.Response:
+        """
+        Send one call and return the response, whatever its status
+        GET/PUT/DELETE are retried on connection errors, timeouts and 502/503/504;
+        POST is sent once, since the backend may have acted on it
+        """
+        method = method.upper()
+        attempts = 1 + (self.retries if method in IDEMPOTENT_METHODS else 0)
+        kwargs.setdefault("timeout", self.timeout)
+        headers = {**self._headers(token), **kwargs.pop("headers", {})}
+        for attempt in range(attempts):
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, self.base_url + path, headers=headers, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._log(method, path, type(e).__name__, started, attempt)
+                if attempt + 1 == attempts:
+                    raise
+            else:
+                self._log(method, path, response.status_code, started, attempt)
+                if response.status_code not in RETRY_STATUSES or attempt + 1 == attempts:
+                    return response
+                response.close()
+            # Full jitter keeps retrying clients from arriving in lockstep
+            time.sleep(random.uniform(0, BACKEND_BACKOFF * 2 ** attempt))
+
+    def open_stream(self, method: str, path: str, token: Optional[str] = None, **kwargs) -> requests.Response:
+        """Start a streamed response, logging time to headers; the caller closes it"""
+        started = time.perf_counter()
+        kwargs.setdefault("timeout", (BACKEND_CONNECT_TIMEOUT, BACKEND_STREAM_TIMEOUT))
+        headers = {**self._headers(token), **kwargs.pop("headers", {})}
+        response = self.session.request(method, self.base_url + path, headers=headers, stream=True, **kwargs)
+        self._log(method, path, response.status_code, started, 0, "headers")
+        return response
+
+    @contextmanager
+    def stream(self, method: str, path: str, token: Optional[str] = None, **kwargs) -> Iterator[requests.Response]:
+        """A streamed response, logged with time to headers and total duration"""
+        started = time.perf_counter()
+        response = self.open_stream(method, path, token, **kwargs)
+        try:
+            yield response
+        finally:
+            response.close()
+            self._log(method, path, response.status_code, started, 0, "stream")
+
+    def signup(self, email: str, password: str) -> requests.Response:
+        return self.request("POST", "/api/auth/signup", json={"email": email, "password": password})
+
+    def login(self, email: str, password: str) -> requests.Response:
+        return self.request("POST", "/api/auth/login", json={"email": email, "password": password})
+
+    def chat(self, token: str, message: str, conversation_id: Optional[int] = None) -> requests.Response:
+        return self.request("POST", "/api/chat", token, json={"conversation_id": conversation_id, "message": message})
+
+    def chat_stream(self, token: str, message: str, conversation_id: Optional[int] = None):
+        return self.stream("POST", "/api/chat/stream", token, json={"conversation_id": conversation_id, "message": message})
+
+    def open_chat_stream(self, token: str, message: str, conversation_id: Optional[int] = None) -> requests.Response:
+        """chat_stream's response, already open; close it when done"""
+        return self.open_stream("POST", "/api/chat/stream", token, json={"conversation_id": conversation_id, "message": message})
+
+    def messages(self, token: str, conversation_id: int, **params) -> requests.Response:
+        """One page of a conversation's history; params as GET /api/conversations/{id}/messages"""
+        return self.request("GET", f"/api/conversations/{conversation_id}/messages", token, params=params)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncBackendClient:
+    """
+    asyncio front for a BackendClient, so independent calls can run at once
+    (e.g. `await asyncio.gather(client.messages(...), client.open_chat_stream(...))`).
+    Calls run on a thread pool and share the client's keep-alive connections
+    """
+
+    def __init__(self, client: BackendClient, max_workers: int = BACKEND_POOL_SIZE):
+        self.client = client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="backend-client")
+
+    async def _run(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def request(self, method: str, path: str, token: Optional[str] = None, **kwargs) -> requests.Response:
+        return await self._run(self.client.request, method, path, token, **kwargs)
+
+    async def chat(self, token: str, message: str, conversation_id: Optional[int] = None) -> requests.Response:
+        return await self._run(self.client.chat, token, message, conversation_id)
+
+    async def open_chat_stream(self, token: str, message: str, conversation_id: Optional[int] = None) -> requests.Response:
+        return await self._run(self.client.open_chat_stream, token, message, conversation_id)
+
+    async def messages(self, token: str, conversation_id: int, **params) -> requests.Response:
+        return await self._run(self.client.messages, token, conversation_id, **params)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
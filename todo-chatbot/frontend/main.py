@@ -1,31 +1,58 @@
 import streamlit as st
-import requests
+import asyncio
 import json
+import logging
+import os
 from datetime import datetime
+from backend_client import BACKEND_URL, AsyncBackendClient, BackendClient
+
+# Per-call backend latency shows up in the Streamlit server log
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
 
 # Set page config
 st.set_page_config(page_title="AI Todo AI Chatbot", layout="wide")
 
+# Messages fetched per history call; the first load shows only the newest page
+MESSAGE_PAGE_SIZE = int(os.getenv("MESSAGE_PAGE_SIZE", "100"))
+# Older messages are folded into pre-rendered blocks of this many, so a rerun
+# redraws a few cached strings plus the recent bubbles, not every message
+MESSAGE_BLOCK_SIZE = int(os.getenv("MESSAGE_BLOCK_SIZE", "20"))
+
 # Initialize session state
 if 'token' not in st.session_state:
     st.session_state.token = None
 if 'user_email' not in st.session_state:
     st.session_state.user_email = None
 if 'current_conversation_id' not in st.session_state:
-    st.session_state.current_conversation_id = None
+    # Kept in the URL too, so a page refresh reopens the conversation after login
+    conversation = st.experimental_get_query_params().get("conversation", [None])[0]
+    st.session_state.current_conversation_id = int(conversation) if conversation and conversation.isdigit() else None
 if 'messages' not in st.session_state:
+    # Recent messages not yet folded into a block, oldest first
     st.session_state.messages = []
+if 'message_blocks' not in st.session_state:
+    st.session_state.message_blocks = []
+if 'message_watermark' not in st.session_state:
+    # Id of the newest message held here; only newer ones are fetched
+    st.session_state.message_watermark = None
+
+@st.cache_resource
+def get_backend_client():
+    """One keep-alive connection pool for every session of this server"""
+    return BackendClient(BACKEND_URL)
+
+@st.cache_resource
+def get_async_backend_client():
+    """Runs independent calls (history sync, sending a message) at once over the same pool"""
+    return AsyncBackendClient(get_backend_client())
 
-# Backend URL
-BACKEND_URL = "http://localhost:8001"
+backend = get_backend_client()
+async_backend = get_async_backend_client()
 
 def signup(email, password):
     """Sign up a new user"""
     try:
-        response = requests.post(
-            f"{BACKEND_URL}/api/auth/signup",
-            json={"email": email, "password": password}
-        )
+        response = backend.signup(email, password)
         return response.json(), response.status_code == 200
     except Exception as e:
         return {"detail": str(e)}, False
@@ -33,48 +60,131 @@ def signup(email, password):
 def login(email, password):
     """Log in a user"""
     try:
-        response = requests.post(
-            f"{BACKEND_URL}/api/auth/login",
-            json={"email": email, "password": password}
-        )
+        response = backend.login(email, password)
         return response.json(), response.status_code == 200
     except Exception as e:
         return {"detail": str(e)}, False
 
-def send_message(message):
-    """Send a message to the AI assistant"""
-    if not st.session_state.token:
-        st.error("Please log in first")
-        return None
-    
+def set_conversation(conversation_id):
+    """Switch to a conversation (None for a new one) and drop the cached history"""
+    st.session_state.current_conversation_id = conversation_id
+    st.session_state.messages = []
+    st.session_state.message_blocks = []
+    st.session_state.message_watermark = None
+    if conversation_id:
+        st.experimental_set_query_params(conversation=conversation_id)
+    else:
+        st.experimental_set_query_params()
+
+def render_block(messages):
+    """One markdown string for a run of older messages"""
+    names = {"user": "You", "assistant": "Assistant"}
+    return "\n\n".join(f"**{names.get(m['role'], m['role'])}:** {m['content']}" for m in messages)
+
+def append_messages(messages):
+    """Add fetched messages, folding full runs of older ones into rendered blocks"""
+    st.session_state.messages.extend(messages)
+    # Keep at least one block's worth of recent messages as bubbles
+    while len(st.session_state.messages) >= 2 * MESSAGE_BLOCK_SIZE:
+        block = st.session_state.messages[:MESSAGE_BLOCK_SIZE]
+        del st.session_state.messages[:MESSAGE_BLOCK_SIZE]
+        st.session_state.message_blocks.append(render_block(block))
+
+async def fetch_delta(token, conversation_id, watermark):
+    """
+    Pages of messages newer than the watermark, and an error or None
+    The first call loads the newest page; later calls get only the delta.
+    Makes no st calls, so it can run alongside other backend calls
+    """
+    pages = []
     try:
-        headers = {
-            "Authorization": f"Bearer {st.session_state.token}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "conversation_id": st.session_state.current_conversation_id,
-            "message": message
-        }
-        
-        response = requests.post(
-            f"{BACKEND_URL}/api/chat",
-            headers=headers,
-            json=payload
+        while True:
+            params = {"limit": MESSAGE_PAGE_SIZE}
+            if watermark is not None:
+                params["since_id"] = watermark
+            response = await async_backend.messages(token, conversation_id, **params)
+            if response.status_code == 404:
+                return pages, 404
+            if response.status_code != 200:
+                return pages, response.text
+            page = response.json()
+            pages.append(page)
+            # A full delta page means more messages are waiting
+            if watermark is None or len(page["messages"]) < MESSAGE_PAGE_SIZE:
+                return pages, None
+            watermark = page["next_since"]
+    except Exception as e:
+        return pages, str(e)
+
+def apply_delta(pages, error):
+    """Take fetched pages into the cache and advance the watermark"""
+    for page in pages:
+        append_messages(page["messages"])
+        st.session_state.message_watermark = page["next_since"]
+    if error == 404:
+        # Not this user's conversation (e.g. a stale URL); start a new one
+        set_conversation(None)
+    elif error:
+        st.error(f"Error loading messages: {error}")
+
+async def no_delta():
+    return [], None
+
+def delta_call():
+    """The history sync for the current conversation, as an awaitable"""
+    conversation_id = st.session_state.current_conversation_id
+    if not st.session_state.token or not conversation_id:
+        return no_delta()
+    return fetch_delta(st.session_state.token, conversation_id, st.session_state.message_watermark)
+
+def sync_messages():
+    """Fetch the messages newer than the watermark into the cache"""
+    apply_delta(*asyncio.run(delta_call()))
+
+async def open_stream(message, token, conversation_id):
+    try:
+        return await async_backend.open_chat_stream(token, message, conversation_id)
+    except Exception as e:
+        return e
+
+def sync_and_send(message):
+    """
+    Sync the history and send a message at the same time
+    The turn is only stored once its stream ends, so the sync doesn't pick it up.
+    Returns the open streaming response (or the exception that prevented it)
+    """
+    async def both():
+        return await asyncio.gather(
+            delta_call(),
+            open_stream(message, st.session_state.token, st.session_state.current_conversation_id)
         )
-        
-        if response.status_code == 200:
-            data = response.json()
-            # Update conversation ID if it's the first message
-            if not st.session_state.current_conversation_id:
-                st.session_state.current_conversation_id = data["conversation_id"]
-            return data
-        else:
-            st.error(f"Error: {response.text}")
-            return None
+    delta, response = asyncio.run(both())
+    apply_delta(*delta)
+    return response
+
+def stream_events(response):
+    """
+    Read an open chat stream, closing it at the end
+    Yields (event, data) pairs as Server-Sent Events arrive
+    """
+    if isinstance(response, Exception):
+        yield "error", {"detail": str(response)}
+        return
+    
+    try:
+        with response:
+            if response.status_code != 200:
+                yield "error", {"detail": response.text}
+                return
+            
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    yield event, json.loads(line[len("data: "):])
     except Exception as e:
-        st.error(f"Error sending message: {str(e)}")
-        return None
+        yield "error", {"detail": str(e)}
 
 # Main app
 st.title("🤖 AI Todo AI Chatbot")
@@ -117,36 +227,71 @@ else:
     if st.sidebar.button("Logout"):
         st.session_state.token = None
         st.session_state.user_email = None
-        st.session_state.current_conversation_id = None
-        st.session_state.messages = []
+        set_conversation(None)
+        st.rerun()
+    
+    if st.sidebar.button("New conversation"):
+        set_conversation(None)
         st.rerun()
     
     # Chat interface
     st.subheader("Chat with Your AI Assistant")
     
-    # Display messages
+    # Drawn at the bottom of the page wherever it is called
+    prompt = st.chat_input("Ask me to manage your tasks...")
+    
+    # Only messages newer than the watermark come over the wire; with a new
+    # message the sync and the send go out together
+    if prompt:
+        stream = sync_and_send(prompt)
+    else:
+        sync_messages()
+    
+    # Older history is drawn from cached blocks, recent messages as bubbles
+    if st.session_state.message_blocks:
+        with st.expander("Earlier messages"):
+            for block in st.session_state.message_blocks:
+                st.markdown(block)
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
             st.write(message["content"])
     
-    # Input for new message
-    if prompt := st.chat_input("Ask me to manage your tasks..."):
-        # Add user message to history
-        st.session_state.messages.append({"role": "user", "content": prompt})
-        
+    # The new message and its streamed reply
+    if prompt:
         with st.chat_message("user"):
             st.write(prompt)
         
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                response = send_message(prompt)
+            # Render the reply as it streams in instead of waiting behind a spinner
+            status = st.empty()
+            placeholder = st.empty()
+            partial = ""
+            response = None
+            
+            for event, data in stream_events(stream):
+                if event == "conversation":
+                    # Update conversation ID if it's the first message
+                    if st.session_state.current_conversation_id != data["conversation_id"]:
+                        set_conversation(data["conversation_id"])
+                elif event == "tool_start":
+                    status.caption(f"Running {data['name']}...")
+                elif event == "tool_end":
+                    status.caption(f"Finished {data['name']}")
+                elif event == "chunk":
+                    partial += data["text"]
+                    placeholder.markdown(partial + "▌")
+                elif event == "done":
+                    response = data
+                elif event == "error":
+                    st.error(f"Error: {data.get('detail')}")
+            status.empty()
                 
             if response:
                 assistant_response = response["response"]
-                st.write(assistant_response)
+                placeholder.markdown(assistant_response)
                 
-                # Add assistant response to history
-                st.session_state.messages.append({"role": "assistant", "content": assistant_response})
+                # The turn is stored by now; take it into the cache, already drawn
+                sync_messages()
                 
                 # Show tool calls if any
                 if response.get("tool_calls"):
@@ -4,7 +4,7 @@ Creates all tables based on models
 """
 
 from database.connection import engine
-from models.task import Base
+from models.task import Base, Task
 
 
 def init_db():
@@ -13,6 +13,9 @@ def init_db():
     """
     print("Initializing Phase 4 database...")
     Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add any new indexes explicitly
+    for index in Task.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
     print("Database initialized successfully!")
     print("All persistent state will live in the database as per Phase 4 constitution.")
 
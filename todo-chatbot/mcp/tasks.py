@@ -8,9 +8,16 @@ Following Phase 4 constitution:
 - MCP tools are the only way to create, update, or delete tasks
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from models.task import Task
-from typing import List, Optional
+from backend.mcp.pagination import (
+    DEFAULT_SORT, Page, keyset, page_of, page_size, parse_fields, parse_sort
+)
+from typing import List, Optional, Sequence
+
+
+# Columns get_tasks_by_user can project
+TASK_FIELDS = ("id", "title", "description", "status", "created_at", "updated_at", "user_id")
 
 
 def create_task(db: Session, title: str, description: str, user_id: str) -> Task:
@@ -33,12 +40,27 @@ def get_task(db: Session, task_id: int) -> Optional[Task]:
     return db.query(Task).filter(Task.id == task_id).first()
 
 
-def get_tasks_by_user(db: Session, user_id: str) -> List[Task]:
+def get_tasks_by_user(
+    db: Session,
+    user_id: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = DEFAULT_SORT,
+    fields: Optional[Sequence[str]] = None
+) -> Page:
     """
-    MCP Tool to get all tasks for a user
+    MCP Tool to get one page of a user's tasks
     Stateless, deterministic, database-only
+    Keyset-paginated over (sort key, id); with `fields` only those columns are loaded
     """
-    return db.query(Task).filter(Task.user_id == user_id).all()
+    size = page_size(limit)
+    key, _ = parse_sort(sort)
+    query = db.query(Task).filter(Task.user_id == user_id)
+    if fields:
+        columns = dict.fromkeys(["id", key, *parse_fields(fields, TASK_FIELDS, ())])
+        query = query.options(load_only(*(getattr(Task, column) for column in columns)))
+    query = keyset(query, getattr(Task, key), Task.id, sort, cursor, size)
+    return page_of(query.all(), sort, size)
 
 
 def update_task_status(db: Session, task_id: int, status: str) -> Optional[Task]:
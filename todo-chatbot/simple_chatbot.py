@@ -3,6 +3,8 @@ import json
 import sqlite3
 from datetime import datetime
 import os
+from backend.agents.intents import task_intents
+from backend.database.sqlite_migrations import migrate
 
 # Set page config
 st.set_page_config(page_title="Simple Todo AI Chatbot", layout="centered")
@@ -19,14 +21,9 @@ if 'tasks' not in st.session_state:
 
 # Database setup
 def init_db():
+    # Creates the tables and indexes, or upgrades an older file in place
     conn = sqlite3.connect('simple_todo.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users
-                 (id INTEGER PRIMARY KEY, username TEXT UNIQUE, password TEXT)''')
-    c.execute('''CREATE TABLE IF NOT EXISTS tasks
-                 (id INTEGER PRIMARY KEY, user_id INTEGER, title TEXT, 
-                 description TEXT, status TEXT, created_at TIMESTAMP)''')
-    conn.commit()
+    migrate(conn)
     conn.close()
 
 def add_task(user_id, title, description=""):
@@ -69,20 +66,12 @@ init_db()
 
 # Simple AI logic
 def simple_ai_response(user_input, user_id):
-    user_input_lower = user_input.lower()
+    # Intent, title, task IDs and status come from one pass of the intent engine
+    parsed = task_intents.parse(user_input)
     
     # Add task
-    if any(word in user_input_lower for word in ["add", "create", "new task", "remember", "note"]):
-        # Extract task title (simple approach)
-        for phrase in ["add", "create", "new task to", "remember to", "note to", "i need to"]:
-            if phrase in user_input_lower:
-                title = user_input_lower.split(phrase)[-1].strip().capitalize()
-                if title:
-                    task_id = add_task(user_id, title)
-                    return f"I've added '{title}' to your task list (Task #{task_id})."
-        
-        # If no specific phrase matched, use the whole input minus command words
-        title = user_input_lower.replace("add", "").replace("create", "").replace("new task", "").strip().capitalize()
+    if parsed.intent == "add":
+        title = parsed.title
         if title:
             task_id = add_task(user_id, title)
             return f"I've added '{title}' to your task list (Task #{task_id})."
@@ -90,12 +79,8 @@ def simple_ai_response(user_input, user_id):
             return "What task would you like to add?"
     
     # List tasks
-    elif any(word in user_input_lower for word in ["show", "list", "see", "view", "my tasks", "what"]):
-        status = "all"
-        if "pending" in user_input_lower or "incomplete" in user_input_lower:
-            status = "pending"
-        elif "completed" in user_input_lower or "done" in user_input_lower:
-            status = "completed"
+    elif parsed.intent == "list":
+        status = parsed.status or "all"
         
         tasks = get_tasks(user_id, status)
         
@@ -109,12 +94,9 @@ def simple_ai_response(user_input, user_id):
             return f"Your {status} tasks:\n{task_list}"
     
     # Complete task
-    elif any(word in user_input_lower for word in ["complete", "done", "finish", "mark as done"]):
-        # Try to extract task ID
-        import re
-        numbers = re.findall(r'\d+', user_input_lower)
-        if numbers:
-            task_id = int(numbers[0])
+    elif parsed.intent == "complete":
+        if parsed.task_ids:
+            task_id = parsed.task_ids[0]
             # Verify task belongs to user
             user_tasks = [t[0] for t in get_tasks(user_id)]
             if task_id in user_tasks:
@@ -126,12 +108,9 @@ def simple_ai_response(user_input, user_id):
             return "Which task would you like to mark as complete? Please specify the task number."
     
     # Delete task
-    elif any(word in user_input_lower for word in ["delete", "remove", "cancel", "eliminate"]):
-        # Try to extract task ID
-        import re
-        numbers = re.findall(r'\d+', user_input_lower)
-        if numbers:
-            task_id = int(numbers[0])
+    elif parsed.intent == "delete":
+        if parsed.task_ids:
+            task_id = parsed.task_ids[0]
             # Verify task belongs to user
             user_tasks = [t[0] for t in get_tasks(user_id)]
             if task_id in user_tasks:
@@ -1,20 +1,82 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Dict, Iterator, Optional, List
+import os
+import queue
 import sqlite3
 from datetime import datetime
 import uvicorn
+from backend.agents.intents import task_intents
+from backend.database.engine import DB_POOL_SIZE, SQLITE_BUSY_TIMEOUT_MS
+from backend.database.sqlite_migrations import migrate
+from backend.mcp.pagination import (
+    DEFAULT_SORT, TASK_PAGE_MAX, TASK_PAGE_SIZE, InvalidPageRequest,
+    decode_cursor, encode_cursor, parse_fields, parse_sort
+)
+
+DATABASE_PATH = os.getenv("TODO_API_DB", "simple_todo_api.db")
+# Prepared statements kept per connection; reused because connections are pooled
+SQLITE_CACHED_STATEMENTS = int(os.getenv("SQLITE_CACHED_STATEMENTS", "256"))
+# Tasks a chat "list" reply names; the rest are summarized as a count
+CHAT_LIST_LIMIT = 5
+
+def get_db_connection():
+    """Open one configured connection: WAL, busy timeout, rows by column name"""
+    # Pooled connections move between worker threads, one request at a time
+    conn = sqlite3.connect(DATABASE_PATH, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+                           cached_statements=SQLITE_CACHED_STATEMENTS, check_same_thread=False)
+    conn.row_factory = sqlite3.Row  # This enables column access by name
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    return conn
+
+class ConnectionPool:
+    """
+    Reusable SQLite connections, each used by one request at a time
+    Keeps up to `size` idle connections; extra ones opened under load are closed on release
+    """
+    
+    def __init__(self, size: int = DB_POOL_SIZE):
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+    
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return get_db_connection()
+    
+    def release(self, conn: sqlite3.Connection):
+        # A request that failed mid-transaction must not leak it to the next one
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+    
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+db_pool = ConnectionPool()
+
+def get_db() -> Iterator[sqlite3.Connection]:
+    """FastAPI dependency: a pooled connection for the duration of the request"""
+    conn = db_pool.acquire()
+    try:
+        yield conn
+    finally:
+        db_pool.release(conn)
 
 # Initialize database
 def init_db():
-    conn = sqlite3.connect('simple_todo_api.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users
-                 (id INTEGER PRIMARY KEY, username TEXT UNIQUE, password TEXT)''')
-    c.execute('''CREATE TABLE IF NOT EXISTS tasks
-                 (id INTEGER PRIMARY KEY, user_id INTEGER, title TEXT, 
-                 description TEXT, status TEXT, created_at TIMESTAMP)''')
-    conn.commit()
+    # Creates the tables and indexes, or upgrades an older file in place
+    conn = get_db_connection()
+    migrate(conn)
     conn.close()
 
 # Initialize database
@@ -22,6 +84,10 @@ init_db()
 
 app = FastAPI(title="Todo AI Chatbot API", version="1.0.0")
 
+@app.on_event("shutdown")
+def close_db_pool():
+    db_pool.close()
+
 class Task(BaseModel):
     id: Optional[int] = None
     user_id: int
@@ -35,6 +101,13 @@ class User(BaseModel):
     username: str
     password: str
 
+class TaskPage(BaseModel):
+    tasks: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+# Columns GET /tasks/{user_id} can return
+TASK_FIELDS = ("id", "user_id", "title", "description", "status", "created_at")
+
 class TaskCreate(BaseModel):
     user_id: int
     title: str
@@ -53,18 +126,12 @@ class MessageResponse(BaseModel):
     response: str
     task_operations: List[str] = []
 
-def get_db_connection():
-    conn = sqlite3.connect('simple_todo_api.db')
-    conn.row_factory = sqlite3.Row  # This enables column access by name
-    return conn
-
 @app.get("/")
 def read_root():
     return {"message": "Todo AI Chatbot API", "version": "1.0.0"}
 
 @app.post("/users/", response_model=User)
-def create_user(user: User):
-    conn = get_db_connection()
+def create_user(user: User, conn: sqlite3.Connection = Depends(get_db)):
     c = conn.cursor()
     try:
         c.execute("INSERT INTO users (username, password) VALUES (?, ?)", 
@@ -74,40 +141,62 @@ def create_user(user: User):
         return User(id=user_id, username=user.username, password="***")
     except sqlite3.IntegrityError:
         raise HTTPException(status_code=400, detail="Username already exists")
-    finally:
-        conn.close()
 
 @app.post("/tasks/", response_model=Task)
-def create_task(task: TaskCreate):
-    conn = get_db_connection()
+def create_task(task: TaskCreate, conn: sqlite3.Connection = Depends(get_db)):
     c = conn.cursor()
     c.execute("""INSERT INTO tasks (user_id, title, description, status, created_at) 
                  VALUES (?, ?, ?, 'pending', ?)""",
               (task.user_id, task.title, task.description, datetime.now()))
     task_id = c.lastrowid
     conn.commit()
-    conn.close()
     return Task(id=task_id, user_id=task.user_id, title=task.title, 
                 description=task.description, status="pending", 
                 created_at=str(datetime.now()))
 
-@app.get("/tasks/{user_id}", response_model=List[Task])
-def get_tasks(user_id: int, status: Optional[str] = None):
-    conn = get_db_connection()
-    c = conn.cursor()
+@app.get("/tasks/{user_id}", response_model=TaskPage)
+def get_tasks(
+    user_id: int,
+    status: Optional[str] = None,
+    limit: int = Query(TASK_PAGE_SIZE, ge=1, le=TASK_PAGE_MAX),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    sort: str = Query(DEFAULT_SORT, description="created_at, -created_at, title or -title"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of " + ", ".join(TASK_FIELDS)),
+    conn: sqlite3.Connection = Depends(get_db)
+):
+    try:
+        key, descending = parse_sort(sort)
+        names = parse_fields(fields, TASK_FIELDS, TASK_FIELDS)
+        after = decode_cursor(cursor, sort) if cursor else None
+    except InvalidPageRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Column names come from the fixed sort and field lists, never from the request
+    columns = ", ".join(dict.fromkeys(["id", key, *names]))
+    where = "user_id = ?"
+    params: List[Any] = [user_id]
     if status:
-        c.execute("SELECT * FROM tasks WHERE user_id = ? AND status = ?", (user_id, status))
-    else:
-        c.execute("SELECT * FROM tasks WHERE user_id = ?", (user_id,))
+        where += " AND status = ?"
+        params.append(status)
+    if after is not None:
+        where += f" AND ({key}, id) {'<' if descending else '>'} (?, ?)"
+        params.extend(after)
+    direction = "DESC" if descending else "ASC"
+    
+    c = conn.cursor()
+    # One row past the page tells whether another page follows
+    c.execute(f"SELECT {columns} FROM tasks WHERE {where} ORDER BY {key} {direction}, id {direction} LIMIT ?",
+              (*params, limit + 1))
     rows = c.fetchall()
-    conn.close()
-    return [Task(id=row['id'], user_id=row['user_id'], title=row['title'], 
-                 description=row['description'], status=row['status'], 
-                 created_at=row['created_at']) for row in rows]
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, rows[-1][key], rows[-1]['id'])
+    return TaskPage(tasks=[{name: row[name] for name in names} for row in rows], next_cursor=next_cursor)
 
 @app.put("/tasks/{task_id}", response_model=Task)
-def update_task(task_id: int, task_update: TaskUpdate):
-    conn = get_db_connection()
+def update_task(task_id: int, task_update: TaskUpdate, conn: sqlite3.Connection = Depends(get_db)):
     c = conn.cursor()
     updates = []
     params = []
@@ -130,26 +219,22 @@ def update_task(task_id: int, task_update: TaskUpdate):
     c.execute(query, params)
     
     if c.rowcount == 0:
-        conn.close()
         raise HTTPException(status_code=404, detail="Task not found")
     
     conn.commit()
     c.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
     row = c.fetchone()
-    conn.close()
     
     return Task(id=row['id'], user_id=row['user_id'], title=row['title'], 
                 description=row['description'], status=row['status'], 
                 created_at=row['created_at'])
 
 @app.delete("/tasks/{task_id}")
-def delete_task(task_id: int):
-    conn = get_db_connection()
+def delete_task(task_id: int, conn: sqlite3.Connection = Depends(get_db)):
     c = conn.cursor()
     c.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
     affected = c.rowcount
     conn.commit()
-    conn.close()
     
     if affected == 0:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -157,38 +242,20 @@ def delete_task(task_id: int):
     return {"message": "Task deleted successfully"}
 
 @app.post("/chat/", response_model=MessageResponse)
-def chat_with_bot(request: MessageRequest):
-    user_input = request.message.lower()
+def chat_with_bot(request: MessageRequest, conn: sqlite3.Connection = Depends(get_db)):
+    parsed = task_intents.parse(request.message)
     user_id = request.user_id
     task_operations = []
     
-    # Simple intent recognition
-    if any(word in user_input for word in ["add", "create", "new task", "remember", "note"]):
-        # Extract task title
-        for phrase in ["add", "create", "new task to", "remember to", "note to", "i need to"]:
-            if phrase in user_input:
-                title = user_input.split(phrase)[-1].strip().capitalize()
-                if title:
-                    conn = get_db_connection()
-                    c = conn.cursor()
-                    c.execute("INSERT INTO tasks (user_id, title, description, status, created_at) VALUES (?, ?, '', 'pending', ?)",
-                              (user_id, title, datetime.now()))
-                    task_id = c.lastrowid
-                    conn.commit()
-                    conn.close()
-                    response = f"I've added '{title}' to your task list (Task #{task_id})."
-                    task_operations.append(f"Added task: {title}")
-                    return MessageResponse(response=response, task_operations=task_operations)
-        
-        title = user_input.replace("add", "").replace("create", "").replace("new task", "").strip().capitalize()
+    # Intent, title, task IDs and status come from one pass of the intent engine
+    if parsed.intent == "add":
+        title = parsed.title
         if title:
-            conn = get_db_connection()
             c = conn.cursor()
             c.execute("INSERT INTO tasks (user_id, title, description, status, created_at) VALUES (?, ?, '', 'pending', ?)",
                       (user_id, title, datetime.now()))
             task_id = c.lastrowid
             conn.commit()
-            conn.close()
             response = f"I've added '{title}' to your task list (Task #{task_id})."
             task_operations.append(f"Added task: {title}")
         else:
@@ -196,21 +263,20 @@ def chat_with_bot(request: MessageRequest):
         
         return MessageResponse(response=response, task_operations=task_operations)
     
-    elif any(word in user_input for word in ["show", "list", "see", "view", "display", "my tasks", "what"]):
-        status = "all"
-        if "pending" in user_input or "incomplete" in user_input:
-            status = "pending"
-        elif "completed" in user_input or "done" in user_input:
-            status = "completed"
+    elif parsed.intent == "list":
+        status = parsed.status or "all"
         
-        conn = get_db_connection()
-        c = conn.cursor()
+        # A count plus the first page, both from the (user_id[, status], created_at, id) indexes
         if status == "all":
-            c.execute("SELECT * FROM tasks WHERE user_id = ?", (user_id,))
+            where, params = "user_id = ?", (user_id,)
         else:
-            c.execute("SELECT * FROM tasks WHERE user_id = ? AND status = ?", (user_id, status))
-        tasks = c.fetchall()
-        conn.close()
+            where, params = "user_id = ? AND status = ?", (user_id, status)
+        c = conn.cursor()
+        total = c.execute(f"SELECT count(*) FROM tasks WHERE {where}", params).fetchone()[0]
+        tasks = c.execute(
+            f"SELECT id, title, status FROM tasks WHERE {where} ORDER BY created_at, id LIMIT ?",
+            params + (CHAT_LIST_LIMIT,)
+        ).fetchall()
         
         if not tasks:
             if status == "all":
@@ -219,17 +285,16 @@ def chat_with_bot(request: MessageRequest):
                 response = f"You don't have any {status} tasks."
         else:
             task_list = "\n".join([f"- {task['title']} (ID: {task['id']}, Status: {task['status']})" for task in tasks])
+            if total > len(tasks):
+                task_list += f"\n...and {total - len(tasks)} more"
             response = f"Your {status} tasks:\n{task_list}"
         
         task_operations.append(f"Retrieved {status} tasks for user {user_id}")
         return MessageResponse(response=response, task_operations=task_operations)
     
-    elif any(word in user_input for word in ["complete", "done", "finish", "mark as done"]):
-        import re
-        numbers = re.findall(r'\d+', user_input)
-        if numbers:
-            task_id = int(numbers[0])
-            conn = get_db_connection()
+    elif parsed.intent == "complete":
+        if parsed.task_ids:
+            task_id = parsed.task_ids[0]
             c = conn.cursor()
             c.execute("UPDATE tasks SET status = 'completed' WHERE id = ? AND user_id = ?", (task_id, user_id))
             if c.rowcount > 0:
@@ -238,18 +303,14 @@ def chat_with_bot(request: MessageRequest):
                 task_operations.append(f"Completed task #{task_id}")
             else:
                 response = f"Task #{task_id} not found in your task list."
-            conn.close()
         else:
             response = "Which task would you like to mark as complete? Please specify the task number."
         
         return MessageResponse(response=response, task_operations=task_operations)
     
-    elif any(word in user_input for word in ["delete", "remove", "cancel", "eliminate"]):
-        import re
-        numbers = re.findall(r'\d+', user_input)
-        if numbers:
-            task_id = int(numbers[0])
-            conn = get_db_connection()
+    elif parsed.intent == "delete":
+        if parsed.task_ids:
+            task_id = parsed.task_ids[0]
             c = conn.cursor()
             c.execute("DELETE FROM tasks WHERE id = ? AND user_id = ?", (task_id, user_id))
             if c.rowcount > 0:
@@ -258,7 +319,6 @@ def chat_with_bot(request: MessageRequest):
                 task_operations.append(f"Deleted task #{task_id}")
             else:
                 response = f"Task #{task_id} not found in your task list."
-            conn.close()
         else:
             response = "Which task would you like to delete? Please specify the task number."
         